@@ -9,15 +9,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 from logs.logging_util import LoggerSingleton
 from contextlib import asynccontextmanager
-from config.clients import initialize_clients
+from config.clients import get_client_container
 from voice.router import router as voice_router
 from auth.router import router as auth_router
 from config.exception import register_exception_handlers
+from voice.job_queue import ensure_job_queue_schema
+from voice.rate_limit import ensure_rate_limit_schema
+from voice.result_cache import ensure_result_cache_schema
+from voice.worker import SttWorker
+from voice.async_runtime import get_async_runtime
+from voice.progress import get_progress_broker
 from database import Base, engine
 from sqlalchemy import text
 from dotenv import load_dotenv
 import os
 import logging
+import threading
 
 load_dotenv()
 
@@ -55,6 +62,9 @@ async def lifespan(app: FastAPI):
                     except Exception:
                         pass  # 이미 timestamptz이면 무시
             logger.info("Timezone migration completed")
+        ensure_job_queue_schema(engine)
+        ensure_rate_limit_schema(engine)
+        ensure_result_cache_schema(engine)
         logger.info("Database columns ensured successfully")
     except Exception as e:
         logger.warning(f"Failed to ensure database columns: {str(e)}")
@@ -80,12 +90,28 @@ async def lifespan(app: FastAPI):
     #     f"{'=' * 80}\n"
     # )
 
-    # 앱 상테에 클라이언트 컨테이너를 저장할 객체 초기화
+    # 앱 상테에 클라이언트 컨테이너를 저장할 객체 초기화 (워커와 공유하는 프로세스 공용 레지스트리)
     global client_container
-    client_container = initialize_clients()
+    client_container = get_client_container()
     app.state.client_container = client_container
+    threading.Thread(target=client_container.warm_up, name="http-warmup", daemon=True).start()
+
+    # 단일 프로세스 배포용: 웹 프로세스 안에서 STT 워커 실행 (기본은 worker.py 별도 실행)
+    embedded_worker = None
+    if os.getenv("STT_EMBEDDED_WORKER", "false").lower() in ("true", "1", "yes"):
+        embedded_worker = SttWorker()
+        embedded_worker.start_in_background()
+        logger.info("Embedded STT worker started")
+        # OSD 모델 다운로드/로딩과 더미 추론을 미리 해 두어 첫 작업이 콜드 스타트 비용을 내지 않게 한다
+        if client_container.enable_osd and os.getenv("OSD_PRELOAD", "true").lower() in ("true", "1", "yes"):
+            from voice.diarization import warm_up_segmentation
+            threading.Thread(target=warm_up_segmentation, name="osd-warmup", daemon=True).start()
 
     yield
+    if embedded_worker:
+        embedded_worker.stop()
+    get_async_runtime().stop()
+    get_progress_broker().stop()
     # 종료시 클린업 작업은 여기서
     # Todo: 데이터베이스 연결 해제 로직 추가 필요
     # Todo: 기타 리소스 정리 로직 추가 필요
@@ -135,10 +161,11 @@ Instrumentator().instrument(app).expose(app)
 
 # 라우터 등록
 from voice.history_router import router as history_router
+from voice.webhook_router import router as webhook_router
 from client.router import router as client_router
 from appointment.router import router as appointment_router
 
-routers = [auth_router, voice_router, history_router, client_router, appointment_router]
+routers = [auth_router, voice_router, history_router, webhook_router, client_router, appointment_router]
 
 for router in routers:
     app.include_router(router)
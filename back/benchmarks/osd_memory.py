@@ -0,0 +1,131 @@
+"""
+OSD 오디오 로더 최대 메모리(RSS) 벤치마크
+
+10분 / 1시간 / 3시간 합성 녹음(m4a)을 만들어, 로더별로 슬라이딩 윈도우를 끝까지 훑을 때의
+최대 RSS 를 잰다. 각 측정은 별도 프로세스에서 실행한다.
+
+  full    : 전체를 float32 배열로 올린 뒤 자르기 (기존 pydub 로더와 같은 방식, 비교 기준)
+  memmap  : PCM 파일로 디코딩 후 DecodedAudio.iter_windows (파이프라인 경로)
+  stream  : ffmpeg 파이프에서 바로 윈도우 생성 (stream_pcm_windows)
+
+--segmentation 을 주면 로더 대신 run_segmentation 전체를 실행한다 (ONNX 모델 필요).
+
+실행 (back/ 에서):
+    python -m benchmarks.osd_memory
+    python -m benchmarks.osd_memory --durations 600 --loaders memmap stream --segmentation
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_DURATIONS = [600, 3600, 10800]
+LOADERS = ["full", "memmap", "stream"]
+
+
+def make_synthetic_audio(duration: int, workdir: str) -> str:
+    """말소리 대신 사인파 + 잡음으로 만든 mono 44.1 kHz m4a (같은 길이는 재사용)"""
+    path = os.path.join(workdir, f"synthetic_{duration}s.m4a")
+    if os.path.exists(path):
+        return path
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=44100:duration={duration}",
+            "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:sample_rate=44100:duration={duration}",
+            "-filter_complex", "amix=inputs=2:duration=shortest",
+            "-ac", "1", "-c:a", "aac", "-b:a", "64k", path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def _peak_rss_mb() -> float:
+    # Linux 에서 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(loader: str, source: str, segmentation: bool) -> None:
+    import numpy as np
+
+    from voice.audio import decode_to_pcm, stream_pcm_windows
+    from voice.diarization import STEP_SAMPLES, WINDOW_SAMPLES, run_segmentation
+
+    baseline = _peak_rss_mb()
+    started = time.monotonic()
+    pcm_path = None
+    windows = 0
+    try:
+        if loader == "full":
+            pcm_path = tempfile.NamedTemporaryFile(delete=False, suffix=".pcm").name
+            decoded = decode_to_pcm(source, pcm_path)
+            waveform = np.fromfile(pcm_path, dtype=np.int16).astype(np.float32) / 32768.0
+            for start in range(0, len(waveform), STEP_SAMPLES):
+                waveform[start:start + WINDOW_SAMPLES].sum()
+                windows += 1
+            del decoded
+        elif loader == "memmap":
+            pcm_path = tempfile.NamedTemporaryFile(delete=False, suffix=".pcm").name
+            decoded = decode_to_pcm(source, pcm_path)
+            if segmentation:
+                windows = run_segmentation(decoded)["total_frames"]
+            else:
+                for _, chunk in decoded.iter_windows(WINDOW_SAMPLES, STEP_SAMPLES):
+                    chunk.sum()
+                    windows += 1
+        else:
+            if segmentation:
+                windows = run_segmentation(source)["total_frames"]
+            else:
+                for _, chunk in stream_pcm_windows(source, WINDOW_SAMPLES, STEP_SAMPLES):
+                    chunk.sum()
+                    windows += 1
+    finally:
+        if pcm_path and os.path.exists(pcm_path):
+            os.unlink(pcm_path)
+
+    elapsed = time.monotonic() - started
+    # 부모가 마지막 줄을 파싱한다
+    print(f"{_peak_rss_mb():.1f} {_peak_rss_mb() - baseline:.1f} {elapsed:.1f} {windows}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS, help="녹음 길이(초)")
+    parser.add_argument("--loaders", nargs="+", choices=LOADERS, default=LOADERS)
+    parser.add_argument("--segmentation", action="store_true", help="run_segmentation 전체 실행 (full 제외)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "osd_memory_bench"))
+    parser.add_argument("--child", nargs=2, metavar=("LOADER", "SOURCE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], args.child[1], args.segmentation)
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    back_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    label = "frames" if args.segmentation else "windows"
+    print(f"{'duration':>9} {'loader':>7} {'peak_rss_mb':>12} {'delta_mb':>9} {'elapsed_s':>10} {label:>8}")
+    for duration in args.durations:
+        source = make_synthetic_audio(duration, args.workdir)
+        for loader in args.loaders:
+            if args.segmentation and loader == "full":
+                continue
+            cmd = [sys.executable, "-m", "benchmarks.osd_memory", "--child", loader, source]
+            if args.segmentation:
+                cmd.append("--segmentation")
+            result = subprocess.run(cmd, cwd=back_dir, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{duration:>8}s {loader:>7} failed: {result.stderr.strip()[-300:]}")
+                continue
+            peak, delta, elapsed, count = result.stdout.strip().splitlines()[-1].split()
+            print(f"{duration:>8}s {loader:>7} {peak:>12} {delta:>9} {elapsed:>10} {count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+OSD 프레임 누적 / 겹침 구간 추출 — 벡터화 구현과 이전 루프 구현 비교
+
+run_segmentation 의 후처리(윈도우 확률 누적, 겹침 마스크, 구간 병합)를 이전의 프레임 단위
+Python 루프 구현(아래 _reference_*)과 나란히 실행해 결과가 같은지 확인하고 실행 시간을 비교한다.
+윈도우 확률은 모델 대신 합성값(겹침 구간 포함)을 쓰므로 ONNX 모델이 필요 없다.
+결과가 다르면 종료 코드 1 로 끝난다 (변경 전 확인용).
+
+실행 (back/ 에서):
+    python -m benchmarks.osd_parity
+    python -m benchmarks.osd_parity --durations 60 3600 10800 --seed 7
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from voice.diarization import (
+    MIN_OVERLAP_DURATION,
+    NUM_SPEAKERS,
+    OVERLAP_ONSET,
+    SINCNET_OFFSET,
+    SINCNET_STEP,
+    STEP_SAMPLES,
+    WINDOW_SAMPLES,
+    _FrameAccumulator,
+    _frame_to_time,
+    _overlap_mask,
+    _overlap_regions,
+)
+from voice.audio import SAMPLE_RATE
+
+FRAMES_PER_WINDOW = 589  # segmentation-3.0 출력 프레임 수 (10초 윈도우)
+
+
+def _synthetic_windows(num_samples: int, rng: np.random.Generator) -> list[tuple[int, np.ndarray]]:
+    """(시작 샘플, 화자 확률 [frames, 3]) — 화자 교대와 가끔 두 화자가 겹치는 구간을 흉내 낸다"""
+    windows = []
+    for start in range(0, num_samples, STEP_SAMPLES):
+        probs = rng.uniform(0.0, 0.3, size=(FRAMES_PER_WINDOW, NUM_SPEAKERS))
+        position = 0
+        while position < FRAMES_PER_WINDOW:
+            length = int(rng.integers(20, 150))
+            speakers = rng.choice(NUM_SPEAKERS, size=2 if rng.random() < 0.15 else 1, replace=False)
+            probs[position:position + length, speakers] = rng.uniform(0.6, 1.0, size=(1, len(speakers)))
+            position += length
+        windows.append((start, probs))
+    return windows
+
+
+# --- 이전 구현 (프레임 단위 루프) ---
+
+def _reference_aggregate(windows: list[tuple[int, np.ndarray]], num_samples: int) -> np.ndarray:
+    speaker_probs = np.zeros((0, NUM_SPEAKERS), dtype=np.float64)
+    total_samples = 0
+    for start, chunk_speaker_probs in windows:
+        total_samples = max(total_samples, min(num_samples, start + WINDOW_SAMPLES))
+        chunk_start_frame = max(0, (start - SINCNET_OFFSET) // SINCNET_STEP) if start > 0 else 0
+        total_frames = max(0, (total_samples - SINCNET_OFFSET) // SINCNET_STEP)
+        if total_frames > len(speaker_probs):
+            grown = np.zeros((max(total_frames, 2 * len(speaker_probs)), NUM_SPEAKERS), dtype=np.float64)
+            grown[:len(speaker_probs)] = speaker_probs
+            speaker_probs = grown
+        for i in range(chunk_speaker_probs.shape[0]):
+            global_frame = chunk_start_frame + i
+            if global_frame < total_frames:
+                if speaker_probs[global_frame].sum() == 0:
+                    speaker_probs[global_frame] = chunk_speaker_probs[i]
+                else:
+                    speaker_probs[global_frame] = (speaker_probs[global_frame] + chunk_speaker_probs[i]) / 2
+    total_frames = max(0, (total_samples - SINCNET_OFFSET) // SINCNET_STEP)
+    return speaker_probs[:total_frames]
+
+
+def _reference_overlap_regions(speaker_probs: np.ndarray) -> list[dict]:
+    total_frames = len(speaker_probs)
+    overlap_mask = np.zeros(total_frames, dtype=bool)
+    for i in range(total_frames):
+        sorted_probs = np.sort(speaker_probs[i])[::-1]
+        if sorted_probs[1] >= OVERLAP_ONSET:
+            overlap_mask[i] = True
+
+    overlap_regions = []
+    in_overlap = False
+    ov_start = 0.0
+    for i in range(total_frames):
+        t = _frame_to_time(i)
+        if overlap_mask[i] and not in_overlap:
+            in_overlap = True
+            ov_start = t
+        elif not overlap_mask[i] and in_overlap:
+            in_overlap = False
+            ov_end = t
+            if ov_end - ov_start >= MIN_OVERLAP_DURATION:
+                overlap_regions.append({"start": round(ov_start, 3), "end": round(ov_end, 3)})
+    if in_overlap:
+        ov_end = _frame_to_time(total_frames - 1)
+        if ov_end - ov_start >= MIN_OVERLAP_DURATION:
+            overlap_regions.append({"start": round(ov_start, 3), "end": round(ov_end, 3)})
+    return overlap_regions
+
+
+# --- 현재 구현 ---
+
+def _vectorized(windows: list[tuple[int, np.ndarray]], num_samples: int) -> tuple[np.ndarray, list[dict]]:
+    capacity_frames = max(0, (num_samples - SINCNET_OFFSET) // SINCNET_STEP)
+    accumulator = _FrameAccumulator(capacity_frames + WINDOW_SAMPLES // SINCNET_STEP)
+    for start, chunk_speaker_probs in windows:
+        chunk_start_frame = max(0, (start - SINCNET_OFFSET) // SINCNET_STEP) if start > 0 else 0
+        accumulator.add(chunk_start_frame, chunk_speaker_probs)
+    speaker_probs = accumulator.result(capacity_frames)
+    return speaker_probs, _overlap_regions(_overlap_mask(speaker_probs))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[3.2, 10, 10.6, 600, 3600], help="녹음 길이(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    print(f"{'duration':>9} {'frames':>8} {'regions':>8} {'max_diff':>10} {'loop_s':>8} {'vector_s':>9} {'speedup':>8}")
+    for duration in args.durations:
+        num_samples = int(duration * SAMPLE_RATE)
+        windows = _synthetic_windows(num_samples, rng)
+
+        started = time.perf_counter()
+        expected_probs = _reference_aggregate(windows, num_samples)
+        expected_regions = _reference_overlap_regions(expected_probs)
+        loop_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        probs, regions = _vectorized(windows, num_samples)
+        vector_elapsed = time.perf_counter() - started
+
+        same_shape = probs.shape == expected_probs.shape
+        max_diff = float(np.max(np.abs(probs - expected_probs))) if same_shape and len(probs) else 0.0
+        ok = same_shape and max_diff < 1e-9 and regions == expected_regions
+        failed = failed or not ok
+        print(
+            f"{duration:>8.1f}s {len(probs):>8} {len(regions):>8} {max_diff:>10.2e} {loop_elapsed:>8.3f} "
+            f"{vector_elapsed:>9.4f} {loop_elapsed / max(vector_elapsed, 1e-9):>7.1f}x"
+            + ("" if ok else "  MISMATCH")
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
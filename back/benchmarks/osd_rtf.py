@@ -0,0 +1,72 @@
+"""
+OSD 세그멘테이션 배치 크기별 실시간 배율(RTF) 벤치마크
+
+합성 녹음(m4a)을 한 번 PCM 으로 디코딩한 뒤, 배치 크기마다 run_segmentation 을 실행해
+처리 시간 / 오디오 길이(RTF)를 잰다. 배치 1 (윈도우마다 session.run, 기존 방식) 결과와의
+speaker_probs 최대 차이도 함께 출력해 배치 추론이 결과를 바꾸지 않는지 확인한다.
+ONNX 모델이 필요하다 (처음 실행 시 내려받음).
+
+실행 (back/ 에서):
+    python -m benchmarks.osd_rtf
+    python -m benchmarks.osd_rtf --durations 600 3600 --batch-sizes 1 8 32 --repeat 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.osd_memory import make_synthetic_audio
+
+DEFAULT_DURATIONS = [600, 3600]
+DEFAULT_BATCH_SIZES = [1, 4, 8, 16, 32]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS, help="녹음 길이(초)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--repeat", type=int, default=1, help="배치 크기마다 반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "osd_memory_bench"))
+    args = parser.parse_args()
+
+    import numpy as np
+
+    from voice.audio import decode_to_pcm
+    from voice.diarization import _get_session, run_segmentation
+
+    os.makedirs(args.workdir, exist_ok=True)
+    # 모델 다운로드/로딩은 측정에서 뺀다
+    _get_session()
+
+    print(f"{'duration':>9} {'batch':>6} {'elapsed_s':>10} {'rtf':>8} {'speedup':>8} {'max_diff':>10}")
+    for duration in args.durations:
+        source = make_synthetic_audio(duration, args.workdir)
+        pcm_path = tempfile.NamedTemporaryFile(delete=False, suffix=".pcm").name
+        try:
+            decoded = decode_to_pcm(source, pcm_path)
+            # 첫 실행의 메모리 할당/페이지 캐시 영향을 빼기 위한 예열
+            run_segmentation(decoded, batch_size=max(args.batch_sizes))
+
+            baseline_probs = None
+            baseline_elapsed = None
+            for batch_size in sorted(set([1] + args.batch_sizes)):
+                best = float("inf")
+                result = None
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    result = run_segmentation(decoded, batch_size=batch_size)
+                    best = min(best, time.perf_counter() - started)
+                if baseline_probs is None:
+                    baseline_probs, baseline_elapsed = result["speaker_probs"], best
+                max_diff = float(np.max(np.abs(result["speaker_probs"] - baseline_probs))) if len(baseline_probs) else 0.0
+                print(
+                    f"{duration:>8}s {batch_size:>6} {best:>10.2f} {best / decoded.duration:>8.4f} "
+                    f"{baseline_elapsed / best:>7.2f}x {max_diff:>10.2e}"
+                )
+        finally:
+            os.unlink(pcm_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,11 @@
 내담자 관리 API 라우터
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
@@ -15,12 +19,32 @@ from auth.dependencies import get_current_active_user
 from models.user import User
 from config.dependencies import get_s3_client, get_s3_bucket_name
 from logs.logging_util import LoggerSingleton
+from voice.progress import get_progress_broker
 import logging
 
 logger = LoggerSingleton.get_logger(logger_name="client", level=logging.INFO)
 
 router = APIRouter(prefix="/clients", tags=["Clients"])
 
+PROGRESS_KEEPALIVE_SEC = 15
+
+
+def _serialize_upload(upload: VoiceUpload) -> dict:
+    return {
+        "id": upload.id,
+        "session_number": upload.session_number,
+        "status": upload.status,
+        "progress_stage": upload.progress_stage,
+        "audio_duration_sec": upload.audio_duration_sec,
+        "error_message": upload.error_message,
+        "created_at": upload.created_at.isoformat(),
+        "updated_at": upload.updated_at.isoformat() if upload.updated_at else None,
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 @router.post("", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
 def create_client(
@@ -260,14 +284,7 @@ def get_client_voice_records(
             for record in records
         ],
         "uploads": [
-            {
-                "id": upload.id,
-                "session_number": upload.session_number,
-                "status": upload.status,
-                "error_message": upload.error_message,
-                "created_at": upload.created_at.isoformat(),
-                "updated_at": upload.updated_at.isoformat() if upload.updated_at else None,
-            }
+            _serialize_upload(upload)
             for upload in uploads
         ],
     }
@@ -302,14 +319,64 @@ def get_client_upload_status(
 
     return {
         "uploads": [
-            {
-                "id": upload.id,
-                "session_number": upload.session_number,
-                "status": upload.status,
-                "error_message": upload.error_message,
-                "created_at": upload.created_at.isoformat(),
-                "updated_at": upload.updated_at.isoformat() if upload.updated_at else None,
-            }
+            _serialize_upload(upload)
             for upload in uploads
         ],
     }
+
+
+@router.get("/{client_id}/upload-events")
+async def stream_client_upload_events(
+    client_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """특정 내담자의 업로드 진행 상황 스트림 (Server-Sent Events)
+
+    연결 직후 현재 상태를 snapshot 이벤트로 보내고, 이후 워커가 단계를 바꿀 때마다
+    progress 이벤트를 보낸다. upload-status 폴링을 대체한다.
+    """
+    client = db.query(Client).filter(
+        Client.id == client_id,
+        Client.user_id == current_user.id
+    ).first()
+
+    if not client:
+        logger.warning(f"Client not found for upload events: id={client_id}, counselor_id={current_user.id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+
+    user_id = current_user.id
+    broker = get_progress_broker()
+    # 구독을 먼저 등록해야 snapshot 조회와 첫 이벤트 사이의 변경을 놓치지 않는다
+    queue = broker.subscribe(user_id)
+    uploads = db.query(VoiceUpload).filter(
+        VoiceUpload.client_id == client_id,
+        VoiceUpload.user_id == user_id,
+        VoiceUpload.status.in_(["queued", "processing", "failed"]),
+    ).order_by(VoiceUpload.created_at.desc()).all()
+    snapshot = {"uploads": [_serialize_upload(upload) for upload in uploads]}
+
+    async def event_stream():
+        try:
+            yield _sse("snapshot", snapshot)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=PROGRESS_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    # 프록시가 유휴 연결을 끊지 않도록 주석 라인 전송
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.get("client_id") == client_id:
+                    yield _sse("progress", event)
+        finally:
+            broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,13 +6,58 @@
 
 from langsmith import Client as LangSmithClient
 from openai import AsyncOpenAI
+from prometheus_client import Counter, Gauge
+from requests.adapters import HTTPAdapter
 import assemblyai as aai
 import boto3
+import botocore.config
+import requests
+import threading
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 제공자별 keep-alive 연결 풀 크기 (워커 동시 처리 수 이상 권장)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+HTTP_POOL_IN_USE = Gauge("http_pool_in_use", "제공자별 처리 중인 HTTP 요청 수", ["provider"])
+HTTP_POOL_REQUESTS = Counter("http_pool_requests_total", "제공자별 HTTP 요청 수", ["provider"])
+HTTP_POOL_CONNECTIONS_OPENED = Gauge(
+    "http_pool_connections_opened", "제공자별 새로 연 HTTP 연결 수 (요청 수 대비 낮을수록 재사용)", ["provider"]
+)
+
+# 기동 시 TLS 연결을 미리 열어둘 제공자 엔드포인트
+WARMUP_URLS = {
+    "deepgram": "https://api.deepgram.com",
+    "vito": "https://openapi.vito.ai",
+}
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """연결 풀 사용량을 Prometheus 로 내보내는 HTTPAdapter"""
+
+    def __init__(self, provider: str, **kwargs):
+        self.provider = provider
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        HTTP_POOL_IN_USE.labels(provider=self.provider).inc()
+        HTTP_POOL_REQUESTS.labels(provider=self.provider).inc()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            HTTP_POOL_IN_USE.labels(provider=self.provider).dec()
+            self._report_connections()
+
+    def _report_connections(self) -> None:
+        try:
+            pools = self.poolmanager.pools
+            opened = sum(pools[key].num_connections for key in list(pools.keys()))
+            HTTP_POOL_CONNECTIONS_OPENED.labels(provider=self.provider).set(opened)
+        except Exception:
+            pass
+
 # 모든 클라이언트 인스턴스를 담을 컨테이너 클래스
 class ClientContainer:
     def __init__(self):
@@ -27,6 +72,40 @@ class ClientContainer:
         self.mistral_api_key = None
         self.enable_osd = False
         self.s3_client = None
+        self.mistral_client = None
+        self._http_sessions: dict[str, requests.Session] = {}
+        self._http_lock = threading.Lock()
+
+    def http(self, provider: str) -> requests.Session:
+        """제공자별 keep-alive 세션 (프로세스 내 공유, 스레드 안전)"""
+        session = self._http_sessions.get(provider)
+        if session is None:
+            with self._http_lock:
+                session = self._http_sessions.get(provider)
+                if session is None:
+                    session = requests.Session()
+                    adapter = InstrumentedHTTPAdapter(
+                        provider, pool_connections=4, pool_maxsize=HTTP_POOL_SIZE,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._http_sessions[provider] = session
+        return session
+
+    def warm_up(self) -> None:
+        """설정된 제공자 엔드포인트에 TLS 연결을 미리 연다 (실패는 무시)"""
+        targets = dict(WARMUP_URLS)
+        if self.speechmatics_api_url:
+            targets["speechmatics"] = self.speechmatics_api_url
+        if not self.deepgram_api_key:
+            targets.pop("deepgram", None)
+        if not self.vito_client_id:
+            targets.pop("vito", None)
+        for provider, url in targets.items():
+            try:
+                self.http(provider).head(url, timeout=5)
+            except Exception:
+                pass
 
 # 클라이언트들을 초기화하는 함수
 def initialize_clients() -> ClientContainer:
@@ -71,6 +150,11 @@ def initialize_clients() -> ClientContainer:
     mistral_key = os.getenv("MISTRAL_API_KEY")
     if mistral_key:
         container.mistral_api_key = mistral_key
+        try:
+            from mistralai import Mistral as MistralClient
+            container.mistral_client = MistralClient(api_key=mistral_key)
+        except ImportError:
+            pass
 
     # Overlap Speech Detection (pyannote ONNX)
     container.enable_osd = os.getenv("ENABLE_OSD", "false").lower() in ("true", "1", "yes")
@@ -85,7 +169,22 @@ def initialize_clients() -> ClientContainer:
             's3',
             aws_access_key_id=aws_access_key,
             aws_secret_access_key=aws_secret_key,
-            region_name=aws_region
+            region_name=aws_region,
+            config=botocore.config.Config(max_pool_connections=HTTP_POOL_SIZE),
         )
 
     return container
+
+
+_client_container: ClientContainer | None = None
+_client_container_lock = threading.Lock()
+
+
+# 프로세스 공용 클라이언트 레지스트리 (웹 핸들러와 워커가 함께 사용)
+def get_client_container() -> ClientContainer:
+    global _client_container
+    if _client_container is None:
+        with _client_container_lock:
+            if _client_container is None:
+                _client_container = initialize_clients()
+    return _client_container
@@ -2,14 +2,14 @@
 음성 업로드 처리 상태 모델
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 
 class VoiceUpload(Base):
-    """음성 업로드/처리 상태 테이블"""
+    """음성 업로드/처리 상태 테이블 (STT 작업 큐 겸용)"""
 
     __tablename__ = "voice_uploads"
 
@@ -22,6 +22,23 @@ class VoiceUpload(Base):
     error_message = Column(Text, nullable=True)
     voice_record_id = Column(Integer, ForeignKey("voice_records.id", ondelete="SET NULL"), nullable=True)
 
+    # 작업 큐 정보 (worker.py 가 처리)
+    provider = Column(String(30), nullable=True)  # assemblyai, speechmatics, deepgram_nova2, vito, voxtral
+    language_code = Column(String(10), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)  # 워커가 가져간 횟수
+    locked_by = Column(String(100), nullable=True)  # 처리 중인 워커 ID
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # 워커 생존 신호
+    provider_job_id = Column(String(100), nullable=True, index=True)  # 제공자 측 작업 ID (비동기 폴링/재개용)
+    progress_stage = Column(String(30), nullable=True)  # 세부 진행 단계 (downloading, provider-running, ...)
+    run_after = Column(DateTime(timezone=True), nullable=True)  # 이 시각 이후에 다시 가져감 (속도 제한 연기)
+    parked_at = Column(DateTime(timezone=True), nullable=True)  # 제공자 완료 대기(파킹) 시작 시각, 재개 시 NULL
+
+    # 등록 시 ffprobe 로 확인한 오디오 정보 (확인 실패 시 NULL)
+    audio_duration_sec = Column(Float, nullable=True)
+    audio_sample_rate = Column(Integer, nullable=True)
+    audio_channels = Column(Integer, nullable=True)
+    audio_codec = Column(String(30), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -0,0 +1,557 @@
+"""
+상담 기록 AI 분석 (RAG 청킹/임베딩, 상담사 식별, 회기 분석)
+"""
+
+import asyncio
+import json
+import logging
+
+import numpy as np
+from openai import AsyncOpenAI
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from logs.logging_util import LoggerSingleton
+from models.client import Client
+from models.voice_record_goal import VoiceRecordGoal
+from voice.rate_limit import limited_async, openai_key
+from voice.transcript import merge_segments
+
+logger = LoggerSingleton.get_logger(logger_name="voice_analysis", level=logging.INFO)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+CHUNK_MAX_CHARS = 1200
+CHUNK_OVERLAP_LINES = 2
+RAG_TOP_K = 4
+
+
+def build_semantic_chunks(segments: list[dict]) -> list[str]:
+    """발화 세그먼트를 문맥 단위로 묶어 청킹"""
+    chunks: list[str] = []
+    current: list[str] = []
+    current_len = 0
+
+    for seg in segments:
+        speaker = str(seg.get("speaker_id", "")).strip()
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        line = f"{speaker}: {text}" if speaker else text
+        line_len = len(line)
+
+        if current and current_len + line_len + 1 > CHUNK_MAX_CHARS:
+            chunks.append("\n".join(current))
+            if CHUNK_OVERLAP_LINES > 0:
+                current = current[-CHUNK_OVERLAP_LINES:]
+                current_len = sum(len(item) for item in current) + max(0, len(current) - 1)
+            else:
+                current = []
+                current_len = 0
+
+        current.append(line)
+        current_len += line_len + (1 if current_len > 0 else 0)
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
+
+
+def vector_to_pg(embedding: list[float]) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in embedding) + "]"
+
+
+def ensure_vector_tables(db: Session):
+    try:
+        db.execute(text(
+            f"""
+            CREATE TABLE IF NOT EXISTS voice_record_chunks (
+                id SERIAL PRIMARY KEY,
+                voice_record_id INTEGER NOT NULL REFERENCES voice_records(id) ON DELETE CASCADE,
+                client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+                session_number INTEGER,
+                chunk_index INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                embedding vector({EMBEDDING_DIMENSIONS}) NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
+            );
+            """
+        ))
+        db.execute(text(
+            """
+            CREATE INDEX IF NOT EXISTS voice_record_chunks_record_idx
+            ON voice_record_chunks (voice_record_id);
+            """
+        ))
+        db.execute(text(
+            """
+            CREATE INDEX IF NOT EXISTS voice_record_chunks_embedding_idx
+            ON voice_record_chunks USING ivfflat (embedding vector_cosine_ops);
+            """
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to ensure vector tables: {str(e)}")
+        raise
+
+
+async def embed_texts(openai_client: AsyncOpenAI, texts: list[str]) -> list[list[float]]:
+    embeddings: list[list[float]] = []
+    batch_size = 32
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        async with limited_async(openai_key(EMBEDDING_MODEL)):
+            response = await openai_client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=batch,
+            )
+        embeddings.extend([item.embedding for item in response.data])
+    return embeddings
+
+
+RAG_QUERY_TEXTS = [
+    "상담신청 배경을 파악할 수 있는 발화",
+    "내담자의 주호소문제와 핵심 어려움이 드러난 발화",
+    "내담자의 현재 증상이나 상태를 설명한 발화",
+]
+
+# RAG 질의문은 고정이므로 임베딩을 프로세스 내에서 한 번만 계산한다
+_rag_query_embeddings: list[list[float]] | None = None
+_rag_query_lock: asyncio.Lock | None = None
+
+
+async def get_rag_query_embeddings(openai_client: AsyncOpenAI) -> list[list[float]]:
+    global _rag_query_embeddings, _rag_query_lock
+    if _rag_query_embeddings is not None:
+        return _rag_query_embeddings
+    if _rag_query_lock is None:
+        _rag_query_lock = asyncio.Lock()
+    async with _rag_query_lock:
+        if _rag_query_embeddings is None:
+            _rag_query_embeddings = await embed_texts(openai_client, RAG_QUERY_TEXTS)
+    return _rag_query_embeddings
+
+
+async def build_rag_context(
+    db: Session,
+    openai_client: AsyncOpenAI,
+    voice_record_id: int,
+) -> list[str]:
+    """저장된 voice_record_chunks 에서 질의별 유사 청크 검색"""
+    contexts: list[str] = []
+    seen: set[str] = set()
+
+    for embedding in await get_rag_query_embeddings(openai_client):
+        query_embedding = vector_to_pg(embedding)
+        rows = db.execute(
+            text(
+                """
+                SELECT content
+                FROM voice_record_chunks
+                WHERE voice_record_id = :record_id
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :limit
+                """
+            ),
+            {
+                "record_id": voice_record_id,
+                "embedding": query_embedding,
+                "limit": RAG_TOP_K,
+            },
+        ).fetchall()
+
+        for row in rows:
+            content = row[0]
+            if content and content not in seen:
+                contexts.append(content)
+                seen.add(content)
+
+    return contexts
+
+
+def select_rag_context(
+    chunks: list[str],
+    chunk_embeddings: list[list[float]],
+    query_embeddings: list[list[float]],
+    top_k: int = RAG_TOP_K,
+) -> list[str]:
+    """메모리 상의 청크 임베딩으로 build_rag_context 와 같은 검색 수행 (DB 저장 전 사용)"""
+    if not chunks or not chunk_embeddings:
+        return []
+    matrix = np.asarray(chunk_embeddings, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    contexts: list[str] = []
+    seen: set[str] = set()
+    for embedding in query_embeddings:
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        scores = matrix @ query
+        for idx in np.argsort(-scores)[:top_k]:
+            content = chunks[int(idx)]
+            if content and content not in seen:
+                contexts.append(content)
+                seen.add(content)
+    return contexts
+
+
+def format_rag_context(rag_chunks: list[str], fallback_dialogue: str) -> str:
+    if rag_chunks:
+        return "\n\n".join([f"[{idx + 1}] {chunk}" for idx, chunk in enumerate(rag_chunks)])
+    return fallback_dialogue or ""
+
+
+def client_profile(client: Client) -> dict:
+    """프롬프트에 쓰는 내담자 정보 스냅샷 (다른 스레드/루프에서 ORM 지연 로딩을 피하기 위함)"""
+    return {
+        "id": client.id,
+        "name": client.name,
+        "age": client.age,
+        "gender": client.gender,
+        "consultation_background": client.consultation_background,
+        "main_complaint": client.main_complaint,
+        "has_previous_counseling": client.has_previous_counseling,
+        "current_symptoms": client.current_symptoms,
+    }
+
+
+async def generate_first_session_analysis(
+    openai_client: AsyncOpenAI,
+    profile: dict,
+    context_block: str,
+) -> dict:
+    """1회기 재평가 LLM 호출 (DB 접근 없음)"""
+    # 상담 경력 텍스트 변환
+    counseling_history = "있음" if profile["has_previous_counseling"] else "없음"
+
+    prompt = f"""
+당신은 전문 심리 상담사입니다. 1회기 상담 내용을 바탕으로 내담자를 재평가해주세요.
+
+## 내담자 초기 정보
+- 이름: {profile["name"]}
+- 나이: {profile["age"]}세
+- 성별: {profile["gender"]}
+- 초기 상담신청배경: {profile["consultation_background"]}
+- 초기 주호소문제: {profile["main_complaint"]}
+- 상담이전경력: {counseling_history}
+- 초기 증상(본인호소): {profile["current_symptoms"]}
+
+## 1회기 상담 근거 발화
+{context_block}
+
+## 요청사항
+1회기 실제 상담 내용을 바탕으로 다음 3가지를 **전문적이고 상세하게** 재평가해주세요:
+
+1. **상담신청 배경**: 1회기 상담을 통해 파악된 실제 상담신청 배경과 맥락을 전문적 관점에서 분석
+2. **주호소문제**: 1회기 상담에서 드러난 주요 문제들을 심리학적 관점에서 체계적으로 정리
+3. **현재 증상**: 1회기 상담에서 관찰되고 파악된 증상들을 구체적으로 기술
+
+각 항목은 최소 3-4문장 이상으로 전문적이면서도 이해하기 쉽게 작성해주세요.
+텍스트에 근거가 없으면 "확인 불가"라고 명시해주세요.
+**중요**: 모든 값은 반드시 문자열(string) 형식으로 작성해주세요.
+
+JSON 형식으로 응답:
+{{
+    "consultation_background": "1회기 기반 상담신청 배경 분석",
+    "main_complaint": "1회기 기반 주호소문제 분석",
+    "current_symptoms": "1회기 기반 현재 증상 분석"
+}}
+"""
+
+    async with limited_async(openai_key("gpt-4o-mini")):
+        response = await openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "당신은 임상심리 전문가이자 전문 상담사입니다. 1회기 상담 내용을 분석하여 내담자의 실제 상태를 정확히 파악합니다."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7
+        )
+
+    result = json.loads(response.choices[0].message.content)
+
+    # dict 타입의 값들을 JSON 문자열로 변환
+    for key, value in result.items():
+        if isinstance(value, dict):
+            result[key] = json.dumps(value, ensure_ascii=False)
+    return result
+
+
+def apply_first_session_analysis(db: Session, client: Client, result: dict) -> None:
+    """1회기 분석 결과를 내담자 정보에 반영"""
+    client.ai_consultation_background = result.get("consultation_background")
+    client.ai_main_complaint = result.get("main_complaint")
+    client.ai_current_symptoms = result.get("current_symptoms")
+    client.ai_analysis_completed = True
+
+    db.commit()
+    logger.info(f"AI analysis completed for client_id={client.id}")
+
+
+async def analyze_first_session(
+    db: Session,
+    client: Client,
+    voice_record_id: int,
+    fallback_dialogue: str,
+):
+    """1회기 상담 내용을 바탕으로 AI 분석 수행 (RAG 사용)"""
+    try:
+        from config.clients import get_client_container
+        client_container = get_client_container()
+
+        if not client_container.openai_client:
+            logger.warning("OpenAI client not available, skipping AI analysis")
+            return
+
+        try:
+            rag_chunks = await build_rag_context(db, client_container.openai_client, voice_record_id)
+        except Exception as e:
+            logger.warning(f"RAG context build failed, fallback to dialogue: {str(e)}")
+            rag_chunks = []
+
+        result = await generate_first_session_analysis(
+            client_container.openai_client,
+            client_profile(client),
+            format_rag_context(rag_chunks, fallback_dialogue),
+        )
+        apply_first_session_analysis(db, client, result)
+
+    except Exception as e:
+        logger.error(f"AI analysis failed for client_id={client.id}: {str(e)}")
+        # 분석 실패해도 음성 기록 자체는 유지
+
+
+async def generate_next_session_goal(
+    openai_client: AsyncOpenAI,
+    profile: dict,
+    session_number: int | None,
+    dialogue: str,
+) -> str | None:
+    """다음 회기 목표 LLM 호출 (DB 접근 없음)"""
+    context_block = dialogue or ""
+
+    prompt = f"""
+당신은 전문 심리 상담사입니다. 이번 회기 상담 내용을 바탕으로 다음 회기의 상담 목표를 제시해주세요.
+
+## 내담자 기본 정보
+- 이름: {profile["name"]}
+- 나이: {profile["age"]}세
+- 성별: {profile["gender"]}
+- 현재 회기: {session_number or "미상"}회기
+
+## 이번 회기 상담 근거 발화
+{context_block}
+
+## 요청사항
+다음 회기에서 다룰 **상담 목표 3~5개**를 구체적으로 제시해주세요.
+각 항목은 1~2문장으로 간결하고 행동 지향적으로 작성해주세요.
+텍스트에 근거가 없으면 "확인 불가"라고 명시해주세요.
+**중요**: 결과는 반드시 문자열(string) 형태로 반환하세요.
+
+JSON 형식으로 응답:
+{{
+    "next_session_goal": "- 목표 1\\n- 목표 2\\n- 목표 3"
+}}
+"""
+
+    async with limited_async(openai_key("gpt-4o-mini")):
+        response = await openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "당신은 임상심리 전문가이자 전문 상담사입니다. 회기 내용을 바탕으로 다음 회기의 목표를 제시합니다.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.6,
+        )
+
+    result = json.loads(response.choices[0].message.content)
+    goal_text = str(result.get("next_session_goal", "")).strip()
+    return goal_text or None
+
+
+def save_next_session_goal(
+    db: Session,
+    client_id: int,
+    voice_record_id: int,
+    session_number: int | None,
+    goal_text: str,
+) -> None:
+    existing = db.query(VoiceRecordGoal).filter(
+        VoiceRecordGoal.voice_record_id == voice_record_id
+    ).first()
+    if existing:
+        logger.info(f"Next session goal already exists for voice_record_id={voice_record_id}")
+        return
+
+    goal_record = VoiceRecordGoal(
+        voice_record_id=voice_record_id,
+        client_id=client_id,
+        session_number=session_number,
+        next_session_goal=goal_text,
+    )
+    db.add(goal_record)
+    db.commit()
+    logger.info(f"Next session goal saved for voice_record_id={voice_record_id}")
+
+
+async def analyze_next_session_goal(
+    db: Session,
+    client: Client,
+    voice_record_id: int,
+    session_number: int | None,
+    fallback_dialogue: str,
+):
+    """2회기 이상 상담 내용을 바탕으로 다음 회기 목표 제시"""
+    try:
+        from config.clients import get_client_container
+        client_container = get_client_container()
+
+        if not client_container.openai_client:
+            logger.warning("OpenAI client not available, skipping next session goal analysis")
+            return
+
+        existing = db.query(VoiceRecordGoal).filter(
+            VoiceRecordGoal.voice_record_id == voice_record_id
+        ).first()
+        if existing:
+            logger.info(f"Next session goal already exists for voice_record_id={voice_record_id}")
+            return
+
+        goal_text = await generate_next_session_goal(
+            client_container.openai_client, client_profile(client), session_number, fallback_dialogue,
+        )
+        if not goal_text:
+            logger.warning(f"Next session goal empty for voice_record_id={voice_record_id}")
+            return
+
+        save_next_session_goal(db, client.id, voice_record_id, session_number, goal_text)
+    except Exception as e:
+        logger.error(f"Next session goal analysis failed for voice_record_id={voice_record_id}: {str(e)}")
+
+async def identify_counselor_speaker_id(
+    openai_client: AsyncOpenAI | None,
+    segments: list[dict],
+) -> str | None:
+    """병합된 발화 중 앞 5개를 기반으로 상담사 화자 ID를 추정"""
+    if not openai_client:
+        logger.warning("OpenAI client not available, skipping counselor identification")
+        return None
+
+    if not segments:
+        return None
+
+    speaker_ids: list[str] = []
+    for seg in segments:
+        speaker_id = str(seg.get("speaker_id"))
+        if speaker_id not in speaker_ids:
+            speaker_ids.append(speaker_id)
+
+    if len(speaker_ids) < 2:
+        return None
+
+    merged_segments = merge_segments(segments)
+    sample_source = merged_segments if merged_segments else segments
+    sample_segments = sample_source[:5]
+    lines = []
+    for idx, seg in enumerate(sample_segments, start=1):
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        speaker_id = str(seg.get("speaker_id"))
+        lines.append(f"{idx}. 발화자 {speaker_id}: {text}")
+
+    if not lines:
+        return None
+
+    prompt = f"""
+다음은 상담 도입부의 발화 {len(lines)}개입니다.
+발화자 ID는 {speaker_ids} 중 하나입니다.
+상담사(전문가)로 판단되는 발화자 ID를 하나 선택하세요.
+확신이 없으면 null을 반환하세요.
+
+응답은 반드시 JSON 형식으로만 작성:
+{{"counselor_speaker_id": "A", "confidence": 0.0}}
+
+발화 목록:
+{chr(10).join(lines)}
+"""
+
+    try:
+        async with limited_async(openai_key("gpt-4o-mini")):
+            response = await openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "당신은 상담 대화에서 상담사와 내담자를 구분하는 전문가입니다. "
+                            "상담사는 질문, 반영, 정리, 공감, 진행을 주도하는 경향이 있고 "
+                            "내담자는 개인 경험, 감정, 사건을 서술하는 경향이 있습니다."
+                        ),
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                response_format={"type": "json_object"},
+                temperature=0,
+            )
+        result = json.loads(response.choices[0].message.content)
+        counselor_id = result.get("counselor_speaker_id")
+        if counselor_id is None:
+            return None
+        counselor_id = str(counselor_id).strip()
+        if counselor_id not in speaker_ids:
+            logger.warning(
+                f"Counselor speaker id not in list, skipping: {counselor_id}"
+            )
+            return None
+        return counselor_id
+    except Exception as e:
+        logger.warning(f"Counselor identification failed: {str(e)}")
+        return None
+
+
+def store_record_chunks(
+    db: Session,
+    voice_record_id: int,
+    client_id: int,
+    session_number: int | None,
+    chunks: list[str],
+    embeddings: list[list[float]],
+) -> None:
+    """청크와 임베딩을 voice_record_chunks 에 저장"""
+    ensure_vector_tables(db)
+    params_list = [
+        {
+            "voice_record_id": voice_record_id,
+            "client_id": client_id,
+            "session_number": session_number,
+            "chunk_index": idx,
+            "content": chunk,
+            "embedding": vector_to_pg(embedding),
+        }
+        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+    ]
+    db.execute(
+        text(
+            """
+            INSERT INTO voice_record_chunks
+            (voice_record_id, client_id, session_number, chunk_index, content, embedding)
+            VALUES (:voice_record_id, :client_id, :session_number, :chunk_index, :content, CAST(:embedding AS vector))
+            """
+        ),
+        params_list,
+    )
+    db.commit()
@@ -0,0 +1,125 @@
+"""
+백그라운드 작업용 상주 이벤트 루프
+
+워커 스레드에서 코루틴을 실행할 때 매번 asyncio.run() 으로 루프를 만들고 닫는 대신,
+전용 스레드에서 계속 도는 루프 하나에 예약한다.
+제공자 작업 폴러(voice.poller) 처럼 오래 사는 코루틴도 이 루프에서 실행된다.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="async_runtime", level=logging.INFO)
+
+
+class AsyncRuntime:
+    """전용 스레드에서 도는 asyncio 루프"""
+
+    def __init__(self, name: str = "stt-async"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_started()
+        return self._loop
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-loop", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+            logger.info(f"Async runtime started: {self.name}")
+
+    def submit(self, coro: Coroutine) -> Future:
+        """코루틴을 루프에 예약하고 concurrent Future 반환 (스레드 안전)"""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """코루틴을 루프에서 실행하고 결과를 기다림 (루프 스레드 밖에서만 호출)"""
+        if self._thread is threading.current_thread():
+            raise RuntimeError("AsyncRuntime.run() called from its own loop thread")
+        return self.submit(coro).result(timeout=timeout)
+
+    def stop(self) -> None:
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class TaskGraph:
+    """의존 관계가 있는 코루틴 묶음
+
+    각 작업은 의존 작업이 끝나는 즉시 시작되고, 서로 독립인 작업은 동시에 실행된다.
+    작업 함수는 deps 순서대로 의존 작업 결과를 인자로 받는다.
+    """
+
+    def __init__(self):
+        self._nodes: dict[str, tuple[Callable[..., Awaitable], tuple[str, ...]]] = {}
+        self.timings: dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable], *, deps: tuple[str, ...] = ()) -> None:
+        for dep in deps:
+            if dep not in self._nodes:
+                raise ValueError(f"Unknown dependency for {name}: {dep}")
+        self._nodes[name] = (fn, tuple(deps))
+
+    def __bool__(self) -> bool:
+        return bool(self._nodes)
+
+    async def run(self) -> dict[str, Any]:
+        """모든 작업 실행. 실패한 작업은 결과 자리에 예외 객체가 들어간다"""
+        tasks: dict[str, asyncio.Future] = {}
+
+        async def run_node(name: str) -> Any:
+            fn, deps = self._nodes[name]
+            args = [await tasks[dep] for dep in deps]
+            started = time.monotonic()
+            try:
+                return await fn(*args)
+            finally:
+                self.timings[name] = time.monotonic() - started
+
+        for name in self._nodes:
+            tasks[name] = asyncio.ensure_future(run_node(name))
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return dict(zip(tasks.keys(), results))
+
+
+_runtime: Optional[AsyncRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_async_runtime() -> AsyncRuntime:
+    """프로세스 공용 이벤트 루프"""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AsyncRuntime()
+    return _runtime
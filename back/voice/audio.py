@@ -0,0 +1,305 @@
+"""
+작업당 한 번만 만드는 디코딩 오디오 (16 kHz mono int16 PCM)
+
+ffmpeg 로 원본(로컬 파일 또는 presigned URL)을 raw PCM 파일 하나로 디코딩하고,
+OSD 등 샘플이 필요한 단계는 np.memmap 으로 필요한 구간만 읽는다.
+디코딩 비용은 한 번만 내고, 긴 녹음도 전체를 메모리에 올리지 않으므로 최대 RSS 가 일정하다.
+
+PCM 파일 없이 한 번만 훑으면 되는 경우(파이프라인 밖 단독 OSD 등)는 stream_pcm_windows 로
+ffmpeg stdout 을 고정 크기 블록으로 읽어 슬라이딩 윈도우를 바로 만든다.
+메모리에는 윈도우 하나만 머문다.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import time
+from typing import IO, Iterator, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from prometheus_client import Histogram
+
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="audio", level=logging.INFO)
+
+SAMPLE_RATE = 16000
+PCM_DTYPE = np.dtype(np.int16)
+DECODE_TIMEOUT = int(os.getenv("STT_DECODE_TIMEOUT_SEC", "900"))
+
+DECODE_SECONDS = Histogram(
+    "stt_audio_decode_seconds",
+    "원본 오디오를 16 kHz mono PCM 으로 디코딩하는 데 걸린 시간",
+    ["source"],
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900),
+)
+
+
+class DecodedAudio:
+    """raw 16 kHz mono int16 PCM 파일"""
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.num_samples = os.path.getsize(path) // PCM_DTYPE.itemsize
+        self._samples: Optional[np.ndarray] = None
+
+    @property
+    def duration(self) -> float:
+        return self.num_samples / self.sample_rate
+
+    @property
+    def samples(self) -> np.ndarray:
+        """int16 샘플 (memmap — 읽은 페이지만 메모리에 올라온다)"""
+        if self._samples is None:
+            if self.num_samples == 0:
+                self._samples = np.zeros(0, dtype=PCM_DTYPE)
+            else:
+                self._samples = np.memmap(self.path, dtype=PCM_DTYPE, mode="r", shape=(self.num_samples,))
+        return self._samples
+
+    def window(self, start: int, end: int) -> np.ndarray:
+        """[start, end) 구간을 [-1, 1) float32 로 반환"""
+        return self.samples[start:end].astype(np.float32) / 32768.0
+
+    def iter_windows(self, window: int, step: int) -> Iterator[tuple[int, np.ndarray]]:
+        """(시작 샘플, float32 윈도우) 를 step 간격으로 생성 (끝부분 윈도우는 window 보다 짧다)"""
+        for start in range(0, self.num_samples, step):
+            yield start, self.window(start, start + window)
+
+    def iter_window_batches(
+        self, window: int, step: int, batch_size: int
+    ) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """iter_windows 와 같은 윈도우를 batch_size 개씩 묶어 (시작 샘플, 실제 길이, float32 [B, window]) 로 생성
+
+        전체 길이 윈도우는 memmap 위의 sliding_window_view(복사 없는 strided view)에서 배치 단위로만
+        float32 로 변환하고, 끝부분의 짧은 윈도우는 0 으로 채운다.
+        """
+        starts = np.arange(0, self.num_samples, step)
+        num_full = (self.num_samples - window) // step + 1 if self.num_samples >= window else 0
+        views = sliding_window_view(self.samples, window)[::step] if num_full else None
+        for first in range(0, len(starts), batch_size):
+            batch_starts = starts[first:first + batch_size]
+            batch = np.zeros((len(batch_starts), window), dtype=np.float32)
+            full = max(0, min(len(batch_starts), num_full - first))
+            if full:
+                batch[:full] = views[first:first + full]
+            for i in range(full, len(batch_starts)):
+                tail = self.samples[batch_starts[i]:]
+                batch[i, :len(tail)] = tail
+            batch *= 1 / 32768.0
+            yield batch_starts, np.minimum(window, self.num_samples - batch_starts), batch
+
+    def encode(
+        self, dest: str, codec_args: list[str], start: Optional[float] = None, end: Optional[float] = None
+    ) -> str:
+        """PCM 을 다른 포맷으로 다시 인코딩 (원본을 다시 디코딩하지 않음). start/end 초로 구간만 자를 수 있다"""
+        range_args: list[str] = []
+        if start:
+            range_args += ["-ss", f"{start:.3f}"]
+        if end is not None:
+            range_args += ["-t", f"{end - (start or 0.0):.3f}"]
+        result = subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-v", "error", "-y",
+                "-f", "s16le", "-ar", str(self.sample_rate), "-ac", "1", *range_args, "-i", self.path,
+                *codec_args, dest,
+            ],
+            capture_output=True, text=True, timeout=DECODE_TIMEOUT,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {result.stderr[:500]}")
+        return dest
+
+
+def decode_to_pcm(source: str, dest: str) -> DecodedAudio:
+    """원본(로컬 경로 또는 URL)을 16 kHz mono int16 raw PCM 으로 디코딩
+
+    ffmpeg 가 스트리밍으로 변환하므로 원본 길이와 무관하게 메모리 사용량이 일정하다.
+    """
+    source_kind = "url" if source.startswith(("http://", "https://")) else "local"
+    started = time.monotonic()
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", source,
+            "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "-f", "s16le", "-acodec", "pcm_s16le",
+            dest,
+        ],
+        capture_output=True, text=True, timeout=DECODE_TIMEOUT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed: {result.stderr[:500]}")
+    elapsed = time.monotonic() - started
+    DECODE_SECONDS.labels(source=source_kind).observe(elapsed)
+    decoded = DecodedAudio(dest)
+    logger.info(
+        f"[bg] Decoded audio to PCM ({source_kind}): duration={decoded.duration:.1f}s, "
+        f"size={os.path.getsize(dest) / 1024 / 1024:.1f}MB, elapsed={elapsed:.1f}s"
+    )
+    return decoded
+
+
+def decode_channels_to_pcm(source: str, dests: list[str]) -> list[DecodedAudio]:
+    """원본의 앞쪽 채널들을 채널마다 16 kHz mono int16 PCM 파일로 디코딩 (ffmpeg 한 번 실행)
+
+    dests[i] 에 i 번째 채널을 쓴다. 채널 레이아웃 정보가 없는 파일도 되도록 pan 필터로 나눈다.
+    """
+    source_kind = "url" if source.startswith(("http://", "https://")) else "local"
+    count = len(dests)
+    graph = f"[0:a]asplit={count}" + "".join(f"[s{i}]" for i in range(count)) + ";" + ";".join(
+        f"[s{i}]pan=mono|c0=c{i}[c{i}]" for i in range(count)
+    )
+    outputs: list[str] = []
+    for i, dest in enumerate(dests):
+        outputs += ["-map", f"[c{i}]", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-acodec", "pcm_s16le", dest]
+    started = time.monotonic()
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-y", "-i", source, "-filter_complex", graph, *outputs],
+        capture_output=True, text=True, timeout=DECODE_TIMEOUT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg channel decode failed: {result.stderr[:500]}")
+    elapsed = time.monotonic() - started
+    DECODE_SECONDS.labels(source=f"{source_kind}_channels").observe(elapsed)
+    decoded = [DecodedAudio(dest) for dest in dests]
+    logger.info(
+        f"[bg] Decoded {count} channels to PCM ({source_kind}): duration={decoded[0].duration:.1f}s, "
+        f"elapsed={elapsed:.1f}s"
+    )
+    return decoded
+
+
+# ffprobe 가 이 메시지를 내면 네트워크 문제가 아니라 파일 자체가 오디오가 아니거나 손상된 것
+_INVALID_MEDIA_ERRORS = (
+    "invalid data found",
+    "moov atom not found",
+    "could not find codec parameters",
+    "does not contain any stream",
+    "end of file",
+)
+PROBE_URL_EXPIRES = 300
+
+
+def probe_audio(source: str) -> dict:
+    """ffprobe 로 첫 오디오 스트림 정보 조회 (로컬 경로 또는 URL — URL 은 필요한 구간만 Range 로 읽는다)
+
+    Returns: {"status", "duration", "sample_rate", "channels", "codec"} — 알 수 없는 값은 None
+      status: "ok" | "invalid"(오디오가 아니거나 손상) | "unavailable"(ffprobe 실행/네트워크 실패)
+    """
+    info = {"status": "unavailable", "duration": None, "sample_rate": None, "channels": None, "codec": None}
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "a:0",
+                "-show_entries", "stream=codec_name,sample_rate,channels:format=duration",
+                "-of", "json", source,
+            ],
+            capture_output=True, text=True, timeout=30,
+        )
+        if result.returncode != 0:
+            if any(message in result.stderr.lower() for message in _INVALID_MEDIA_ERRORS):
+                info["status"] = "invalid"
+            return info
+        probed = json.loads(result.stdout or "{}")
+    except Exception:
+        return info
+    streams = probed.get("streams") or []
+    if not streams:
+        # 컨테이너는 읽혔지만 오디오 스트림이 없음 (영상 전용, 문서 등)
+        info["status"] = "invalid"
+        return info
+    stream = streams[0]
+    duration = (probed.get("format") or {}).get("duration")
+    info["status"] = "ok"
+    info["duration"] = float(duration) if duration not in (None, "N/A") else None
+    info["sample_rate"] = int(stream["sample_rate"]) if stream.get("sample_rate") else None
+    info["channels"] = int(stream["channels"]) if stream.get("channels") else None
+    info["codec"] = stream.get("codec_name")
+    return info
+
+
+def probe_s3_audio(s3_client, bucket: str, key: str) -> dict:
+    """S3 객체를 내려받지 않고 ffprobe (짧은 presigned URL 로 헤더 구간만 읽음)"""
+    url = s3_client.generate_presigned_url(
+        "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=PROBE_URL_EXPIRES,
+    )
+    started = time.monotonic()
+    info = probe_audio(url)
+    logger.info(
+        f"Probed s3://{bucket}/{key}: status={info['status']}, duration={info['duration']}, "
+        f"codec={info['codec']}, sample_rate={info['sample_rate']}, channels={info['channels']}, "
+        f"elapsed={time.monotonic() - started:.2f}s"
+    )
+    return info
+
+
+def _read_samples(pipe: IO[bytes], count: int) -> np.ndarray:
+    """파이프에서 최대 count 샘플을 읽는다 (EOF 면 더 짧게)"""
+    buffer = bytearray(count * PCM_DTYPE.itemsize)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < len(buffer):
+        n = pipe.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    filled -= filled % PCM_DTYPE.itemsize
+    return np.frombuffer(buffer, dtype=PCM_DTYPE, count=filled // PCM_DTYPE.itemsize)
+
+
+def stream_pcm_windows(source: str, window: int, step: int) -> Iterator[tuple[int, np.ndarray]]:
+    """원본을 ffmpeg 파이프로 디코딩하면서 슬라이딩 윈도우를 생성 (DecodedAudio.iter_windows 와 같은 결과)
+
+    stdout 에서 step 샘플씩 읽어 window 길이 버퍼를 밀어내므로, 녹음 길이와 무관하게
+    메모리에는 윈도우 하나와 읽기 블록 하나만 머문다.
+    """
+    source_kind = "url" if source.startswith(("http://", "https://")) else "local"
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", source,
+            "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "-f", "s16le", "-acodec", "pcm_s16le",
+            "pipe:1",
+        ],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    total_samples = 0
+    try:
+        buffer = _read_samples(proc.stdout, window)
+        total_samples += len(buffer)
+        start = 0
+        while len(buffer) > 0:
+            yield start, buffer.astype(np.float32) / 32768.0
+            if len(buffer) == window:
+                block = _read_samples(proc.stdout, step)
+                total_samples += len(block)
+                buffer = np.concatenate([buffer[step:], block])
+            else:
+                # EOF 이후에는 남은 샘플만 밀어낸다
+                buffer = buffer[step:]
+            start += step
+            if time.monotonic() - started > DECODE_TIMEOUT:
+                raise RuntimeError(f"ffmpeg decode timed out after {DECODE_TIMEOUT}s")
+
+        stderr = proc.stderr.read().decode("utf-8", errors="replace")
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg decode failed: {stderr[:500]}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+    elapsed = time.monotonic() - started
+    DECODE_SECONDS.labels(source=f"{source_kind}_stream").observe(elapsed)
+    logger.info(
+        f"[bg] Streamed audio windows ({source_kind}): duration={total_samples / SAMPLE_RATE:.1f}s, "
+        f"elapsed={elapsed:.1f}s"
+    )
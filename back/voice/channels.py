@@ -0,0 +1,260 @@
+"""
+채널별 화자 녹음(스테레오) 빠른 경로
+
+상담실 녹음기 중에는 상담사와 내담자를 왼쪽/오른쪽 채널에 따로 녹음하는 것이 많다.
+이런 녹음은 채널이 곧 화자이므로 제공자 화자 분리, OSD(voice.diarization), 상담사 식별 LLM 호출이 필요 없다.
+
+  - fetch 단계에서 2채널 녹음(등록 시 확인한 audio_channels)을 채널별 PCM 으로 디코딩하고,
+    프레임 에너지로 채널이 화자별로 나뉘어 있는지 판단한다
+      · 말소리가 있는 프레임에서 두 채널 에너지(dB)의 상관계수가 STT_CHANNEL_SPLIT_MAX_CORRELATION 이하
+        (같은 소리를 담은 듀얼 모노/일반 스테레오는 1 에 가깝고, 화자별 채널은 번갈아 커지므로 낮다)
+      · 대부분의 프레임에서 한쪽 채널이 CHANNEL_DOMINANCE_DB 이상 크고, 양쪽 채널이 모두 일정 비율 이상 우세
+  - 나뉘어 있으면 다른 채널이 훨씬 큰 프레임(옆 마이크로 새어 들어온 소리)을 지운 뒤, 채널마다
+    화자 분리 없이 전사한다 (transcribe_chunk(diarize=False), 두 채널 동시)
+  - 결과는 {"channels": [{"channel", "role", "payload"}], "stats"} 로 저장(결과 캐시 포함)되고,
+    parse 단계에서 채널 역할(STT_COUNSELOR_CHANNEL)을 화자로 붙여 시간순으로 합친다
+"""
+
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+from prometheus_client import Counter
+
+from logs.logging_util import LoggerSingleton
+from voice.audio import DecodedAudio, decode_channels_to_pcm, probe_audio
+from voice.providers import ParsedTranscript
+from voice.rate_limit import RateLimited
+from voice.transcript import rebuild_speakers
+
+if TYPE_CHECKING:
+    from voice.pipeline import JobContext
+    from voice.providers import SttProvider
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+CHANNEL_SPLIT_ENABLED = os.getenv("STT_CHANNEL_SPLIT_ENABLED", "true").lower() in ("true", "1", "yes")
+CHANNEL_SPLIT_PROVIDERS = {
+    name.strip()
+    for name in os.getenv("STT_CHANNEL_SPLIT_PROVIDERS", "assemblyai,voxtral").split(",")
+    if name.strip()
+}
+MAX_CORRELATION = float(os.getenv("STT_CHANNEL_SPLIT_MAX_CORRELATION", "0.3"))
+# 상담사가 녹음되는 채널 (left / right)
+COUNSELOR_CHANNEL = 1 if os.getenv("STT_COUNSELOR_CHANNEL", "left").lower() == "right" else 0
+CHANNEL_ATTEMPTS = int(os.getenv("STT_CHANNEL_ATTEMPTS", "2"))
+
+ENERGY_FRAME_SEC = 0.05
+ENERGY_BLOCK_FRAMES = 1200  # 60초씩 읽는다 (memmap)
+# 잡음 바닥(채널별로 조용한 10% 프레임)보다 이만큼 큰 프레임을 말소리로 본다
+ACTIVE_MARGIN_DB = 10.0
+MIN_ACTIVE_SEC = 30.0
+CHANNEL_DOMINANCE_DB = 6.0
+MIN_DOMINANT_RATIO = 0.6
+MIN_CHANNEL_SHARE = 0.1
+# 지운 구간 앞뒤로 남겨 둘 프레임 (말 시작/끝이 잘리지 않도록)
+GATE_HANGOVER_FRAMES = 4
+
+CHANNEL_CODEC_ARGS = ["-c:a", "flac", "-sample_fmt", "s16"]
+ROLES = ("상담사", "내담자")
+
+CHANNEL_SPLIT_DECISIONS = Counter(
+    "stt_channel_split_total", "2채널 녹음의 채널 분리 판단 결과", ["provider", "outcome"]
+)
+
+
+def channel_split_candidate(ctx: "JobContext") -> bool:
+    provider = ctx.provider
+    if not (
+        CHANNEL_SPLIT_ENABLED
+        and provider.supports_channel_split
+        and provider.name in CHANNEL_SPLIT_PROVIDERS
+    ):
+        return False
+    channels = ctx.upload.audio_channels
+    if channels is None:
+        # 등록 시 확인하지 못한 작업 (이전 작업 등)
+        channels = probe_audio(ctx.presigned_url)["channels"]
+    return channels == 2
+
+
+def _frame_energy_db(audio: DecodedAudio) -> np.ndarray:
+    """ENERGY_FRAME_SEC 프레임별 에너지 (dBFS)"""
+    frame = int(ENERGY_FRAME_SEC * audio.sample_rate)
+    num_frames = audio.num_samples // frame
+    energy = np.empty(num_frames, dtype=np.float32)
+    for first in range(0, num_frames, ENERGY_BLOCK_FRAMES):
+        count = min(ENERGY_BLOCK_FRAMES, num_frames - first)
+        block = audio.samples[first * frame:(first + count) * frame].astype(np.float32) / 32768.0
+        energy[first:first + count] = 10 * np.log10(np.mean(block.reshape(count, frame) ** 2, axis=1) + 1e-10)
+    return energy
+
+
+def measure_separation(left_db: np.ndarray, right_db: np.ndarray) -> dict:
+    """두 채널 프레임 에너지로 화자별 채널 여부 판단
+
+    Returns: {"separated", "correlation", "active_sec", "left_share", "right_share"}
+    """
+    num_frames = min(len(left_db), len(right_db))
+    left_db, right_db = left_db[:num_frames], right_db[:num_frames]
+    stats = {"separated": False, "correlation": None, "active_sec": 0.0, "left_share": 0.0, "right_share": 0.0}
+    if num_frames == 0:
+        return stats
+
+    # 채널별 잡음 바닥 기준 — 화자별 채널은 상대가 말하는 동안 조용하므로 쉼 없는 대화에서도 바닥이 잡힌다
+    active = (left_db > np.percentile(left_db, 10) + ACTIVE_MARGIN_DB) | (
+        right_db > np.percentile(right_db, 10) + ACTIVE_MARGIN_DB
+    )
+    stats["active_sec"] = float(active.sum() * ENERGY_FRAME_SEC)
+    if stats["active_sec"] < MIN_ACTIVE_SEC:
+        return stats
+
+    left, right = left_db[active], right_db[active]
+    if left.std() == 0 or right.std() == 0:
+        # 한쪽이 완전히 무음 — 상관계수는 정의되지 않지만 분리 녹음도 아니다
+        correlation = 0.0
+    else:
+        correlation = float(np.corrcoef(left, right)[0, 1])
+    difference = left - right
+    stats["correlation"] = round(correlation, 3)
+    stats["left_share"] = round(float(np.mean(difference >= CHANNEL_DOMINANCE_DB)), 3)
+    stats["right_share"] = round(float(np.mean(difference <= -CHANNEL_DOMINANCE_DB)), 3)
+    stats["separated"] = (
+        correlation <= MAX_CORRELATION
+        and stats["left_share"] + stats["right_share"] >= MIN_DOMINANT_RATIO
+        and min(stats["left_share"], stats["right_share"]) >= MIN_CHANNEL_SHARE
+    )
+    return stats
+
+
+def _gate_bleed(audio: DecodedAudio, own_db: np.ndarray, other_db: np.ndarray) -> float:
+    """다른 채널이 CHANNEL_DOMINANCE_DB 이상 큰 프레임을 0 으로 (PCM 파일 제자리 수정). 지운 길이(초) 반환"""
+    num_frames = min(len(own_db), len(other_db))
+    keep = own_db[:num_frames] > other_db[:num_frames] - CHANNEL_DOMINANCE_DB
+    window = np.ones(2 * GATE_HANGOVER_FRAMES + 1, dtype=np.int32)
+    keep = np.convolve(keep.astype(np.int32), window, mode="same") > 0
+    edges = np.diff(np.concatenate(([0], (~keep).astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return 0.0
+
+    frame = int(ENERGY_FRAME_SEC * audio.sample_rate)
+    samples = np.memmap(audio.path, dtype=audio.samples.dtype, mode="r+", shape=(audio.num_samples,))
+    for start, end in zip(starts, ends):
+        samples[start * frame:end * frame] = 0
+    samples.flush()
+    del samples
+    return float((ends - starts).sum() * ENERGY_FRAME_SEC)
+
+
+def split_channels(ctx: "JobContext") -> bool:
+    """채널별 PCM 으로 디코딩해 화자별 채널인지 판단. 맞으면 ctx.channel_pcm 을 채우고 True"""
+    provider_name = ctx.provider.name
+    started = time.monotonic()
+    dests = []
+    for _ in range(2):
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pcm")
+        temp_file.close()
+        ctx.temp_paths.append(temp_file.name)
+        dests.append(temp_file.name)
+    try:
+        channels = decode_channels_to_pcm(ctx.local_audio_path or ctx.presigned_url, dests)
+        energies = [_frame_energy_db(channel) for channel in channels]
+    except Exception as e:
+        CHANNEL_SPLIT_DECISIONS.labels(provider=provider_name, outcome="error").inc()
+        logger.warning(f"[bg] Channel split check failed, using the regular path: {str(e)}")
+        return False
+
+    stats = measure_separation(*energies)
+    CHANNEL_SPLIT_DECISIONS.labels(
+        provider=provider_name, outcome="separated" if stats["separated"] else "mixed"
+    ).inc()
+    logger.info(
+        f"[bg] Channel split check: upload_id={ctx.upload_id}, {stats}, "
+        f"elapsed={time.monotonic() - started:.1f}s"
+    )
+    if not stats["separated"]:
+        return False
+
+    gated = [
+        _gate_bleed(channels[0], energies[0], energies[1]),
+        _gate_bleed(channels[1], energies[1], energies[0]),
+    ]
+    logger.info(f"[bg] Muted cross-channel bleed: left={gated[0]:.1f}s, right={gated[1]:.1f}s")
+    ctx.channel_pcm = channels
+    ctx.channel_stats = stats
+    return True
+
+
+def transcribe_channels(ctx: "JobContext") -> dict:
+    """채널마다 화자 분리 없이 동시에 전사하고 채널별 원본 응답을 묶어 반환"""
+    provider = ctx.provider
+
+    def run_channel(index: int) -> dict:
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".flac")
+        temp_file.close()
+        ctx.temp_paths.append(temp_file.name)
+        ctx.channel_pcm[index].encode(temp_file.name, CHANNEL_CODEC_ARGS)
+        for attempt in range(1, CHANNEL_ATTEMPTS + 1):
+            try:
+                return provider.transcribe_chunk(ctx, temp_file.name, diarize=False)
+            except RateLimited:
+                # 제공자 한도 대기 상한을 넘김 — 고정 간격 재시도 대신 작업을 큐로 되돌린다
+                raise
+            except Exception as e:
+                if attempt == CHANNEL_ATTEMPTS:
+                    raise
+                logger.warning(
+                    f"[bg] Channel {index} transcription failed (attempt {attempt}/{CHANNEL_ATTEMPTS}), "
+                    f"retrying: {str(e)}"
+                )
+                time.sleep(2 * attempt)
+        raise RuntimeError("unreachable")
+
+    logger.info(f"[bg] Transcribing channels separately ({provider.display_name}), diarization off")
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="stt-channel") as pool:
+        payloads = list(pool.map(run_channel, range(2)))
+    return {
+        "channels": [
+            {"channel": index, "role": ROLES[0] if index == COUNSELOR_CHANNEL else ROLES[1], "payload": payload}
+            for index, payload in enumerate(payloads)
+        ],
+        "stats": ctx.channel_stats,
+    }
+
+
+def merge_channels(provider: "SttProvider", ctx: "JobContext", payload: dict) -> ParsedTranscript:
+    """채널별 응답을 파싱해 채널 역할을 화자로 붙이고 시간순으로 합친다"""
+    segments: list[dict] = []
+    words: list[dict] = []
+    audio_events: list[dict] = []
+    durations: list[float] = []
+
+    for channel in payload["channels"]:
+        parsed = provider.parse(ctx, channel["payload"] or {})
+        for seg in parsed.segments:
+            seg["speaker_id"] = channel["role"]
+            segments.append(seg)
+        for word in parsed.words:
+            if "speaker_id" in word:
+                word["speaker_id"] = channel["role"]
+            words.append(word)
+        audio_events.extend(parsed.audio_events)
+        if parsed.duration:
+            durations.append(parsed.duration)
+
+    segments.sort(key=lambda seg: seg["start_time"])
+    words.sort(key=lambda word: word["start_time"])
+    full_transcript = " ".join(str(seg.get("text") or "").strip() for seg in segments).strip()
+    return ParsedTranscript(
+        segments=segments,
+        speakers=rebuild_speakers(segments),
+        full_transcript=full_transcript,
+        words=words,
+        audio_events=audio_events,
+        duration=max(durations) if durations else None,
+    )
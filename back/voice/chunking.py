@@ -0,0 +1,243 @@
+"""
+긴 세션 분할 병렬 전사
+
+2시간 세션을 한 요청으로 보내면 처리 시간이 길이에 비례하고, 한 번 실패하면 전체를 다시 보내야 한다.
+STT_CHUNK_MIN_SEC 이상인 녹음은 디코딩한 PCM(voice.audio) 에서 STT_CHUNK_TARGET_SEC(기본 10분) 근처의
+가장 긴 무음에서 자르고, 조각을 FLAC 으로 만들어 동시에 전사한다.
+
+  - 조각은 앞 조각과 STT_CHUNK_OVERLAP_SEC 만큼 겹치게 잘라, 겹친 구간에서 같은 시간에 말한
+    화자끼리 이어 붙인다 (제공자는 조각마다 화자 ID 를 새로 붙이므로)
+  - 실패한 조각만 STT_CHUNK_ATTEMPTS 회까지 다시 보낸다
+  - 결과는 {"chunks": [{"offset", "cut_start", "cut_end", "payload"}]} 로 저장(결과 캐시 포함)되고,
+    parse 단계에서 조각별로 파싱한 뒤 시간 오프셋을 더해 하나의 세그먼트 목록으로 잇는다
+"""
+
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from prometheus_client import Counter, Histogram
+
+from logs.logging_util import LoggerSingleton
+from voice.audio import DecodedAudio
+from voice.providers import ParsedTranscript
+from voice.rate_limit import RateLimited
+from voice.transcript import rebuild_speakers
+
+if TYPE_CHECKING:
+    from voice.pipeline import JobContext
+    from voice.providers import SttProvider
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+CHUNKED_PROVIDERS = {
+    name.strip()
+    for name in os.getenv("STT_CHUNKED_PROVIDERS", "assemblyai,voxtral").split(",")
+    if name.strip()
+}
+CHUNK_MIN_SEC = float(os.getenv("STT_CHUNK_MIN_SEC", "1800"))
+CHUNK_TARGET_SEC = float(os.getenv("STT_CHUNK_TARGET_SEC", "600"))
+CHUNK_SEARCH_SEC = float(os.getenv("STT_CHUNK_SEARCH_SEC", "60"))
+CHUNK_OVERLAP_SEC = float(os.getenv("STT_CHUNK_OVERLAP_SEC", "20"))
+CHUNK_CONCURRENCY = int(os.getenv("STT_CHUNK_CONCURRENCY", "4"))
+CHUNK_ATTEMPTS = int(os.getenv("STT_CHUNK_ATTEMPTS", "3"))
+
+# 무음 판단용 에너지 프레임
+ENERGY_FRAME_SEC = 0.05
+
+CHUNK_CODEC_ARGS = ["-c:a", "flac", "-sample_fmt", "s16"]
+
+CHUNK_COUNT = Histogram(
+    "stt_chunked_pieces", "분할 전사한 녹음 하나의 조각 수", ["provider"], buckets=(2, 3, 4, 6, 8, 12, 18, 24)
+)
+CHUNK_RETRIES = Counter("stt_chunk_retries_total", "다시 전사한 조각 수", ["provider"])
+
+
+def chunking_enabled(provider: "SttProvider", duration: Optional[float]) -> bool:
+    return (
+        provider.supports_chunking
+        and provider.name in CHUNKED_PROVIDERS
+        and duration is not None
+        and duration >= CHUNK_MIN_SEC
+    )
+
+
+def _quietest_point(audio: DecodedAudio, start: float, end: float) -> float:
+    """[start, end) 초 구간에서 가장 긴 무음 구간의 가운데 시각"""
+    frame = int(ENERGY_FRAME_SEC * audio.sample_rate)
+    first = int(start * audio.sample_rate)
+    samples = audio.samples[first:int(end * audio.sample_rate)]
+    num_frames = len(samples) // frame
+    if num_frames == 0:
+        return (start + end) / 2
+    frames = samples[:num_frames * frame].astype(np.float32).reshape(num_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-9)
+    # 구간 안에서 가장 조용한 20% 를 무음으로 본다 (녹음마다 잡음 수준이 달라 절대값 대신 상대값)
+    silent = energy_db <= np.percentile(energy_db, 20)
+
+    best_start, best_len, run_start = 0, 0, None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start > best_len:
+                best_start, best_len = run_start, i - run_start
+            run_start = None
+    return start + (best_start + best_len / 2) * frame / audio.sample_rate
+
+
+def plan_cuts(audio: DecodedAudio) -> list[float]:
+    """조각 경계(초) 목록 — 처음 0, 마지막은 전체 길이"""
+    duration = audio.duration
+    cuts = [0.0]
+    while duration - cuts[-1] > CHUNK_TARGET_SEC * 1.5:
+        target = cuts[-1] + CHUNK_TARGET_SEC
+        cuts.append(_quietest_point(audio, target - CHUNK_SEARCH_SEC, target + CHUNK_SEARCH_SEC))
+    cuts.append(duration)
+    return cuts
+
+
+def transcribe_chunked(ctx: "JobContext") -> dict:
+    """디코딩한 오디오를 조각으로 나눠 동시에 전사하고 조각별 원본 응답을 묶어 반환"""
+    provider = ctx.provider
+    audio = ctx.decoded_audio()
+    cuts = plan_cuts(audio)
+    chunks = [
+        {"offset": max(0.0, cut_start - CHUNK_OVERLAP_SEC), "cut_start": cut_start, "cut_end": cut_end}
+        for cut_start, cut_end in zip(cuts, cuts[1:])
+    ]
+    CHUNK_COUNT.labels(provider=provider.name).observe(len(chunks))
+    logger.info(
+        f"[bg] Chunked transcription ({provider.display_name}): duration={audio.duration:.1f}s, "
+        f"chunks={len(chunks)}, cuts={[round(cut, 1) for cut in cuts[1:-1]]}"
+    )
+
+    def run_chunk(index: int) -> dict:
+        chunk = chunks[index]
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".flac")
+        temp_file.close()
+        ctx.temp_paths.append(temp_file.name)
+        audio.encode(temp_file.name, CHUNK_CODEC_ARGS, start=chunk["offset"], end=chunk["cut_end"])
+        for attempt in range(1, CHUNK_ATTEMPTS + 1):
+            started = time.monotonic()
+            try:
+                payload = provider.transcribe_chunk(ctx, temp_file.name)
+                logger.info(
+                    f"[bg] Chunk {index + 1}/{len(chunks)} transcribed in {time.monotonic() - started:.1f}s "
+                    f"({chunk['offset']:.1f}-{chunk['cut_end']:.1f}s)"
+                )
+                return payload
+            except RateLimited:
+                # 제공자 한도 대기 상한을 넘김 — 고정 간격 재시도 대신 작업을 큐로 되돌린다
+                raise
+            except Exception as e:
+                if attempt == CHUNK_ATTEMPTS:
+                    raise
+                CHUNK_RETRIES.labels(provider=provider.name).inc()
+                logger.warning(
+                    f"[bg] Chunk {index + 1}/{len(chunks)} failed (attempt {attempt}/{CHUNK_ATTEMPTS}), "
+                    f"retrying: {str(e)}"
+                )
+                time.sleep(2 * attempt)
+        raise RuntimeError("unreachable")
+
+    workers = max(1, min(CHUNK_CONCURRENCY, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt-chunk") as pool:
+        payloads = list(pool.map(run_chunk, range(len(chunks))))
+    for chunk, payload in zip(chunks, payloads):
+        chunk["payload"] = payload
+    return {"chunks": chunks}
+
+
+def _shift(items: list[dict], offset: float) -> list[dict]:
+    shifted = []
+    for item in items:
+        item = dict(item)
+        for key in ("start_time", "end_time"):
+            if key in item:
+                item[key] = float(item[key] or 0.0) + offset
+        shifted.append(item)
+    return shifted
+
+
+def _midpoint(item: dict) -> float:
+    return (float(item.get("start_time") or 0.0) + float(item.get("end_time") or 0.0)) / 2
+
+
+def _match_speakers(
+    previous: list[dict], current: list[dict], zone_start: float, zone_end: float
+) -> dict[str, str]:
+    """겹친 구간에서 함께 말한 시간이 가장 긴 화자끼리 1:1 로 짝짓기 (현재 조각 ID → 이전 ID)"""
+    overlap: dict[tuple[str, str], float] = {}
+    previous_in_zone = [seg for seg in previous if seg["end_time"] > zone_start and seg["start_time"] < zone_end]
+    for seg in current:
+        seg_start, seg_end = max(seg["start_time"], zone_start), min(seg["end_time"], zone_end)
+        if seg_end <= seg_start:
+            continue
+        for prev in previous_in_zone:
+            shared = min(seg_end, prev["end_time"]) - max(seg_start, prev["start_time"])
+            if shared > 0:
+                key = (str(seg["speaker_id"]), str(prev["speaker_id"]))
+                overlap[key] = overlap.get(key, 0.0) + shared
+
+    mapping: dict[str, str] = {}
+    used: set[str] = set()
+    for (current_id, previous_id), _ in sorted(overlap.items(), key=lambda item: -item[1]):
+        if current_id in mapping or previous_id in used:
+            continue
+        mapping[current_id] = previous_id
+        used.add(previous_id)
+    return mapping
+
+
+def stitch_chunks(provider: "SttProvider", ctx: "JobContext", payload: dict) -> ParsedTranscript:
+    """조각별 응답을 파싱해 시간 오프셋을 더하고, 화자 ID 를 맞춘 뒤 하나로 잇는다"""
+    segments: list[dict] = []
+    words: list[dict] = []
+    audio_events: list[dict] = []
+    known_ids: set[str] = set()
+
+    for index, chunk in enumerate(payload["chunks"]):
+        parsed = provider.parse(ctx, chunk["payload"] or {})
+        offset, cut_start, cut_end = chunk["offset"], chunk["cut_start"], chunk["cut_end"]
+        chunk_segments = _shift(parsed.segments, offset)
+        chunk_words = _shift(parsed.words, offset)
+        chunk_events = _shift(parsed.audio_events, offset)
+
+        # 겹친 구간(offset ~ cut_start)으로 이전 조각과 화자 ID 를 맞추고, 짝이 없는 화자는 새 ID 를 준다
+        mapping = _match_speakers(segments, chunk_segments, offset, cut_start) if index else {}
+        for speaker_id in {str(seg["speaker_id"]) for seg in chunk_segments}:
+            if speaker_id in mapping:
+                continue
+            new_id = speaker_id if speaker_id not in known_ids else f"{speaker_id}-{index + 1}"
+            mapping[speaker_id] = new_id
+        known_ids.update(mapping.values())
+        if index and mapping:
+            logger.info(f"[bg] Chunk {index + 1} speaker mapping: {mapping}")
+
+        is_last = index == len(payload["chunks"]) - 1
+        for items, target in ((chunk_segments, segments), (chunk_words, words), (chunk_events, audio_events)):
+            for item in items:
+                # 겹친 구간은 이전 조각 결과를 쓰고, 경계를 넘는 항목은 가운데 시각으로 한 조각에만 넣는다
+                midpoint = _midpoint(item)
+                if midpoint < cut_start or (midpoint >= cut_end and not is_last):
+                    continue
+                if "speaker_id" in item:
+                    item["speaker_id"] = mapping.get(str(item["speaker_id"]), item["speaker_id"])
+                target.append(item)
+
+    segments.sort(key=lambda seg: seg["start_time"])
+    words.sort(key=lambda word: word["start_time"])
+    full_transcript = " ".join(str(seg.get("text") or "").strip() for seg in segments).strip()
+    return ParsedTranscript(
+        segments=segments,
+        speakers=rebuild_speakers(segments),
+        full_transcript=full_transcript,
+        words=words,
+        audio_events=audio_events,
+        duration=payload["chunks"][-1]["cut_end"] if payload["chunks"] else None,
+    )
@@ -17,39 +17,103 @@ powerset 클래스:
 모델: onnx-community/pyannote-segmentation-3.0 (MIT, 인증 불필요)
 """
 
+import hashlib
 import logging
 import os
-import tempfile
-from typing import Optional
+import threading
+import time
+from typing import Iterator, Optional, Union
 
 import numpy as np
 import onnxruntime as ort
 
 from logs.logging_util import LoggerSingleton
+from voice.audio import SAMPLE_RATE, DecodedAudio, stream_pcm_windows
 
 logger = LoggerSingleton.get_logger(logger_name="diarization", level=logging.INFO)
 
 # --- 상수 ---
-SAMPLE_RATE = 16000
 WINDOW_DURATION = 10  # 초
 WINDOW_SAMPLES = WINDOW_DURATION * SAMPLE_RATE  # 160000
 STEP_SAMPLES = WINDOW_SAMPLES // 2  # 5초 스텝 (50% 오버랩)
 NUM_SPEAKERS = 3  # powerset은 최대 3화자
+# session.run 한 번에 넣는 윈도우 수 ([B, 1, 160000]) — 호출 오버헤드를 줄이고 배치 단위 SIMD 연산을 쓴다
+BATCH_SIZE = max(1, int(os.getenv("OSD_BATCH_SIZE", "16")))
 
 OVERLAP_CLASSES = {4, 5, 6}
 
+# 겹침 판정: 두 번째로 높은 화자 확률이 이 값 이상 (0.5→0.7: false positive 줄이기 위해 상향)
+OVERLAP_ONSET = 0.7
+MIN_OVERLAP_DURATION = 0.3  # 초
+
 SINCNET_OFFSET = 721
 SINCNET_STEP = 270
 
-MODEL_URL = "https://huggingface.co/onnx-community/pyannote-segmentation-3.0/resolve/main/onnx/model.onnx"
-MODEL_DIR = os.path.join(tempfile.gettempdir(), "pyannote_onnx")
+MODEL_URL = os.getenv(
+    "OSD_MODEL_URL",
+    "https://huggingface.co/onnx-community/pyannote-segmentation-3.0/resolve/main/onnx/model.onnx",
+)
+# 재시작해도 남는 위치에 둔다 (컨테이너라면 볼륨 경로로 지정). 임시 디렉터리는 재부팅/정리 때 사라진다
+MODEL_DIR = os.getenv(
+    "OSD_MODEL_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "voice-split-rag", "pyannote_onnx"),
+)
 MODEL_PATH = os.path.join(MODEL_DIR, "segmentation-3.0.onnx")
-
+CHECKSUM_PATH = MODEL_PATH + ".sha256"
+# 기대 SHA-256 (설정하면 다운로드/로드 때마다 비교). 없으면 Hugging Face 가 알려주는 LFS 해시와 비교한다
+MODEL_SHA256 = os.getenv("OSD_MODEL_SHA256", "").strip().lower() or None
+
+# ONNX Runtime 세션 옵션 (0 = ORT 기본값). diarize_refine 단계 동시 실행 수 × intra 스레드가 코어 수를 넘지 않게 잡는다
+INTRA_OP_THREADS = int(os.getenv("OSD_INTRA_OP_THREADS", "0"))
+INTER_OP_THREADS = int(os.getenv("OSD_INTER_OP_THREADS", "0"))
+GRAPH_OPTIMIZATION = os.getenv("OSD_GRAPH_OPTIMIZATION", "all").lower()
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+# InferenceSession.run 은 여러 스레드에서 동시에 불러도 안전하므로 프로세스당 세션 하나를 공유한다
 _session: Optional[ort.InferenceSession] = None
+_session_lock = threading.Lock()
+# 모델 입력의 배치 축이 고정 크기인지 (세션 로딩 시 한 번 확인, 고정이면 윈도우마다 실행)
+_batch_axis_fixed = False
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify_model() -> bool:
+    """저장된 모델이 기록해 둔 해시(및 OSD_MODEL_SHA256)와 같은지"""
+    if not os.path.exists(MODEL_PATH):
+        return False
+    actual = _file_sha256(MODEL_PATH)
+    if not os.path.exists(CHECKSUM_PATH):
+        # 직접 넣어 둔 모델 (오프라인 배포 등) — 기대 해시가 있어야 받아들인다
+        if MODEL_SHA256 and actual == MODEL_SHA256:
+            with open(CHECKSUM_PATH, "w") as f:
+                f.write(actual + "\n")
+            return True
+        return False
+    with open(CHECKSUM_PATH) as f:
+        recorded = f.read().strip().lower()
+    if actual != recorded or (MODEL_SHA256 and actual != MODEL_SHA256):
+        logger.warning(
+            f"ONNX model checksum mismatch: actual={actual}, recorded={recorded}, expected={MODEL_SHA256} "
+            f"— downloading again"
+        )
+        return False
+    return True
 
 
 def _download_model() -> str:
-    if os.path.exists(MODEL_PATH):
+    if _verify_model():
         logger.info(f"ONNX model already cached: {MODEL_PATH}")
         return MODEL_PATH
 
@@ -59,35 +123,93 @@ def _download_model() -> str:
     import requests as req
     resp = req.get(MODEL_URL, stream=True, timeout=120)
     resp.raise_for_status()
-
-    tmp_path = MODEL_PATH + ".tmp"
-    with open(tmp_path, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=1024 * 1024):
-            if chunk:
-                f.write(chunk)
-    os.rename(tmp_path, MODEL_PATH)
+    # Hugging Face LFS 파일은 X-Linked-ETag 에 SHA-256 을 준다
+    published = resp.headers.get("X-Linked-ETag", "").strip('"').lower()
+    expected = MODEL_SHA256 or (published if len(published) == 64 else None)
+
+    # 다른 프로세스(웹/워커)가 동시에 받아도 서로의 임시 파일을 덮어쓰지 않도록 pid 를 붙인다
+    tmp_path = f"{MODEL_PATH}.{os.getpid()}.tmp"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=1024 * 1024):
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+        actual = digest.hexdigest()
+        if expected and actual != expected:
+            raise RuntimeError(f"ONNX model checksum mismatch: expected={expected}, actual={actual}")
+        os.replace(tmp_path, MODEL_PATH)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    with open(CHECKSUM_PATH, "w") as f:
+        f.write(actual + "\n")
 
     size_mb = os.path.getsize(MODEL_PATH) / (1024 * 1024)
-    logger.info(f"ONNX model downloaded: {size_mb:.1f}MB → {MODEL_PATH}")
+    logger.info(
+        f"ONNX model downloaded: {size_mb:.1f}MB → {MODEL_PATH} "
+        f"(sha256={actual}, verified={'yes' if expected else 'no published hash'})"
+    )
     return MODEL_PATH
 
 
+def _session_options() -> ort.SessionOptions:
+    options = ort.SessionOptions()
+    options.graph_optimization_level = _GRAPH_OPTIMIZATION_LEVELS.get(
+        GRAPH_OPTIMIZATION, ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    )
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    if INTRA_OP_THREADS > 0:
+        options.intra_op_num_threads = INTRA_OP_THREADS
+    if INTER_OP_THREADS > 0:
+        options.inter_op_num_threads = INTER_OP_THREADS
+    return options
+
+
 def _get_session() -> ort.InferenceSession:
-    global _session
+    """프로세스 공용 세션 (처음 부른 스레드만 다운로드/로딩하고 나머지는 기다린다)"""
+    global _session, _batch_axis_fixed
     if _session is not None:
         return _session
-
-    model_path = _download_model()
-    logger.info("Loading ONNX segmentation model...")
-    _session = ort.InferenceSession(
-        model_path,
-        providers=["CPUExecutionProvider"],
-    )
-    input_info = _session.get_inputs()[0]
-    logger.info(f"ONNX model loaded: input={input_info.name}, shape={input_info.shape}")
+    with _session_lock:
+        if _session is not None:
+            return _session
+
+        model_path = _download_model()
+        logger.info("Loading ONNX segmentation model...")
+        started = time.monotonic()
+        session = ort.InferenceSession(
+            model_path,
+            sess_options=_session_options(),
+            providers=["CPUExecutionProvider"],
+        )
+        input_info = session.get_inputs()[0]
+        # 동적 축은 이름(str)이나 None, 고정 축은 정수로 나온다
+        _batch_axis_fixed = isinstance(input_info.shape[0], int)
+        logger.info(
+            f"ONNX model loaded: input={input_info.name}, shape={input_info.shape}, "
+            f"batch_axis={'fixed' if _batch_axis_fixed else 'dynamic'}, "
+            f"optimization={GRAPH_OPTIMIZATION}, intra_op_threads={INTRA_OP_THREADS or 'default'}, "
+            f"inter_op_threads={INTER_OP_THREADS or 'default'}, elapsed={time.monotonic() - started:.2f}s"
+        )
+        _session = session
     return _session
 
 
+def warm_up_segmentation() -> None:
+    """모델 다운로드/로딩과 더미 배치 추론을 미리 실행 (첫 OSD 작업의 콜드 스타트 제거, 실패는 로그만)"""
+    try:
+        started = time.monotonic()
+        session = _get_session()
+        batch_size = _effective_batch_size(BATCH_SIZE)
+        dummy = np.zeros((batch_size, WINDOW_SAMPLES), dtype=np.float32)
+        _run_batch(session, session.get_inputs()[0].name, dummy)
+        logger.info(f"OSD warm-up complete: batch_size={batch_size}, elapsed={time.monotonic() - started:.2f}s")
+    except Exception as e:
+        logger.warning(f"OSD warm-up failed: {str(e)}")
+
+
 def _frame_to_time(frame_idx: int, chunk_offset_samples: int = 0) -> float:
     sample = (frame_idx * SINCNET_STEP) + SINCNET_OFFSET + chunk_offset_samples
     return sample / SAMPLE_RATE
@@ -98,20 +220,112 @@ def _time_to_frame(time_sec: float) -> int:
     return max(0, (sample - SINCNET_OFFSET) // SINCNET_STEP)
 
 
-def _load_audio_as_mono16k(audio_path: str) -> np.ndarray:
-    from pydub import AudioSegment
-    audio = AudioSegment.from_file(audio_path)
-    audio = audio.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
-    samples = np.frombuffer(audio.raw_data, dtype=np.int16).astype(np.float32)
-    samples = samples / 32768.0
-    return samples
-
-
 def _softmax(logits: np.ndarray) -> np.ndarray:
     exp = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
     return exp / np.sum(exp, axis=-1, keepdims=True)
 
 
+def _batch_stream(
+    windows: Iterator[tuple[int, np.ndarray]], batch_size: int
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """(시작 샘플, 윈도우) 스트림을 DecodedAudio.iter_window_batches 와 같은 배치로 묶는다"""
+    starts: list[int] = []
+    lengths: list[int] = []
+    batch = np.zeros((batch_size, WINDOW_SAMPLES), dtype=np.float32)
+    for start, chunk in windows:
+        batch[len(starts), :len(chunk)] = chunk
+        batch[len(starts), len(chunk):] = 0
+        starts.append(start)
+        lengths.append(len(chunk))
+        if len(starts) == batch_size:
+            yield np.array(starts), np.array(lengths), batch.copy()
+            starts, lengths = [], []
+    if starts:
+        yield np.array(starts), np.array(lengths), batch[:len(starts)].copy()
+
+
+def _effective_batch_size(batch_size: int) -> int:
+    """배치 축이 고정된 모델 파일이면 1"""
+    return 1 if _batch_axis_fixed else max(1, batch_size)
+
+
+def _run_batch(session: ort.InferenceSession, input_name: str, batch: np.ndarray) -> np.ndarray:
+    """[B, WINDOW_SAMPLES] → logits [B, num_frames, 7]
+
+    배치 추론이 실패하면(메모리 부족 등) 이 배치만 윈도우마다 나눠 다시 실행한다.
+    다음 배치와 다른 작업은 그대로 배치로 추론한다.
+    """
+    if len(batch) > 1:
+        try:
+            return session.run(None, {input_name: batch[:, np.newaxis, :]})[0]
+        except Exception as e:
+            logger.warning(f"OSD: batched inference failed, retrying this batch window by window: {str(e)}")
+    return np.concatenate(
+        [session.run(None, {input_name: batch[i:i + 1, np.newaxis, :]})[0] for i in range(len(batch))]
+    )
+
+
+class _FrameAccumulator:
+    """윈도우별 프레임 확률 overlap-add — 프레임마다 합과 개수를 누적해 평균낸다
+
+    윈도우 하나를 슬라이스 덧셈 한 번으로 더하므로 프레임 단위 Python 루프가 없다.
+    스트리밍처럼 전체 길이를 모르면 배열을 두 배씩 늘린다.
+    """
+
+    def __init__(self, capacity_frames: int):
+        self.sums = np.zeros((capacity_frames, NUM_SPEAKERS), dtype=np.float64)
+        self.counts = np.zeros(capacity_frames, dtype=np.int32)
+
+    def _grow(self, frames: int) -> None:
+        size = max(frames, 2 * len(self.counts))
+        sums = np.zeros((size, NUM_SPEAKERS), dtype=np.float64)
+        sums[:len(self.sums)] = self.sums
+        counts = np.zeros(size, dtype=np.int32)
+        counts[:len(self.counts)] = self.counts
+        self.sums, self.counts = sums, counts
+
+    def add(self, start_frame: int, probs: np.ndarray) -> None:
+        end_frame = start_frame + len(probs)
+        if end_frame > len(self.counts):
+            self._grow(end_frame)
+        self.sums[start_frame:end_frame] += probs
+        self.counts[start_frame:end_frame] += 1
+
+    def result(self, total_frames: int) -> np.ndarray:
+        """(total_frames, NUM_SPEAKERS) 평균 확률 (값이 없는 프레임은 0)"""
+        if total_frames > len(self.counts):
+            self._grow(total_frames)
+        counts = np.maximum(self.counts[:total_frames], 1)
+        return self.sums[:total_frames] / counts[:, np.newaxis]
+
+
+def _overlap_mask(speaker_probs: np.ndarray, onset: float = OVERLAP_ONSET) -> np.ndarray:
+    """상위 2개 화자의 확률이 모두 onset 이상인 프레임 (np.partition 으로 두 번째 값만 뽑는다)"""
+    if len(speaker_probs) == 0:
+        return np.zeros(0, dtype=bool)
+    second = np.partition(speaker_probs, -2, axis=1)[:, -2]
+    return second >= onset
+
+
+def _overlap_regions(overlap_mask: np.ndarray, min_duration: float = MIN_OVERLAP_DURATION) -> list[dict]:
+    """연속 겹침 프레임을 구간으로 병합 (np.diff 로 시작/끝 프레임을 한 번에 찾는다)
+
+    구간 끝은 겹침이 끝난 첫 프레임 시각이며, 마지막 프레임까지 이어지면 마지막 프레임 시각이다.
+    """
+    total_frames = len(overlap_mask)
+    edges = np.diff(np.concatenate(([0], overlap_mask.astype(np.int8), [0])))
+    start_frames = np.flatnonzero(edges == 1)
+    end_frames = np.flatnonzero(edges == -1)
+    end_frames = np.where(end_frames == total_frames, total_frames - 1, end_frames)
+    starts = _frame_to_time(start_frames)
+    ends = _frame_to_time(end_frames)
+    keep = ends - starts >= min_duration
+    return [
+        {"start": round(float(start), 3), "end": round(float(end), 3)}
+        for start, end in zip(starts[keep], ends[keep])
+    ]
+
+
 def _find_best_permutation(
     prev_overlap: np.ndarray,
     curr_overlap: np.ndarray,
@@ -153,10 +367,16 @@ def _find_best_permutation(
     return best_perm
 
 
-def run_segmentation(audio_path: str) -> dict:
+def run_segmentation(audio: Union[DecodedAudio, str], batch_size: Optional[int] = None) -> dict:
     """
     전체 오디오에 대해 pyannote segmentation 실행.
 
+    audio 는 작업의 디코딩된 PCM(voice.audio.DecodedAudio) 이며, 윈도우를 memmap 위의 strided view 로
+    만들어 batch_size(기본 OSD_BATCH_SIZE) 개씩 한 번에 추론한다.
+    파일 경로나 URL 을 넘기면 ffmpeg 파이프에서 윈도우를 바로 읽는다 (임시 PCM 파일 없음).
+    어느 쪽이든 오디오는 배치 하나만 메모리에 머물고, 녹음 길이에 비례하는 것은 프레임별 확률뿐이다.
+    화자 순서 정렬과 누적은 배치 결과를 윈도우 순서대로 처리한다.
+
     Returns:
         {
             "speaker_probs": np.ndarray (total_frames, 3),  # 화자별 활성화 확률
@@ -167,115 +387,76 @@ def run_segmentation(audio_path: str) -> dict:
     """
     session = _get_session()
     input_name = session.get_inputs()[0].name
+    batch_size = _effective_batch_size(batch_size or BATCH_SIZE)
+
+    if isinstance(audio, str):
+        batches = _batch_stream(stream_pcm_windows(audio, WINDOW_SAMPLES, STEP_SAMPLES), batch_size)
+        logger.info(f"OSD: streaming audio windows from ffmpeg, batch_size={batch_size}")
+        capacity_frames = 0
+    else:
+        batches = audio.iter_window_batches(WINDOW_SAMPLES, STEP_SAMPLES, batch_size)
+        logger.info(
+            f"OSD: audio loaded, duration={audio.duration:.1f}s, samples={audio.num_samples}, "
+            f"batch_size={batch_size}"
+        )
+        capacity_frames = max(0, (audio.num_samples - SINCNET_OFFSET) // SINCNET_STEP)
 
-    waveform = _load_audio_as_mono16k(audio_path)
-    total_duration = len(waveform) / SAMPLE_RATE
-    logger.info(f"OSD: audio loaded, duration={total_duration:.1f}s, samples={len(waveform)}")
-
-    # 전체 프레임 수 계산
-    total_samples = len(waveform)
-    total_frames = max(0, (total_samples - SINCNET_OFFSET) // SINCNET_STEP)
-
-    # 프레임별 화자 확률 (최종 결과)
-    speaker_probs = np.zeros((total_frames, NUM_SPEAKERS), dtype=np.float64)
+    # 프레임별 화자 확률 합/개수 — 마지막 윈도우의 패딩 프레임까지 들어갈 여유를 둔다
+    accumulator = _FrameAccumulator(capacity_frames + WINDOW_SAMPLES // SINCNET_STEP if capacity_frames else 0)
 
     # 슬라이딩 윈도우 — 화자 정렬(permutation alignment) 후 누적
     prev_chunk_probs = None  # 이전 윈도우의 화자 확률
-    prev_chunk_frames = 0
     overlap_frames_count = 0  # 윈도우 간 겹치는 프레임 수
 
-    start = 0
+    total_samples = 0
     chunk_count = 0
-    while start < len(waveform):
-        end = start + WINDOW_SAMPLES
-        chunk = waveform[start:end]
-
-        if len(chunk) < WINDOW_SAMPLES:
-            chunk = np.pad(chunk, (0, WINDOW_SAMPLES - len(chunk)))
-
-        input_data = chunk[np.newaxis, np.newaxis, :].astype(np.float32)
-        logits = session.run(None, {input_name: input_data})[0][0]  # [num_frames, 7]
-
-        probs = _softmax(logits)  # [num_frames, 7]
-
-        # powerset → 화자별 확률 변환
-        chunk_speaker_probs = np.zeros((probs.shape[0], NUM_SPEAKERS), dtype=np.float64)
-        chunk_speaker_probs[:, 0] = probs[:, 1] + probs[:, 4] + probs[:, 5]  # spk1
-        chunk_speaker_probs[:, 1] = probs[:, 2] + probs[:, 4] + probs[:, 6]  # spk2
-        chunk_speaker_probs[:, 2] = probs[:, 3] + probs[:, 5] + probs[:, 6]  # spk3
-
-        # 화자 순서 정렬 (두 번째 윈도우부터)
-        if prev_chunk_probs is not None and overlap_frames_count > 0:
-            # 이전 윈도우 끝부분과 현재 윈도우 앞부분의 겹치는 구간 비교
-            prev_overlap = prev_chunk_probs[-overlap_frames_count:]  # 이전 윈도우 끝
-            curr_overlap = chunk_speaker_probs[:overlap_frames_count]  # 현재 윈도우 앞
-
-            # 최적 화자 순열 찾기 (코스트 매트릭스 기반)
-            best_perm = _find_best_permutation(prev_overlap, curr_overlap)
-
-            if best_perm != list(range(NUM_SPEAKERS)):
-                # 화자 순서 재배치
-                chunk_speaker_probs = chunk_speaker_probs[:, best_perm]
-
-        # 전체 타임라인에 매핑
-        chunk_start_frame = max(0, (start - SINCNET_OFFSET) // SINCNET_STEP) if start > 0 else 0
-        num_chunk_frames = probs.shape[0]
-
-        for i in range(num_chunk_frames):
-            global_frame = chunk_start_frame + i
-            if global_frame < total_frames:
-                if speaker_probs[global_frame].sum() == 0:
-                    # 아직 값이 없으면 그대로 할당
-                    speaker_probs[global_frame] = chunk_speaker_probs[i]
-                else:
-                    # 겹치는 구간: 평균 (이제 화자 ID가 정렬된 상태)
-                    speaker_probs[global_frame] = (
-                        speaker_probs[global_frame] + chunk_speaker_probs[i]
-                    ) / 2
-
-        # 다음 윈도우를 위해 저장
-        prev_chunk_probs = chunk_speaker_probs
-        prev_chunk_frames = num_chunk_frames
-        overlap_frames_count = max(0, (WINDOW_SAMPLES - STEP_SAMPLES - SINCNET_OFFSET) // SINCNET_STEP)
-
-        start += STEP_SAMPLES
-        chunk_count += 1
-
-    logger.info(f"OSD: processed {chunk_count} chunks, total_frames={total_frames}")
+    batch_count = 0
+    for batch_starts, batch_lengths, batch in batches:
+        total_samples = max(total_samples, int((batch_starts + batch_lengths).max()))
+        batch_logits = _run_batch(session, input_name, batch)  # [B, num_frames, 7]
+        batch_count += 1
+
+        batch_probs = _softmax(batch_logits)  # [B, num_frames, 7]
+
+        # powerset → 화자별 확률 변환 (배치 전체를 한 번에)
+        batch_speaker_probs = np.zeros(batch_probs.shape[:2] + (NUM_SPEAKERS,), dtype=np.float64)
+        batch_speaker_probs[..., 0] = batch_probs[..., 1] + batch_probs[..., 4] + batch_probs[..., 5]  # spk1
+        batch_speaker_probs[..., 1] = batch_probs[..., 2] + batch_probs[..., 4] + batch_probs[..., 6]  # spk2
+        batch_speaker_probs[..., 2] = batch_probs[..., 3] + batch_probs[..., 5] + batch_probs[..., 6]  # spk3
+
+        for start, chunk_speaker_probs in zip(batch_starts.tolist(), batch_speaker_probs):
+            # 화자 순서 정렬 (두 번째 윈도우부터)
+            if prev_chunk_probs is not None and overlap_frames_count > 0:
+                # 이전 윈도우 끝부분과 현재 윈도우 앞부분의 겹치는 구간 비교
+                prev_overlap = prev_chunk_probs[-overlap_frames_count:]  # 이전 윈도우 끝
+                curr_overlap = chunk_speaker_probs[:overlap_frames_count]  # 현재 윈도우 앞
+
+                # 최적 화자 순열 찾기 (코스트 매트릭스 기반)
+                best_perm = _find_best_permutation(prev_overlap, curr_overlap)
+
+                if best_perm != list(range(NUM_SPEAKERS)):
+                    # 화자 순서 재배치
+                    chunk_speaker_probs = chunk_speaker_probs[:, best_perm]
+
+            # 전체 타임라인에 매핑 (실제 오디오 밖의 패딩 프레임은 마지막에 잘라낸다)
+            chunk_start_frame = max(0, (start - SINCNET_OFFSET) // SINCNET_STEP) if start > 0 else 0
+            accumulator.add(chunk_start_frame, chunk_speaker_probs)
+
+            # 다음 윈도우를 위해 저장
+            prev_chunk_probs = chunk_speaker_probs
+            overlap_frames_count = max(0, (WINDOW_SAMPLES - STEP_SAMPLES - SINCNET_OFFSET) // SINCNET_STEP)
+
+            chunk_count += 1
+
+    total_frames = max(0, (total_samples - SINCNET_OFFSET) // SINCNET_STEP)
+    speaker_probs = accumulator.result(total_frames)
+    total_duration = total_samples / SAMPLE_RATE
+    logger.info(f"OSD: processed {chunk_count} chunks in {batch_count} batches, total_frames={total_frames}")
 
     # 겹침 구간 추출 (두 화자 확률이 모두 임계값 이상인 프레임)
-    ONSET = 0.7  # 0.5→0.7: false positive 줄이기 위해 임계값 상향
-    min_duration = 0.3
-
-    overlap_mask = np.zeros(total_frames, dtype=bool)
-    for i in range(total_frames):
-        # 상위 2개 화자의 확률이 모두 ONSET 이상이어야 겹침
-        sorted_probs = np.sort(speaker_probs[i])[::-1]
-        if sorted_probs[1] >= ONSET:  # 2번째로 높은 확률도 임계값 이상
-            overlap_mask[i] = True
-
-    # 연속 겹침 프레임 → 구간으로 병합
-    overlap_regions = []
-    in_overlap = False
-    ov_start = 0.0
-
-    for i in range(total_frames):
-        t = _frame_to_time(i)
-        if overlap_mask[i] and not in_overlap:
-            in_overlap = True
-            ov_start = t
-        elif not overlap_mask[i] and in_overlap:
-            in_overlap = False
-            ov_end = t
-            if ov_end - ov_start >= min_duration:
-                overlap_regions.append({"start": round(ov_start, 3), "end": round(ov_end, 3)})
-
-    if in_overlap:
-        ov_end = _frame_to_time(total_frames - 1)
-        if ov_end - ov_start >= min_duration:
-            overlap_regions.append({"start": round(ov_start, 3), "end": round(ov_end, 3)})
-
-    logger.info(f"OSD complete: {len(overlap_regions)} overlap regions (ONSET={ONSET})")
+    overlap_regions = _overlap_regions(_overlap_mask(speaker_probs))
+
+    logger.info(f"OSD complete: {len(overlap_regions)} overlap regions (ONSET={OVERLAP_ONSET})")
     for i, ov in enumerate(overlap_regions):
         # 겹침 구간 중앙 프레임의 화자 확률 로그
         mid_time = (ov["start"] + ov["end"]) / 2
@@ -296,55 +477,76 @@ def run_segmentation(audio_path: str) -> dict:
     }
 
 
+def _overlap_flags(starts: np.ndarray, ends: np.ndarray, overlap_regions: list[dict]) -> np.ndarray:
+    """단어 [start, end) 가 겹침 구간 중 하나와 맞닿는지 (단어마다 이진 탐색 한 번)
+
+    구간을 시작 시각으로 정렬하고 끝 시각의 누적 최댓값을 만들어 두면, 단어 끝보다 먼저 시작한
+    구간들 중 가장 늦게 끝나는 구간만 보면 된다 — O((words + regions) log regions).
+    """
+    if not overlap_regions or len(starts) == 0:
+        return np.zeros(len(starts), dtype=bool)
+    region_starts = np.array([ov["start"] for ov in overlap_regions], dtype=np.float64)
+    region_ends = np.array([ov["end"] for ov in overlap_regions], dtype=np.float64)
+    order = np.argsort(region_starts, kind="stable")
+    region_starts = region_starts[order]
+    max_ends = np.maximum.accumulate(region_ends[order])
+    # 단어 끝보다 먼저 시작한 마지막 구간
+    last = np.searchsorted(region_starts, ends, side="left") - 1
+    return (last >= 0) & (max_ends[np.maximum(last, 0)] > starts)
+
+
+def _word_frame_means(speaker_probs: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """단어별 시간대 프레임의 평균 화자 확률 (누적합으로 한 번에 계산)
+
+    Returns: (평균 확률 [words, NUM_SPEAKERS], 프레임이 있는 단어 여부 [words])
+    """
+    total_frames = len(speaker_probs)
+    if total_frames == 0 or len(starts) == 0:
+        return np.zeros((len(starts), NUM_SPEAKERS)), np.zeros(len(starts), dtype=bool)
+
+    start_frames = np.maximum(0, ((starts * SAMPLE_RATE).astype(np.int64) - SINCNET_OFFSET) // SINCNET_STEP)
+    end_frames = np.maximum(0, ((ends * SAMPLE_RATE).astype(np.int64) - SINCNET_OFFSET) // SINCNET_STEP)
+    end_frames = np.where(end_frames <= start_frames, start_frames + 1, end_frames)
+    end_frames = np.minimum(end_frames, total_frames)
+    start_frames = np.minimum(start_frames, total_frames - 1)
+    valid = end_frames > start_frames
+
+    cumulative = np.zeros((total_frames + 1, NUM_SPEAKERS), dtype=np.float64)
+    np.cumsum(speaker_probs, axis=0, out=cumulative[1:])
+    lengths = np.maximum(end_frames - start_frames, 1)[:, np.newaxis]
+    means = (cumulative[end_frames] - cumulative[start_frames]) / lengths
+    return means, valid
+
+
 def _map_pyannote_to_vito_speakers(
-    speaker_probs: np.ndarray,
     words: list[dict],
-    overlap_regions: list[dict],
+    in_overlap: np.ndarray,
+    word_probs: np.ndarray,
+    valid: np.ndarray,
 ) -> dict:
     """
     비겹침 구간의 단어들을 이용하여 pyannote 화자 ID → VITO 화자 ID 매핑을 구축한다.
 
     각 VITO 화자별로 비겹침 단어들의 시간대를 모아서,
     해당 시간대에서 가장 확률이 높은 pyannote 화자를 매핑한다.
+    단어별 평균 확률(word_probs)은 _word_frame_means 로 미리 계산해 둔다.
 
     Returns:
         {pyannote_spk_idx: vito_speaker_id, ...}
     """
-    def is_in_overlap(start: float, end: float) -> bool:
-        for ov in overlap_regions:
-            if start < ov["end"] and end > ov["start"]:
-                return True
-        return False
-
-    # VITO 화자별로 pyannote 화자 확률 누적
+    # VITO 화자별로 pyannote 화자 확률 누적 (겹침 구간 단어는 매핑에 사용하지 않음)
     vito_speakers = set(w["speaker_id"] for w in words)
+    speaker_list = list(vito_speakers)
+    speaker_index = {spk: i for i, spk in enumerate(speaker_list)}
+    codes = np.array([speaker_index[w["speaker_id"]] for w in words], dtype=np.int64)
+    used_words = valid & ~in_overlap
+
+    scores = np.zeros((len(speaker_list), NUM_SPEAKERS), dtype=np.float64)
+    np.add.at(scores, codes[used_words], word_probs[used_words])
+    counts = np.bincount(codes[used_words], minlength=len(speaker_list))
     # {vito_speaker_id: [sum_of_probs_per_pyannote_speaker]}
-    vito_to_pyannote_scores = {spk: np.zeros(NUM_SPEAKERS) for spk in vito_speakers}
-    vito_word_counts = {spk: 0 for spk in vito_speakers}
-
-    for w in words:
-        if is_in_overlap(w["start_time"], w["end_time"]):
-            continue  # 겹침 구간 단어는 매핑에 사용하지 않음
-
-        # 이 단어의 시간대에 해당하는 프레임들의 화자 확률 평균
-        start_frame = _time_to_frame(w["start_time"])
-        end_frame = _time_to_frame(w["end_time"])
-        if end_frame <= start_frame:
-            end_frame = start_frame + 1
-
-        end_frame = min(end_frame, len(speaker_probs))
-        start_frame = min(start_frame, len(speaker_probs) - 1)
-
-        if start_frame >= len(speaker_probs):
-            continue
-
-        frame_probs = speaker_probs[start_frame:end_frame]
-        if len(frame_probs) == 0:
-            continue
-
-        avg_probs = np.mean(frame_probs, axis=0)
-        vito_to_pyannote_scores[w["speaker_id"]] += avg_probs
-        vito_word_counts[w["speaker_id"]] += 1
+    vito_to_pyannote_scores = {spk: scores[i] for i, spk in enumerate(speaker_list)}
+    vito_word_counts = {spk: int(counts[i]) for i, spk in enumerate(speaker_list)}
 
     # 각 VITO 화자에 대해 가장 확률이 높은 pyannote 화자 찾기
     pyannote_to_vito = {}
@@ -384,6 +586,9 @@ def reassign_overlap_words(
     비겹침 구간: VITO 화자 유지
     겹침 구간: pyannote 프레임별 화자 확률로 재배정
 
+    겹침 여부는 정렬된 구간 인덱스(np.searchsorted), 단어별 평균 확률은 speaker_probs 누적합으로
+    모든 단어를 한 번에 계산한다 (단어마다 NumPy 호출 없음).
+
     Args:
         segments: VITO 발화 단위 세그먼트
         words: VITO 단어 리스트 [{speaker_id, text, start_time, end_time}, ...]
@@ -396,47 +601,30 @@ def reassign_overlap_words(
     if not words or not overlap_regions:
         return segments
 
+    starts = np.array([w["start_time"] for w in words], dtype=np.float64)
+    ends = np.array([w["end_time"] for w in words], dtype=np.float64)
+    in_overlap = _overlap_flags(starts, ends, overlap_regions)
+    word_probs, valid = _word_frame_means(speaker_probs, starts, ends)
+
     # 1. pyannote 화자 → VITO 화자 매핑 구축
-    pyannote_to_vito = _map_pyannote_to_vito_speakers(
-        speaker_probs, words, overlap_regions
-    )
+    pyannote_to_vito = _map_pyannote_to_vito_speakers(words, in_overlap, word_probs, valid)
 
     if not pyannote_to_vito:
         logger.warning("Failed to build speaker mapping — using VITO speakers as-is")
         return segments
 
-    def is_in_overlap(start: float, end: float) -> bool:
-        for ov in overlap_regions:
-            if start < ov["end"] and end > ov["start"]:
-                return True
-        return False
-
-    def get_pyannote_speaker(start: float, end: float) -> Optional[str]:
-        """단어 시간대에서 가장 확률 높은 pyannote 화자의 VITO ID 반환"""
-        start_frame = _time_to_frame(start)
-        end_frame = _time_to_frame(end)
-        if end_frame <= start_frame:
-            end_frame = start_frame + 1
-        end_frame = min(end_frame, len(speaker_probs))
-        start_frame = min(start_frame, len(speaker_probs) - 1)
-        if start_frame >= len(speaker_probs):
-            return None
-
-        frame_probs = speaker_probs[start_frame:end_frame]
-        if len(frame_probs) == 0:
-            return None
-
-        avg_probs = np.mean(frame_probs, axis=0)
-        best_pyannote = int(np.argmax(avg_probs))
-        return pyannote_to_vito.get(best_pyannote)
+    # 단어 시간대에서 가장 확률 높은 pyannote 화자
+    best_pyannote = np.argmax(word_probs, axis=1).tolist()
+    overlap_list = in_overlap.tolist()
+    valid_list = valid.tolist()
 
     # 2. 겹침 구간 단어만 재배정
     reassigned_words = []
     reassign_count = 0
-    for w in words:
+    for i, w in enumerate(words):
         w_copy = dict(w)
-        if is_in_overlap(w["start_time"], w["end_time"]):
-            new_speaker = get_pyannote_speaker(w["start_time"], w["end_time"])
+        if overlap_list[i]:
+            new_speaker = pyannote_to_vito.get(best_pyannote[i]) if valid_list[i] else None
             if new_speaker and new_speaker != w["speaker_id"]:
                 w_copy["speaker_id"] = new_speaker
                 reassign_count += 1
@@ -459,7 +647,7 @@ def reassign_overlap_words(
     if current_words:
         new_segments.append(_build_segment(current_speaker, current_words))
 
-    overlap_word_count = sum(1 for w in reassigned_words if w.get("overlap"))
+    overlap_word_count = sum(overlap_list)
     logger.info(
         f"Word reassignment complete: {len(segments)} original → "
         f"{len(new_segments)} segments, "
@@ -0,0 +1,148 @@
+"""
+S3 병렬 구간 다운로드
+
+큰 녹음을 presigned URL 하나의 TCP 스트림으로 받으면 오래 걸리므로, 객체를 STT_DOWNLOAD_PART_MB
+크기 구간으로 나눠 HTTP Range GET 을 동시에 보내고 미리 크기를 잡아 둔 파일의 제 위치에 쓴다.
+
+  - 첫 구간 요청의 Content-Range 로 전체 크기를 알아낸다 (presigned GET URL 은 HEAD 를 쓸 수 없음)
+  - 구간은 받은 만큼 바로 pwrite 하므로 메모리에는 청크 하나씩만 머문다
+  - 실패한 구간만 이어받기(이미 쓴 위치부터)로 다시 요청한다 (STT_DOWNLOAD_PART_ATTEMPTS)
+  - 서버가 Range 를 무시하면(200) 단일 스트림으로 받는다
+"""
+
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from prometheus_client import Counter, Histogram
+
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+PART_SIZE = int(os.getenv("STT_DOWNLOAD_PART_MB", "16")) * 1024 * 1024
+DOWNLOAD_CONCURRENCY = int(os.getenv("STT_DOWNLOAD_CONCURRENCY", "8"))
+PART_ATTEMPTS = int(os.getenv("STT_DOWNLOAD_PART_ATTEMPTS", "3"))
+CHUNK_SIZE = 1024 * 1024
+
+DOWNLOAD_BYTES = Counter("stt_download_bytes_total", "S3 에서 내려받은 바이트 수", ["provider"])
+DOWNLOAD_SECONDS = Histogram(
+    "stt_download_seconds",
+    "오디오 파일 하나를 내려받는 데 걸린 시간",
+    ["provider", "mode"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300),
+)
+DOWNLOAD_THROUGHPUT = Histogram(
+    "stt_download_throughput_mbps",
+    "오디오 파일 다운로드 처리량 (MB/s)",
+    ["provider", "mode"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DOWNLOAD_PART_RETRIES = Counter("stt_download_part_retries_total", "다시 요청한 다운로드 구간 수", ["provider"])
+
+_CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+
+def _write_body(fd: int, response, offset: int, provider: str) -> Iterator[int]:
+    """응답 본문을 offset 부터 파일에 쓰며 청크마다 쓴 바이트 수를 내보낸다
+
+    호출자가 청크마다 위치를 갱신하므로, 중간에 실패해도 받은 곳부터 이어받을 수 있다.
+    """
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if not chunk:
+            continue
+        os.pwrite(fd, chunk, offset)
+        offset += len(chunk)
+        DOWNLOAD_BYTES.labels(provider=provider).inc(len(chunk))
+        yield len(chunk)
+
+
+def _fetch_part(http, url: str, fd: int, start: int, end: int, provider: str) -> None:
+    """[start, end] 구간을 받아 쓴다. 실패하면 이미 쓴 위치부터 다시 요청"""
+    position = start
+    for attempt in range(1, PART_ATTEMPTS + 1):
+        try:
+            with http.get(
+                url, headers={"Range": f"bytes={position}-{end}"}, stream=True, timeout=120
+            ) as resp:
+                if resp.status_code != 206:
+                    raise RuntimeError(f"unexpected status {resp.status_code} for range {position}-{end}")
+                for written in _write_body(fd, resp, position, provider):
+                    position += written
+            if position != end + 1:
+                raise RuntimeError(f"short read for range {start}-{end}: got {position - start} bytes")
+            return
+        except Exception as e:
+            if attempt == PART_ATTEMPTS:
+                raise
+            DOWNLOAD_PART_RETRIES.labels(provider=provider).inc()
+            logger.warning(
+                f"[bg] Download part {start}-{end} failed (attempt {attempt}/{PART_ATTEMPTS}), "
+                f"resuming at {position}: {str(e)}"
+            )
+            time.sleep(attempt)
+
+
+def download_ranged(http, url: str, dest: str, *, provider: str = "") -> int:
+    """presigned URL 을 dest 로 병렬 구간 다운로드하고 파일 크기 반환"""
+    started = time.monotonic()
+    mode = "ranged"
+    with open(dest, "wb") as f:
+        fd = f.fileno()
+        with http.get(url, headers={"Range": f"bytes=0-{PART_SIZE - 1}"}, stream=True, timeout=120) as first:
+            if first.status_code == 416:
+                # 빈 객체
+                total = 0
+            elif first.status_code == 200:
+                # Range 미지원 — 단일 스트림으로 받는다
+                mode = "single"
+                total = sum(_write_body(fd, first, 0, provider))
+            else:
+                first.raise_for_status()
+                match = _CONTENT_RANGE.match(first.headers.get("Content-Range", ""))
+                if match is None:
+                    raise RuntimeError(f"missing Content-Range: {first.headers.get('Content-Range')}")
+                total = int(match.group(1))
+                f.truncate(total)
+                first_written = 0
+                try:
+                    for written in _write_body(fd, first, 0, provider):
+                        first_written += written
+                except Exception as e:
+                    DOWNLOAD_PART_RETRIES.labels(provider=provider).inc()
+                    logger.warning(f"[bg] Download part 0 failed, resuming at {first_written}: {str(e)}")
+
+        if mode == "ranged" and total > 0:
+            # 첫 구간에서 못 받은 나머지도 다른 구간과 함께 받는다
+            first_end = min(PART_SIZE, total) - 1
+            ranges = [(first_written, first_end)] if first_written <= first_end else []
+            ranges += [
+                (start, min(start + PART_SIZE, total) - 1)
+                for start in range(PART_SIZE, total, PART_SIZE)
+            ]
+            workers = max(1, min(DOWNLOAD_CONCURRENCY, len(ranges)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-range") as pool:
+                futures = [
+                    pool.submit(_fetch_part, http, url, fd, start, end, provider) for start, end in ranges
+                ]
+                error: Optional[BaseException] = None
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        error = error or e
+                if error is not None:
+                    raise error
+
+    elapsed = time.monotonic() - started
+    DOWNLOAD_SECONDS.labels(provider=provider, mode=mode).observe(elapsed)
+    if elapsed > 0 and total:
+        DOWNLOAD_THROUGHPUT.labels(provider=provider, mode=mode).observe(total / 1024 / 1024 / elapsed)
+    logger.info(
+        f"[bg] Downloaded {total} bytes ({total / 1024 / 1024:.1f} MB) in {elapsed:.1f}s "
+        f"({mode}, part={PART_SIZE // 1024 // 1024}MB)"
+    )
+    return total
@@ -0,0 +1,136 @@
+"""
+STT 작업 전용 실행기
+
+STT 작업은 제공자 응답을 수 시간까지 기다리는 동기 함수이므로,
+Starlette/AnyIO 공용 스레드풀(기본 40개, 동기 엔드포인트와 공유)에서 돌리면
+/clients, /auth/login 같은 요청이 스레드를 얻지 못해 멈춘다.
+이 모듈은 크기와 대기열 상한이 정해진 별도 스레드풀과 Prometheus 메트릭을 제공한다.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="job_executor", level=logging.INFO)
+
+JOB_EXECUTOR_SIZE = int(os.getenv("STT_JOB_EXECUTOR_SIZE", os.getenv("STT_WORKER_CONCURRENCY", "4")))
+JOB_EXECUTOR_MAX_QUEUE = int(os.getenv("STT_JOB_EXECUTOR_MAX_QUEUE", "16"))
+
+EXECUTOR_SIZE = Gauge("stt_job_executor_size", "STT 작업 실행기 스레드 수", ["executor"])
+EXECUTOR_ACTIVE = Gauge("stt_job_executor_active", "실행 중인 STT 작업 수", ["executor"])
+EXECUTOR_QUEUE_DEPTH = Gauge("stt_job_executor_queue_depth", "스레드를 기다리는 STT 작업 수", ["executor"])
+EXECUTOR_COMPLETED = Counter("stt_job_executor_completed_total", "완료된 STT 작업 수", ["executor", "outcome"])
+EXECUTOR_REJECTED = Counter("stt_job_executor_rejected_total", "대기열이 가득 차 거절된 작업 수", ["executor"])
+EXECUTOR_DURATION = Histogram(
+    "stt_job_executor_duration_seconds",
+    "STT 작업 실행 시간",
+    ["executor"],
+    buckets=(1, 5, 15, 60, 300, 900, 1800, 3600, 7200, 21600),
+)
+
+
+class JobExecutorFull(RuntimeError):
+    """실행기 대기열이 가득 찬 경우"""
+
+
+class JobExecutor:
+    """크기/대기열 상한이 있는 STT 작업 전용 스레드풀"""
+
+    def __init__(self, name: str = "stt", max_workers: int = JOB_EXECUTOR_SIZE, max_queue: int = JOB_EXECUTOR_MAX_QUEUE):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{name}-job")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        EXECUTOR_SIZE.labels(executor=name).set(self.max_workers)
+
+    # --- 상태 ---
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.name,
+                "size": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+            }
+
+    def has_idle_worker(self) -> bool:
+        """대기 없이 바로 실행 가능한 스레드가 있는지"""
+        with self._lock:
+            return self._active + self._queued < self.max_workers
+
+    def _update_gauges(self) -> None:
+        EXECUTOR_ACTIVE.labels(executor=self.name).set(self._active)
+        EXECUTOR_QUEUE_DEPTH.labels(executor=self.name).set(self._queued)
+
+    # --- 실행 ---
+    def submit(self, fn: Callable, *args, block: bool = False, timeout: Optional[float] = None, **kwargs) -> Future:
+        """작업 제출. 대기열이 가득 차면 JobExecutorFull (block=True 이면 timeout 까지 대기)"""
+        if not self._slots.acquire(blocking=block, timeout=timeout if block else None):
+            EXECUTOR_REJECTED.labels(executor=self.name).inc()
+            raise JobExecutorFull(f"{self.name} executor queue is full")
+
+        with self._lock:
+            self._queued += 1
+            self._update_gauges()
+
+        def run():
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._update_gauges()
+            started = time.monotonic()
+            outcome = "success"
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                EXECUTOR_DURATION.labels(executor=self.name).observe(time.monotonic() - started)
+                EXECUTOR_COMPLETED.labels(executor=self.name, outcome=outcome).inc()
+                with self._lock:
+                    self._active -= 1
+                    self._update_gauges()
+                self._slots.release()
+
+        try:
+            return self._pool.submit(run)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+                self._update_gauges()
+            self._slots.release()
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_job_executor: Optional[JobExecutor] = None
+_job_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """프로세스 공용 STT 작업 실행기"""
+    global _job_executor
+    if _job_executor is None:
+        with _job_executor_lock:
+            if _job_executor is None:
+                _job_executor = JobExecutor()
+                logger.info(
+                    f"STT job executor created: size={_job_executor.max_workers}, "
+                    f"max_queue={_job_executor.max_queue}"
+                )
+    return _job_executor
@@ -0,0 +1,350 @@
+"""
+voice_uploads 테이블 기반 STT 작업 큐
+
+process-s3-file* 엔드포인트는 VoiceUpload 행을 queued 상태로 저장만 하고,
+별도 워커 프로세스(worker.py)가 SELECT ... FOR UPDATE SKIP LOCKED 로
+작업을 하나씩 가져가 처리한다.
+
+워커는 처리 중인 작업의 heartbeat_at 을 주기적으로 갱신한다.
+재배포/크래시로 heartbeat 가 끊긴 작업은 다시 queued 로 돌아가며,
+STT_JOB_MAX_ATTEMPTS 회를 넘기면 failed 로 처리된다.
+제공자 속도 제한에 걸린 작업은 실패 대신 run_after 이후로 미뤄 다시 큐에 넣는다.
+
+등록 시 확인한 오디오 길이(audio_duration_sec)로 우선순위 레인을 나눈다.
+STT_SHORT_LANE_SEC 이하의 짧은 녹음을 먼저 가져가되, STT_LANE_MAX_WAIT_SEC 이상 기다린 작업은
+길이와 무관하게 등록 순서대로 가져가 긴 녹음이 밀리지 않게 한다.
+"""
+
+import logging
+import os
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import case, or_, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from logs.logging_util import LoggerSingleton
+from models.voice_upload import VoiceUpload
+from voice.progress import publish_progress
+
+logger = LoggerSingleton.get_logger(logger_name="job_queue", level=logging.INFO)
+
+# 큐에서 처리 가능한 STT 제공자
+PROVIDERS = ("assemblyai", "speechmatics", "deepgram_nova2", "vito", "voxtral")
+
+MAX_ATTEMPTS = int(os.getenv("STT_JOB_MAX_ATTEMPTS", "3"))
+HEARTBEAT_INTERVAL = int(os.getenv("STT_JOB_HEARTBEAT_SEC", "30"))
+STALE_AFTER = int(os.getenv("STT_JOB_STALE_SEC", "300"))
+SHORT_LANE_SEC = float(os.getenv("STT_SHORT_LANE_SEC", "900"))
+LANE_MAX_WAIT = int(os.getenv("STT_LANE_MAX_WAIT_SEC", "600"))
+
+
+@dataclass(frozen=True)
+class ClaimedUpload:
+    """워커가 가져간 작업 (스레드 간 전달용, ORM 객체 대신 사용)"""
+    id: int
+    provider: str
+    s3_key: str
+    user_id: int
+    client_id: int
+    session_number: Optional[int]
+    language_code: str
+    attempts: int
+
+
+def ensure_job_queue_schema(engine) -> None:
+    """기존 voice_uploads 테이블에 큐 컬럼/인덱스 추가 (멱등)"""
+    with engine.begin() as conn:
+        for column_ddl in (
+            "provider VARCHAR(30)",
+            "language_code VARCHAR(10)",
+            "attempts INTEGER NOT NULL DEFAULT 0",
+            "locked_by VARCHAR(100)",
+            "heartbeat_at TIMESTAMPTZ",
+            "provider_job_id VARCHAR(100)",
+            "run_after TIMESTAMPTZ",
+            "parked_at TIMESTAMPTZ",
+            "progress_stage VARCHAR(30)",
+            "audio_duration_sec DOUBLE PRECISION",
+            "audio_sample_rate INTEGER",
+            "audio_channels INTEGER",
+            "audio_codec VARCHAR(30)",
+        ):
+            conn.execute(text(f"ALTER TABLE voice_uploads ADD COLUMN IF NOT EXISTS {column_ddl}"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS voice_uploads_queue_idx "
+            "ON voice_uploads (status, created_at)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_voice_uploads_provider_job_id "
+            "ON voice_uploads (provider_job_id)"
+        ))
+
+
+def enqueue_upload(
+    db: Session,
+    *,
+    provider: str,
+    user_id: int,
+    client_id: int,
+    session_number: Optional[int],
+    s3_key: str,
+    language_code: str = "ko",
+    audio: Optional[dict] = None,
+) -> VoiceUpload:
+    """STT 작업을 큐에 등록하고 VoiceUpload 행을 반환 (audio: voice.audio.probe_audio 결과)"""
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown STT provider: {provider}")
+
+    upload = VoiceUpload(
+        user_id=user_id,
+        client_id=client_id,
+        session_number=session_number,
+        s3_key=s3_key,
+        status="queued",
+        provider=provider,
+        language_code=language_code or "ko",
+        attempts=0,
+    )
+    if audio:
+        upload.audio_duration_sec = audio.get("duration")
+        upload.audio_sample_rate = audio.get("sample_rate")
+        upload.audio_channels = audio.get("channels")
+        upload.audio_codec = (audio.get("codec") or "")[:30] or None
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    logger.info(
+        f"Upload enqueued: upload_id={upload.id}, provider={provider}, s3_key={s3_key}, "
+        f"duration={upload.audio_duration_sec}"
+    )
+    publish_progress(
+        upload.id, user_id=user_id, client_id=client_id, session_number=session_number, status="queued",
+    )
+    return upload
+
+
+def claim_next_upload(db: Session, worker_id: str) -> Optional[ClaimedUpload]:
+    """queued 작업 하나를 잠그고 processing 으로 전환 (다른 워커와 경쟁 없음)"""
+    # 짧은 녹음 또는 오래 기다린 작업 → 0, 나머지 → 1 (길이를 모르면 짧은 쪽으로 본다)
+    lane = case(
+        (
+            or_(
+                VoiceUpload.audio_duration_sec.is_(None),
+                VoiceUpload.audio_duration_sec <= SHORT_LANE_SEC,
+                VoiceUpload.created_at <= func.now() - timedelta(seconds=LANE_MAX_WAIT),
+            ),
+            0,
+        ),
+        else_=1,
+    )
+    upload = (
+        db.query(VoiceUpload)
+        .filter(
+            VoiceUpload.status == "queued",
+            VoiceUpload.provider.isnot(None),
+            or_(VoiceUpload.run_after.is_(None), VoiceUpload.run_after <= func.now()),
+        )
+        .order_by(lane, VoiceUpload.created_at, VoiceUpload.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not upload:
+        db.rollback()
+        return None
+
+    upload.status = "processing"
+    upload.locked_by = worker_id
+    upload.heartbeat_at = func.now()
+    upload.attempts = (upload.attempts or 0) + 1
+    # 파킹 중 워커가 유실된 작업: 새 워커가 다시 파킹할 때까지 콜백 재개 대상이 아니다
+    upload.parked_at = None
+    if upload.run_after is not None:
+        # 속도 제한으로 미뤄졌던 작업: 연기 사유 정리
+        upload.run_after = None
+        upload.error_message = None
+    claimed = ClaimedUpload(
+        id=upload.id,
+        provider=upload.provider,
+        s3_key=upload.s3_key,
+        user_id=upload.user_id,
+        client_id=upload.client_id,
+        session_number=upload.session_number,
+        language_code=upload.language_code or "ko",
+        attempts=upload.attempts,
+    )
+    db.commit()
+    logger.info(
+        f"Upload claimed: upload_id={claimed.id}, provider={claimed.provider}, "
+        f"worker={worker_id}, attempt={claimed.attempts}"
+    )
+    return claimed
+
+
+def heartbeat_uploads(db: Session, worker_id: str, upload_ids: list[int]) -> None:
+    """처리 중인 작업의 heartbeat 갱신"""
+    if not upload_ids:
+        return
+    db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET heartbeat_at = NOW()
+            WHERE id = ANY(:ids) AND locked_by = :worker_id AND status = 'processing'
+            """
+        ),
+        {"ids": list(upload_ids), "worker_id": worker_id},
+    )
+    db.commit()
+
+
+def requeue_stale_uploads(db: Session) -> int:
+    """heartbeat 가 끊긴 작업을 다시 queued 로 돌리거나, 재시도 초과 시 failed 처리"""
+    failed = db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET status = 'failed',
+                locked_by = NULL,
+                error_message = 'STT worker lost the job too many times'
+            WHERE status = 'processing'
+              AND provider IS NOT NULL
+              AND COALESCE(heartbeat_at, updated_at) < NOW() - make_interval(secs => :stale)
+              AND attempts >= :max_attempts
+            """
+        ),
+        {"stale": STALE_AFTER, "max_attempts": MAX_ATTEMPTS},
+    ).rowcount
+    requeued = db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET status = 'queued', locked_by = NULL, parked_at = NULL
+            WHERE status = 'processing'
+              AND provider IS NOT NULL
+              AND COALESCE(heartbeat_at, updated_at) < NOW() - make_interval(secs => :stale)
+              AND attempts < :max_attempts
+            """
+        ),
+        {"stale": STALE_AFTER, "max_attempts": MAX_ATTEMPTS},
+    ).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning(f"Stale uploads recovered: requeued={requeued}, failed={failed}")
+    return requeued
+
+
+def resume_upload_from_webhook(
+    db: Session,
+    *,
+    upload_id: int,
+    provider: str,
+    provider_job_id: Optional[str] = None,
+) -> bool:
+    """제공자 완료 콜백을 받은 작업을 다시 큐에 넣는다 (워커가 결과를 바로 가져가도록)
+
+    파킹된(parked_at 이 있는) 작업만 되돌린다. 폴러가 먼저 재개했거나 같은 콜백이 다시 오면
+    이미 parked_at 이 비어 있으므로 아무것도 바꾸지 않는다.
+    콜백으로 인한 재개는 워커 유실이 아니므로 시도 횟수를 되돌린다.
+    """
+    resumed = db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET status = 'queued',
+                locked_by = NULL,
+                heartbeat_at = NULL,
+                parked_at = NULL,
+                attempts = GREATEST(attempts - 1, 0)
+            WHERE id = :id
+              AND provider = :provider
+              AND status = 'processing'
+              AND parked_at IS NOT NULL
+              AND provider_job_id IS NOT NULL
+              AND (CAST(:job_id AS VARCHAR) IS NULL OR provider_job_id = :job_id)
+            """
+        ),
+        {"id": upload_id, "provider": provider, "job_id": provider_job_id},
+    ).rowcount
+    db.commit()
+    return bool(resumed)
+
+
+def mark_upload_parked(db: Session, *, upload_id: int, worker_id: Optional[str]) -> bool:
+    """제공자 완료 대기에 들어간 작업 표시 (이때부터 완료 콜백으로 재개 가능)"""
+    parked = db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET parked_at = NOW()
+            WHERE id = :id AND status = 'processing' AND locked_by IS NOT DISTINCT FROM :worker_id
+            """
+        ),
+        {"id": upload_id, "worker_id": worker_id},
+    ).rowcount
+    db.commit()
+    return bool(parked)
+
+
+def take_parked_upload(
+    db: Session, *, upload_id: int, worker_id: Optional[str], provider_job_id: Optional[str]
+) -> bool:
+    """파킹된 작업의 소유권을 가져온다 (compare-and-set)
+
+    parked_at 을 비우는 데 성공한 쪽만 후처리를 이어간다. 콜백이 먼저 큐로 되돌렸거나
+    다른 워커가 이어받았으면 False.
+    """
+    taken = db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET parked_at = NULL, heartbeat_at = NOW()
+            WHERE id = :id
+              AND status = 'processing'
+              AND parked_at IS NOT NULL
+              AND locked_by IS NOT DISTINCT FROM :worker_id
+              AND provider_job_id = :job_id
+            """
+        ),
+        {"id": upload_id, "worker_id": worker_id, "job_id": provider_job_id},
+    ).rowcount
+    db.commit()
+    return bool(taken)
+
+
+def defer_upload(db: Session, *, upload_id: int, delay_sec: float, reason: str) -> bool:
+    """처리 중인 작업을 delay_sec 뒤에 다시 가져가도록 큐로 되돌린다 (시도 횟수는 되돌림)"""
+    deferred = db.execute(
+        text(
+            """
+            UPDATE voice_uploads
+            SET status = 'queued',
+                locked_by = NULL,
+                heartbeat_at = NULL,
+                attempts = GREATEST(attempts - 1, 0),
+                run_after = NOW() + make_interval(secs => :delay),
+                error_message = :reason
+            WHERE id = :id AND status = 'processing'
+            """
+        ),
+        {"id": upload_id, "delay": float(delay_sec), "reason": reason},
+    ).rowcount
+    db.commit()
+    if deferred:
+        logger.warning(f"Upload deferred: upload_id={upload_id}, delay={delay_sec:.0f}s, reason={reason}")
+    return bool(deferred)
+
+
+def run_claimed_upload(job: ClaimedUpload) -> Optional[Future]:
+    """단계형 STT 파이프라인으로 작업 실행
+
+    제공자 작업 완료를 기다리는 중이면(폴러에 파킹) 후처리 완료 시점의 Future 반환
+    """
+    from voice.pipeline import run_stt_pipeline
+
+    return run_stt_pipeline(
+        job.provider, job.id, job.s3_key, job.user_id, job.client_id, job.session_number, job.language_code,
+    )
@@ -0,0 +1,90 @@
+"""
+S3 멀티파트 업로드 (브라우저 → S3 직접, 구간 병렬)
+
+큰 녹음을 put_object presigned URL 하나로 올리면 연결 하나로만 전송되고, 중간에 끊기면 처음부터 다시 올려야 한다.
+멀티파트 업로드를 만들고 구간마다 presigned upload_part URL 을 주면 브라우저가 여러 구간을 동시에 올리고,
+끊긴 경우 S3 에 아직 없는 구간만 다시 보낸다 (list_parts 로 확인).
+
+구간 크기는 파일 크기에 맞춰 정한다 — 최소 S3_MULTIPART_MIN_PART_MB, 구간 수는 S3 상한(10,000) 이하.
+"""
+
+import math
+import os
+from typing import Optional
+
+# S3 제한: 마지막을 제외한 구간은 5 MiB 이상, 구간 수는 10,000 이하
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+
+MIN_PART_SIZE = max(S3_MIN_PART_SIZE, int(os.getenv("S3_MULTIPART_MIN_PART_MB", "8")) * 1024 * 1024)
+# 구간 수가 이보다 많아지면 구간을 키운다 (presigned URL 응답 크기 / 요청 수 제한)
+TARGET_MAX_PARTS = int(os.getenv("S3_MULTIPART_TARGET_PARTS", "500"))
+PART_URL_EXPIRES = int(os.getenv("S3_MULTIPART_URL_EXPIRES_SEC", "3600"))
+
+
+def part_size_for(file_size: int) -> int:
+    """파일 크기에 맞는 구간 크기 (1 MiB 단위로 올림)"""
+    mib = 1024 * 1024
+    wanted = max(MIN_PART_SIZE, math.ceil(file_size / min(TARGET_MAX_PARTS, S3_MAX_PARTS)))
+    return math.ceil(wanted / mib) * mib
+
+
+def part_count_for(file_size: int, part_size: int) -> int:
+    return max(1, math.ceil(file_size / part_size))
+
+
+def start_upload(s3_client, bucket: str, key: str, content_type: str) -> str:
+    response = s3_client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)
+    return response["UploadId"]
+
+
+def presign_parts(s3_client, bucket: str, key: str, upload_id: str, part_numbers: list[int]) -> list[dict]:
+    return [
+        {
+            "part_number": part_number,
+            "url": s3_client.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+                ExpiresIn=PART_URL_EXPIRES,
+            ),
+        }
+        for part_number in part_numbers
+    ]
+
+
+def list_uploaded_parts(s3_client, bucket: str, key: str, upload_id: str) -> list[dict]:
+    """S3 에 이미 올라간 구간 목록 [{"part_number", "etag", "size"}]"""
+    parts: list[dict] = []
+    marker: Optional[int] = 0
+    while marker is not None:
+        response = s3_client.list_parts(Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker)
+        for part in response.get("Parts") or []:
+            parts.append({"part_number": part["PartNumber"], "etag": part["ETag"], "size": part["Size"]})
+        marker = response.get("NextPartNumberMarker") if response.get("IsTruncated") else None
+    return parts
+
+
+def complete_upload(s3_client, bucket: str, key: str, upload_id: str, part_count: Optional[int] = None) -> None:
+    """S3 에 올라간 구간으로 업로드 완료 (브라우저가 ETag 를 읽지 못해도 되도록 list_parts 사용)"""
+    parts = list_uploaded_parts(s3_client, bucket, key, upload_id)
+    if not parts:
+        raise ValueError("no uploaded parts")
+    if part_count is not None:
+        missing = sorted(set(range(1, part_count + 1)) - {part["part_number"] for part in parts})
+        if missing:
+            raise ValueError(f"missing parts: {missing[:20]}")
+    s3_client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                for part in sorted(parts, key=lambda part: part["part_number"])
+            ]
+        },
+    )
+
+
+def abort_upload(s3_client, bucket: str, key: str, upload_id: str) -> None:
+    s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
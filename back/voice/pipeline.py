@@ -0,0 +1,997 @@
+"""
+STT 단계형 파이프라인
+
+모든 제공자가 같은 단계를 순서대로 거친다.
+
+    fetch → transcode → transcribe → parse → diarize_refine → label → mask
+      → enrich_dispatch → persist → enrich
+
+단계마다 실행 시간(로그 + Prometheus), 재시도 횟수, 동시 실행 상한을 따로 설정할 수 있어
+성능 개선이 모든 제공자에 한 번에 적용된다. 제공자별로 다른 부분
+(설정 확인, 전사 요청, 결과 파싱)은 voice.providers 어댑터가 담당한다.
+
+async_polling 제공자(Speechmatics, VITO)는 transcribe 단계에서 작업만 만들고 스레드를 반환한다.
+완료는 voice.poller 가 기다리며, 결과가 나오면 STT 실행기에서 parse 단계부터 이어서 실행한다.
+제공자 작업 ID 는 voice_uploads.provider_job_id 에 저장되어 워커가 재시작돼도 새 작업을 만들지 않는다.
+
+단계 정책은 환경 변수로 조정한다 (NAME 은 대문자 단계 이름):
+  STT_STAGE_<NAME>_ATTEMPTS     최대 시도 횟수
+  STT_STAGE_<NAME>_BACKOFF_SEC  재시도 간격 (시도 횟수에 비례)
+  STT_STAGE_<NAME>_CONCURRENCY  프로세스 내 동시 실행 상한 (0 = 제한 없음)
+"""
+
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy.orm import Session
+
+from config.dependencies import get_s3_bucket_name
+from database import SessionLocal
+from logs.logging_util import LoggerSingleton
+from models.client import Client
+from models.voice_record import VoiceRecord
+from models.voice_record_audio_event import VoiceRecordAudioEvent
+from models.voice_upload import VoiceUpload
+from voice import result_cache
+from voice.analysis import (
+    apply_first_session_analysis,
+    build_semantic_chunks,
+    client_profile,
+    embed_texts,
+    format_rag_context,
+    generate_first_session_analysis,
+    generate_next_session_goal,
+    get_rag_query_embeddings,
+    identify_counselor_speaker_id,
+    save_next_session_goal,
+    select_rag_context,
+    store_record_chunks,
+)
+from voice.async_runtime import TaskGraph, get_async_runtime
+from voice.audio import DecodedAudio, decode_to_pcm
+from voice.channels import channel_split_candidate, merge_channels, split_channels, transcribe_channels
+from voice.chunking import chunking_enabled, stitch_chunks, transcribe_chunked
+from voice.download import download_ranged
+from voice.executor import JobExecutorFull, get_job_executor
+from voice.job_queue import defer_upload, mark_upload_parked, take_parked_upload
+from voice.poller import ProviderJobFailed, get_provider_poller
+from voice.progress import PIPELINE_STAGE_PROGRESS, publish_progress
+from voice.providers import ParsedTranscript, SttProvider, get_provider
+from voice.rate_limit import RateLimited
+from voice.streaming import S3AudioStream, TranscodeStream
+from voice.transcript import (
+    apply_speaker_labels,
+    build_speaker_label_map,
+    collect_speaker_ids,
+    mask_transcript,
+    merge_segments,
+    rebuild_speakers,
+)
+from voice.webhooks import WEBHOOK_FALLBACK_POLL_SEC, webhook_enabled
+
+KST = timezone(timedelta(hours=9))
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+STAGES = (
+    "fetch",
+    "transcode",
+    "transcribe",
+    "parse",
+    "diarize_refine",
+    "label",
+    "mask",
+    "enrich_dispatch",
+    "persist",
+    "enrich",
+)
+
+
+@dataclass(frozen=True)
+class StagePolicy:
+    """단계별 실행 정책"""
+    name: str
+    max_attempts: int = 1
+    backoff_sec: float = 2.0
+    concurrency: int = 0  # 0 = 제한 없음
+    optional: bool = False  # 실패해도 다음 단계 진행
+
+
+_DEFAULT_POLICIES = {
+    "fetch": StagePolicy("fetch", max_attempts=3, concurrency=8),
+    "transcode": StagePolicy("transcode", max_attempts=2, concurrency=os.cpu_count() or 2),
+    # 제공자 호출은 과금되므로 기본 1회
+    "transcribe": StagePolicy("transcribe", max_attempts=1),
+    "parse": StagePolicy("parse"),
+    # ONNX 추론은 CPU를 많이 쓰므로 동시 실행 제한
+    "diarize_refine": StagePolicy("diarize_refine", concurrency=2, optional=True),
+    "label": StagePolicy("label", max_attempts=2, optional=True),
+    "mask": StagePolicy("mask"),
+    "enrich_dispatch": StagePolicy("enrich_dispatch", optional=True),
+    "persist": StagePolicy("persist", max_attempts=2),
+    "enrich": StagePolicy("enrich", optional=True),
+}
+
+
+def _load_policy(default: StagePolicy) -> StagePolicy:
+    prefix = f"STT_STAGE_{default.name.upper()}_"
+    return replace(
+        default,
+        max_attempts=max(1, int(os.getenv(prefix + "ATTEMPTS", default.max_attempts))),
+        backoff_sec=float(os.getenv(prefix + "BACKOFF_SEC", default.backoff_sec)),
+        concurrency=max(0, int(os.getenv(prefix + "CONCURRENCY", default.concurrency))),
+    )
+
+
+STAGE_POLICIES: dict[str, StagePolicy] = {name: _load_policy(_DEFAULT_POLICIES[name]) for name in STAGES}
+_STAGE_SEMAPHORES: dict[str, threading.BoundedSemaphore] = {
+    name: threading.BoundedSemaphore(policy.concurrency)
+    for name, policy in STAGE_POLICIES.items()
+    if policy.concurrency > 0
+}
+
+STAGE_DURATION = Histogram(
+    "stt_stage_duration_seconds",
+    "STT 파이프라인 단계별 실행 시간",
+    ["provider", "stage", "outcome"],
+    buckets=(0.05, 0.25, 1, 5, 15, 60, 300, 900, 1800, 3600, 7200, 21600),
+)
+STAGE_RETRIES = Counter("stt_stage_retries_total", "STT 파이프라인 단계 재시도 횟수", ["provider", "stage"])
+
+# OSD 용 오디오를 전사와 겹쳐서 받아두기 위한 풀
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stt-prefetch")
+
+
+@dataclass
+class JobContext:
+    """파이프라인 단계 간에 전달되는 작업 상태"""
+    upload_id: int
+    provider: SttProvider
+    s3_key: str
+    user_id: int
+    client_id: int
+    session_number: Optional[int]
+    language_code: str = "ko"
+
+    db: Optional[Session] = None
+    container: Any = None
+    upload: Optional[VoiceUpload] = None
+    client: Optional[Client] = None
+
+    bucket_name: Optional[str] = None
+    presigned_url: Optional[str] = None
+    local_audio_path: Optional[str] = None
+    local_audio_future: Optional[Future] = None
+    tee_path: Optional[str] = None  # 제공자 업로드 스트림을 OSD 용으로 기록할 파일
+    audio_stream_opened: bool = False
+    pcm: Optional[DecodedAudio] = None  # 16 kHz mono PCM (작업당 한 번만 디코딩)
+    pcm_future: Optional[Future] = None
+    upload_codec: Optional[str] = None  # transcode 단계가 고른 재인코딩 코덱 (없으면 원본 그대로)
+    upload_name: Optional[str] = None
+    transcode_baseline_bytes: Optional[int] = None  # 16 kHz PCM WAV 로 보냈을 때의 크기 (절감량 메트릭용)
+    temp_paths: list[str] = field(default_factory=list)
+    audio_duration: Optional[float] = None  # 초 (로컬 파일이 있을 때 ffprobe 로 측정)
+
+    provider_job_id: Optional[str] = None  # async_polling 제공자 작업 ID
+    resumed_provider_job: bool = False  # 이전 시도에서 만든 작업을 이어받았는지
+    locked_by: Optional[str] = None  # 이 작업을 가져간 워커 (재개 시 소유권 확인용)
+
+    payload: Optional[dict] = None
+    transcript: Optional[ParsedTranscript] = None
+    counselor_future: Optional[Future] = None  # 상주 루프에 예약된 상담사 화자 식별
+    labels_applied: bool = False
+    dialogue: str = ""
+    enrich_graph: Optional[TaskGraph] = None
+    enrich_future: Optional[Future] = None  # persist 와 동시에 실행되는 후처리 작업 그래프
+    enrich_chunks: list[str] = field(default_factory=list)
+    voice_record_id: Optional[int] = None
+
+    stage_timings: dict[str, float] = field(default_factory=dict)
+    progress_stage: Optional[str] = None  # 마지막으로 알린 진행 단계 (voice.progress)
+    cache_key: Optional[str] = None  # 전사 결과 캐시 키 (voice.result_cache)
+    cache_content: Optional[str] = None
+    cache_hit: bool = False
+    chunked: bool = False  # 긴 녹음 분할 병렬 전사 (voice.chunking)
+    channel_split: bool = False  # 화자별 채널 녹음 — 채널마다 전사하고 채널로 화자 구분 (voice.channels)
+    channel_pcm: list[DecodedAudio] = field(default_factory=list)
+    channel_stats: Optional[dict] = None
+
+    def open_audio_stream(self) -> S3AudioStream:
+        """S3 본문 스트림 (OSD 가 필요하면 tee_path 에 함께 기록)
+
+        429 재시도로 다시 열면 tee 는 첫 스트림이 닫히며 이미 완성했으므로 다시 쓰지 않는다.
+        """
+        tee_path = self.tee_path if not self.audio_stream_opened else None
+        self.audio_stream_opened = True
+        return S3AudioStream(
+            self.container.http("s3"),
+            self.presigned_url,
+            provider=self.provider.name,
+            tee_path=tee_path,
+            tee_future=self.local_audio_future if tee_path else None,
+        )
+
+    def open_transcoded_stream(self) -> TranscodeStream:
+        """upload_codec 으로 다시 인코딩한 업로드 스트림 (로컬 파일이 있으면 그것을, 없으면 presigned URL 을 읽음)"""
+        return TranscodeStream(
+            self.local_audio_path or self.presigned_url,
+            self.upload_codec,
+            provider=self.provider.name,
+            baseline_bytes=self.transcode_baseline_bytes,
+        )
+
+    def wait_local_audio(self) -> str:
+        """로컬 오디오 경로 반환 (백그라운드 다운로드/tee 중이면 완료까지 대기)"""
+        # tee 예정이었지만 스트림을 열지 않은 경우(이전 작업 재개 등)에는 새로 받는다
+        tee_pending = self.tee_path is not None and not self.audio_stream_opened
+        if self.local_audio_path is None and self.local_audio_future is not None and not tee_pending:
+            try:
+                self.local_audio_path = self.local_audio_future.result()
+            except Exception as e:
+                logger.warning(f"[bg] Background audio fetch failed, downloading again: {str(e)}")
+        if self.local_audio_path is None:
+            self.local_audio_path = download_audio(self)
+        return self.local_audio_path
+
+    def decoded_audio(self) -> DecodedAudio:
+        """디코딩된 PCM 반환 (백그라운드 디코딩 중이면 완료까지 대기)"""
+        if self.pcm is None and self.pcm_future is not None:
+            try:
+                self.pcm = self.pcm_future.result()
+            except Exception as e:
+                logger.warning(f"[bg] Background decode failed, decoding again: {str(e)}")
+        if self.pcm is None:
+            self.pcm = decode_audio(self, self.wait_local_audio())
+        return self.pcm
+
+
+def run_stage(ctx: JobContext, name: str, fn: Callable[[JobContext], Any]) -> Any:
+    """정책(재시도/동시성/타이밍)을 적용해 단계 실행"""
+    policy = STAGE_POLICIES[name]
+    semaphore = _STAGE_SEMAPHORES.get(name)
+    provider_name = ctx.provider.name
+
+    for attempt in range(1, policy.max_attempts + 1):
+        started = time.monotonic()
+        try:
+            if semaphore:
+                with semaphore:
+                    result = fn(ctx)
+            else:
+                result = fn(ctx)
+            elapsed = time.monotonic() - started
+            STAGE_DURATION.labels(provider=provider_name, stage=name, outcome="success").observe(elapsed)
+            ctx.stage_timings[name] = ctx.stage_timings.get(name, 0.0) + elapsed
+            return result
+        except Exception as e:
+            elapsed = time.monotonic() - started
+            STAGE_DURATION.labels(provider=provider_name, stage=name, outcome="error").observe(elapsed)
+            ctx.stage_timings[name] = ctx.stage_timings.get(name, 0.0) + elapsed
+            if attempt < policy.max_attempts:
+                STAGE_RETRIES.labels(provider=provider_name, stage=name).inc()
+                logger.warning(
+                    f"[bg] Stage {name} failed (attempt {attempt}/{policy.max_attempts}), retrying: {str(e)}"
+                )
+                if ctx.db is not None:
+                    ctx.db.rollback()
+                time.sleep(policy.backoff_sec * attempt)
+                continue
+            if policy.optional:
+                logger.warning(f"[bg] Optional stage {name} failed, continuing: {str(e)}")
+                if ctx.db is not None:
+                    ctx.db.rollback()
+                return None
+            raise
+
+
+# --- 오디오 다운로드 ---
+
+def _temp_audio_path(ctx: JobContext) -> str:
+    suffix = os.path.splitext(ctx.s3_key)[1] or ".mp3"
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    temp_file.close()
+    ctx.temp_paths.append(temp_file.name)
+    return temp_file.name
+
+
+def download_audio(ctx: JobContext) -> str:
+    """presigned URL 에서 임시 파일로 병렬 구간 다운로드 (voice.download)"""
+    path = _temp_audio_path(ctx)
+    download_ranged(ctx.container.http("s3"), ctx.presigned_url, path, provider=ctx.provider.name)
+    logger.info(f"[bg] Downloaded from S3: s3_key={ctx.s3_key}")
+    return path
+
+
+def decode_audio(ctx: JobContext, source: str) -> DecodedAudio:
+    """원본(로컬 경로 또는 presigned URL)을 작업용 PCM 파일로 디코딩"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pcm")
+    temp_file.close()
+    ctx.temp_paths.append(temp_file.name)
+    return decode_to_pcm(source, temp_file.name)
+
+
+def _schedule_decode(ctx: JobContext, source: Callable[[], str], force: bool = False) -> None:
+    """OSD(또는 분할 전사)가 쓸 PCM 을 미리 디코딩"""
+    if not (force or _osd_wanted(ctx)) or ctx.pcm_future is not None:
+        return
+    ctx.pcm_future = _prefetch_pool.submit(lambda: decode_audio(ctx, source()))
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """ffprobe 로 오디오 길이(초) 측정 (로컬 경로 또는 URL). 실패하면 None"""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                path,
+            ],
+            capture_output=True, text=True, timeout=30,
+        )
+        return float(result.stdout.strip()) if result.returncode == 0 and result.stdout.strip() else None
+    except Exception:
+        return None
+
+
+def _osd_wanted(ctx: JobContext) -> bool:
+    return bool(ctx.container and ctx.container.enable_osd)
+
+
+# --- 단계 구현 ---
+
+def _lookup_cached_payload(ctx: JobContext) -> None:
+    """같은 오디오/제공자/설정의 전사 결과가 있으면 ctx.payload 에 채운다"""
+    if not result_cache.CACHE_ENABLED or ctx.upload.provider_job_id:
+        return
+    config = ctx.provider.cache_config(ctx)
+    content = result_cache.content_key(ctx.container.s3_client, ctx.bucket_name, ctx.s3_key)
+    if config is None or content is None:
+        return
+    ctx.cache_content = content
+    ctx.cache_key = result_cache.cache_key(ctx.provider.name, content, config)
+    payload = result_cache.lookup(ctx.cache_key, ctx.provider.name)
+    if payload is not None:
+        ctx.payload = payload
+        ctx.cache_hit = True
+        logger.info(
+            f"[bg] STT cache hit ({ctx.provider.name}): upload_id={ctx.upload_id}, skipping provider call"
+        )
+
+
+def _stage_fetch(ctx: JobContext) -> None:
+    ctx.bucket_name = get_s3_bucket_name()
+    ctx.presigned_url = ctx.container.s3_client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": ctx.bucket_name, "Key": ctx.s3_key},
+        ExpiresIn=21600,
+    )
+    _lookup_cached_payload(ctx)
+    if not ctx.cache_hit and channel_split_candidate(ctx) and split_channels(ctx):
+        # 화자별 채널 녹음은 채널 PCM 으로 바로 전사한다 (화자 분리/OSD/상담사 식별 생략)
+        ctx.channel_split = True
+        ctx.audio_duration = ctx.upload.audio_duration_sec or ctx.channel_pcm[0].duration
+        return
+    if ctx.provider.local_audio_required(ctx) and not ctx.cache_hit:
+        ctx.local_audio_path = download_audio(ctx)
+        ctx.audio_duration = ctx.upload.audio_duration_sec or probe_duration(ctx.local_audio_path)
+        local_path = ctx.local_audio_path
+        _schedule_decode(ctx, lambda: local_path)
+        return
+    if not ctx.cache_hit:
+        # 로컬 파일 없이도 길이는 알아둔다 (폴링 간격/ETA 용). 등록 시 확인한 값이 있으면 그대로 쓴다
+        ctx.audio_duration = ctx.upload.audio_duration_sec or probe_duration(ctx.presigned_url)
+        if chunking_enabled(ctx.provider, ctx.audio_duration):
+            # 긴 녹음은 디코딩한 PCM 을 나눠 전사한다 (OSD 도 같은 PCM 을 쓴다)
+            ctx.chunked = True
+            presigned_url = ctx.presigned_url
+            _schedule_decode(ctx, lambda: presigned_url, force=True)
+            return
+    if _osd_wanted(ctx):
+        if ctx.provider.uploads_stream(ctx) and not ctx.cache_hit:
+            # 업로드 스트림을 임시 파일에 tee 해서 OSD 에 쓴다 (S3 를 두 번 읽지 않음).
+            # 디코딩은 업로드가 끝난 뒤 transcribe 단계에서 예약한다
+            ctx.tee_path = _temp_audio_path(ctx)
+            ctx.local_audio_future = Future()
+        else:
+            # URL 로 전사하는 제공자는 ffmpeg 가 presigned URL 에서 바로 디코딩한다 (원본 파일 저장 없음)
+            presigned_url = ctx.presigned_url
+            _schedule_decode(ctx, lambda: presigned_url)
+
+
+def _stage_transcode(ctx: JobContext) -> None:
+    # 분할 전사/채널별 전사는 PCM 에서 바로 FLAC 으로 만든다
+    if ctx.cache_hit or ctx.chunked or ctx.channel_split:
+        return
+    ctx.provider.transcode(ctx)
+
+
+def _stage_transcribe(ctx: JobContext) -> None:
+    if ctx.cache_hit:
+        return
+    provider = ctx.provider
+    if ctx.channel_split:
+        ctx.payload = transcribe_channels(ctx)
+        return
+    if ctx.chunked:
+        ctx.payload = transcribe_chunked(ctx)
+        return
+    if not provider.async_polling:
+        ctx.payload = provider.transcribe(ctx)
+        _schedule_tee_decode(ctx)
+        return
+
+    # 작업만 만들고 완료 대기는 폴러에 맡긴다 (스레드 반환)
+    if ctx.upload.provider_job_id:
+        ctx.provider_job_id = ctx.upload.provider_job_id
+        ctx.resumed_provider_job = True
+        logger.info(
+            f"[bg] Resuming {provider.display_name} job: job_id={ctx.provider_job_id}, upload_id={ctx.upload_id}"
+        )
+        return
+    ctx.provider_job_id = provider.submit(ctx)
+    ctx.upload.provider_job_id = ctx.provider_job_id
+    ctx.db.commit()
+    # 제공자가 처리하는 동안 tee 파일을 디코딩해 둔다
+    _schedule_tee_decode(ctx)
+
+
+def _schedule_tee_decode(ctx: JobContext) -> None:
+    if ctx.tee_path and ctx.audio_stream_opened:
+        _schedule_decode(ctx, ctx.wait_local_audio)
+
+
+def _stage_parse(ctx: JobContext) -> None:
+    payload = ctx.payload or {}
+    if "channels" in payload:
+        # 화자 = 채널 역할 (캐시에서 꺼낸 결과도 같은 형식)
+        transcript = merge_channels(ctx.provider, ctx, payload)
+        ctx.channel_split = True
+        ctx.labels_applied = True
+    elif "chunks" in payload:
+        transcript = stitch_chunks(ctx.provider, ctx, payload)
+    else:
+        transcript = ctx.provider.parse(ctx, payload)
+    if not transcript.segments:
+        raise RuntimeError(f"{ctx.provider.display_name} transcript produced no segments")
+    ctx.transcript = transcript
+    if ctx.cache_key and not ctx.cache_hit:
+        result_cache.store(ctx.cache_key, ctx.provider.name, ctx.cache_content, ctx.payload)
+
+    # 상담사 식별 LLM 호출은 상주 루프에 바로 예약해 OSD 재배정과 겹쳐 실행한다
+    # (재배정은 기존 화자 사이에서만 단어를 옮기므로 화자 ID 집합은 그대로다)
+    openai_client = ctx.container.openai_client
+    if openai_client and not ctx.channel_split:
+        snapshot = [dict(seg) for seg in transcript.segments]
+        ctx.counselor_future = get_async_runtime().submit(
+            identify_counselor_speaker_id(openai_client, snapshot)
+        )
+
+
+def _stage_diarize_refine(ctx: JobContext) -> None:
+    """pyannote ONNX 겹침 감지 + 화자 재배정 (ENABLE_OSD, 단어 타임스탬프가 있는 제공자만)"""
+    transcript = ctx.transcript
+    if not _osd_wanted(ctx) or not transcript.words or ctx.channel_split:
+        return
+
+    from voice.diarization import run_segmentation, reassign_overlap_words
+
+    logger.info("[bg] Running pyannote ONNX segmentation...")
+    seg_result = run_segmentation(ctx.decoded_audio())
+    overlap_regions = seg_result["overlap_regions"]
+
+    if not overlap_regions:
+        logger.info("[bg] No overlaps detected or no word timestamps — skipping")
+        return
+
+    transcript.segments = reassign_overlap_words(
+        transcript.segments, transcript.words,
+        seg_result["speaker_probs"],
+        overlap_regions,
+    )
+    transcript.speakers = rebuild_speakers(transcript.segments)
+    logger.info(
+        f"[bg] OSD reassignment applied ({ctx.provider.display_name}): "
+        f"{len(transcript.speakers)} speakers, {len(overlap_regions)} overlaps"
+    )
+
+
+def _stage_label(ctx: JobContext) -> None:
+    transcript = ctx.transcript
+    openai_client = ctx.container.openai_client
+    if not openai_client or ctx.channel_split:
+        return
+
+    future = ctx.counselor_future or get_async_runtime().submit(
+        identify_counselor_speaker_id(openai_client, transcript.segments)
+    )
+    ctx.counselor_future = None
+    counselor_id = future.result()
+    speaker_ids = collect_speaker_ids(transcript.segments)
+    if not counselor_id or counselor_id not in speaker_ids:
+        return
+
+    label_map = build_speaker_label_map(speaker_ids, counselor_id)
+    apply_speaker_labels(transcript.segments, transcript.speakers, label_map)
+    ctx.labels_applied = True
+    logger.info(f"[bg] Speaker labels applied ({ctx.provider.display_name}): counselor={counselor_id}")
+
+
+def _stage_mask(ctx: JobContext) -> None:
+    if not ctx.provider.mask_pii:
+        return
+    transcript = ctx.transcript
+    transcript.full_transcript = mask_transcript(
+        transcript.segments, transcript.speakers, transcript.full_transcript
+    )
+
+
+def _build_dialogue(ctx: JobContext) -> str:
+    dialogue_prefix = "" if ctx.labels_applied else "발화자 "
+    return "\n".join(
+        [f"{dialogue_prefix}{seg['speaker_id']}: {seg['text']}" for seg in ctx.transcript.segments]
+    )
+
+
+def _build_title(ctx: JobContext) -> str:
+    label = f" ({ctx.provider.title_label})" if ctx.provider.title_label else ""
+    if ctx.session_number:
+        return f"{ctx.client.name} - {ctx.session_number}회기 상담{label}"
+    return f"{ctx.client.name} - 상담 기록{label} {datetime.now(KST).strftime('%Y-%m-%d %H:%M')}"
+
+
+def _stage_persist(ctx: JobContext) -> None:
+    """VoiceRecord 와 오디오 이벤트를 한 트랜잭션으로 저장 (재시도해도 레코드가 두 번 생기지 않음)"""
+    if ctx.voice_record_id is not None:
+        logger.info(f"[bg] Voice record already saved: id={ctx.voice_record_id}, skipping persist")
+        return
+
+    db = ctx.db
+    transcript = ctx.transcript
+    segments = transcript.segments
+
+    sorted_speakers = sorted(transcript.speakers.values(), key=lambda x: x["start_time"])
+    if not ctx.dialogue:
+        ctx.dialogue = _build_dialogue(ctx)
+    if transcript.duration:
+        total_duration = int(transcript.duration)
+    else:
+        total_duration = int(segments[-1]["end_time"]) if segments else 0
+
+    voice_record = VoiceRecord(
+        title=_build_title(ctx),
+        user_id=ctx.user_id,
+        client_id=ctx.client_id,
+        session_number=ctx.session_number,
+        s3_key=ctx.s3_key,
+        original_filename=os.path.basename(ctx.s3_key),
+        total_speakers=len(transcript.speakers),
+        full_transcript=transcript.full_transcript,
+        speakers_data=sorted_speakers,
+        segments_data=segments,
+        segments_merged_data=merge_segments(segments) if ctx.provider.store_merged_segments else None,
+        dialogue=ctx.dialogue,
+        language_code=ctx.provider.language_for(ctx),
+        duration=total_duration,
+    )
+    db.add(voice_record)
+    # id 만 먼저 받고, 이벤트까지 추가한 뒤 한 번에 commit — 중간 실패 시 전체가 롤백된다
+    db.flush()
+
+    for evt in transcript.audio_events or []:
+        db.add(VoiceRecordAudioEvent(
+            voice_record_id=voice_record.id,
+            client_id=ctx.client_id,
+            event_type=evt.get("type", "unknown"),
+            start_time=evt.get("start_time", 0.0),
+            end_time=evt.get("end_time", 0.0),
+            confidence=evt.get("confidence"),
+            channel=evt.get("channel"),
+        ))
+    db.commit()
+    db.refresh(voice_record)
+    ctx.voice_record_id = voice_record.id
+
+    if transcript.audio_events:
+        logger.info(
+            f"[bg] Saved {len(transcript.audio_events)} audio events for voice_record_id={voice_record.id}"
+        )
+
+    logger.info(
+        f"[bg] Voice record saved ({ctx.provider.display_name}): id={voice_record.id}, "
+        f"user_id={ctx.user_id}, client_id={ctx.client_id}"
+    )
+
+
+def _build_enrichment_graph(ctx: JobContext, openai_client) -> TaskGraph:
+    """전사 이후 LLM/임베딩 작업 그래프
+
+    1회기: query_embeddings ─┐
+           chunk_embeddings ─┴─ rag_context ── analysis
+    2회기 이상: goal
+
+    모두 DB 에 접근하지 않으므로 persist 단계와 동시에 실행된다 (결과 저장은 enrich 단계).
+    """
+    graph = TaskGraph()
+    session_number = ctx.session_number
+    profile = client_profile(ctx.client)
+    dialogue = ctx.dialogue
+
+    if session_number == 1:
+        if ctx.client.ai_analysis_completed:
+            logger.info(f"[bg] AI analysis already completed for client_id={ctx.client_id}, skipping")
+            return graph
+        chunks = build_semantic_chunks(ctx.transcript.segments)
+        ctx.enrich_chunks = chunks
+
+        async def query_embeddings():
+            try:
+                return await get_rag_query_embeddings(openai_client)
+            except Exception as e:
+                logger.warning(f"[bg] RAG query embedding failed: {str(e)}")
+                return None
+
+        async def chunk_embeddings():
+            if not chunks:
+                logger.warning(f"[bg] No chunks generated for client_id={ctx.client_id}")
+                return None
+            try:
+                return await embed_texts(openai_client, chunks)
+            except Exception as e:
+                logger.warning(f"[bg] RAG chunking skipped due to error: {str(e)}")
+                return None
+
+        async def rag_context(chunk_vectors, query_vectors):
+            if not chunk_vectors or not query_vectors:
+                logger.warning("[bg] RAG context unavailable, fallback to dialogue")
+                return []
+            return select_rag_context(chunks, chunk_vectors, query_vectors)
+
+        async def analysis(rag_chunks):
+            return await generate_first_session_analysis(
+                openai_client, profile, format_rag_context(rag_chunks, dialogue),
+            )
+
+        graph.add("query_embeddings", query_embeddings)
+        graph.add("chunk_embeddings", chunk_embeddings)
+        graph.add("rag_context", rag_context, deps=("chunk_embeddings", "query_embeddings"))
+        graph.add("analysis", analysis, deps=("rag_context",))
+    elif session_number and session_number > 1:
+        # 기록 저장 전에 목표 생성을 미리 시작한다 (저장 실패 시 결과는 버림)
+        async def goal():
+            return await generate_next_session_goal(openai_client, profile, session_number, dialogue)
+
+        graph.add("goal", goal)
+    return graph
+
+
+def _stage_enrich_dispatch(ctx: JobContext) -> None:
+    """대화문을 확정하고 후처리 LLM 작업을 상주 루프에 미리 예약"""
+    ctx.dialogue = _build_dialogue(ctx)
+    openai_client = ctx.container.openai_client
+    if not openai_client:
+        return
+    graph = _build_enrichment_graph(ctx, openai_client)
+    if graph:
+        ctx.enrich_graph = graph
+        ctx.enrich_future = get_async_runtime().submit(graph.run())
+
+
+def _stage_enrich(ctx: JobContext) -> None:
+    """1회기: RAG 청크 저장 + 내담자 AI 분석 반영 / 2회기 이상: 다음 회기 목표 저장"""
+    if ctx.enrich_future is None:
+        return
+    future, ctx.enrich_future = ctx.enrich_future, None
+    results = future.result()
+    db = ctx.db
+    voice_record_id = ctx.voice_record_id
+    timings = ", ".join(f"{name}={elapsed:.1f}s" for name, elapsed in ctx.enrich_graph.timings.items())
+    logger.info(f"[bg] Enrichment tasks finished for voice_record_id={voice_record_id}: {timings}")
+
+    if ctx.session_number == 1:
+        chunk_vectors = results.get("chunk_embeddings")
+        if chunk_vectors and not isinstance(chunk_vectors, BaseException):
+            try:
+                store_record_chunks(
+                    db, voice_record_id, ctx.client_id, ctx.session_number, ctx.enrich_chunks, chunk_vectors,
+                )
+                logger.info(f"[bg] Stored {len(ctx.enrich_chunks)} chunks for voice_record_id={voice_record_id}")
+            except Exception as e:
+                logger.warning(f"[bg] RAG chunking skipped due to error: {str(e)}")
+                db.rollback()
+
+        logger.info(f"[bg] First session detected for client_id={ctx.client_id}, applying AI analysis")
+        result = results.get("analysis")
+        if isinstance(result, BaseException):
+            logger.error(f"AI analysis failed for client_id={ctx.client_id}: {str(result)}")
+        elif result:
+            apply_first_session_analysis(db, ctx.client, result)
+    elif "goal" in results:
+        logger.info(
+            f"[bg] Session {ctx.session_number} detected for client_id={ctx.client_id}, saving next session goal"
+        )
+        goal_text = results["goal"]
+        if isinstance(goal_text, BaseException):
+            logger.error(
+                f"Next session goal analysis failed for voice_record_id={voice_record_id}: {str(goal_text)}"
+            )
+        elif not goal_text:
+            logger.warning(f"Next session goal empty for voice_record_id={voice_record_id}")
+        else:
+            save_next_session_goal(db, ctx.client_id, voice_record_id, ctx.session_number, goal_text)
+
+
+STAGE_FUNCS: dict[str, Callable[[JobContext], Any]] = {
+    "fetch": _stage_fetch,
+    "transcode": _stage_transcode,
+    "transcribe": _stage_transcribe,
+    "parse": _stage_parse,
+    "diarize_refine": _stage_diarize_refine,
+    "label": _stage_label,
+    "mask": _stage_mask,
+    "enrich_dispatch": _stage_enrich_dispatch,
+    "persist": _stage_persist,
+    "enrich": _stage_enrich,
+}
+
+
+def _publish(ctx: JobContext, **fields) -> None:
+    publish_progress(
+        ctx.upload_id,
+        user_id=ctx.user_id,
+        client_id=ctx.client_id,
+        session_number=ctx.session_number,
+        **fields,
+    )
+
+
+def _provider_eta(ctx: JobContext, submitted_at: Optional[float] = None) -> Optional[float]:
+    """제공자 전사 완료까지 남은 예상 시간 (오디오 길이 × RTF 추정치)"""
+    if not ctx.audio_duration:
+        return None
+    expected = ctx.audio_duration * get_provider_poller().rtf.estimate(ctx.provider)
+    if submitted_at is not None:
+        expected -= time.monotonic() - submitted_at
+    return max(0.0, expected)
+
+
+def _report_progress(ctx: JobContext, stage: str, eta_sec: Optional[float] = None) -> None:
+    if stage == ctx.progress_stage:
+        return
+    ctx.progress_stage = stage
+    _publish(ctx, stage=stage, status="processing", eta_sec=eta_sec)
+
+
+def _report_stage(ctx: JobContext, stage: str) -> None:
+    if ctx.cache_hit and stage in ("transcode", "transcribe"):
+        return
+    progress = PIPELINE_STAGE_PROGRESS[stage]
+    eta_sec = None
+    if stage == "transcribe":
+        # 동기 제공자는 요청과 동시에 전사가 시작된다
+        if not ctx.provider.async_polling:
+            progress = "provider-running"
+        eta_sec = _provider_eta(ctx)
+    _report_progress(ctx, progress, eta_sec)
+
+
+def _fail_upload(ctx: JobContext, message: str) -> None:
+    ctx.upload.status = "failed"
+    ctx.upload.error_message = message
+    ctx.db.commit()
+    _publish(ctx, status="failed", error_message=message)
+
+
+def _cleanup(ctx: JobContext) -> None:
+    for pending in (ctx.counselor_future, ctx.enrich_future, ctx.pcm_future):
+        if pending is not None:
+            pending.cancel()
+    if ctx.local_audio_future is not None and not ctx.local_audio_future.done():
+        ctx.local_audio_future.cancel()
+    for path in ctx.temp_paths:
+        if path and os.path.exists(path):
+            try:
+                os.unlink(path)
+                logger.info(f"[bg] Temporary file deleted: {path}")
+            except Exception:
+                logger.exception("[bg] Failed to delete temporary file")
+
+
+def _run_stages(ctx: JobContext, stages: tuple[str, ...]) -> bool:
+    """단계 실행. 제공자 작업 완료를 기다려야 하면 True (파킹)"""
+    for stage in stages:
+        _report_stage(ctx, stage)
+        run_stage(ctx, stage, STAGE_FUNCS[stage])
+        if stage == "transcribe" and ctx.payload is None and ctx.provider_job_id:
+            return True
+    return False
+
+
+def _complete(ctx: JobContext) -> None:
+    ctx.upload.status = "completed"
+    ctx.upload.voice_record_id = ctx.voice_record_id
+    ctx.upload.error_message = None
+    ctx.db.commit()
+    _publish(ctx, status="completed")
+    timings = ", ".join(f"{name}={elapsed:.1f}s" for name, elapsed in ctx.stage_timings.items())
+    logger.info(f"[bg] STT pipeline completed ({ctx.provider.name}): upload_id={ctx.upload_id}, {timings}")
+
+
+def _handle_failure(ctx: JobContext, e: Exception) -> None:
+    logger.exception(f"[bg] STT pipeline failed ({ctx.provider.name}): {str(e)}")
+    if not ctx.upload:
+        return
+    try:
+        ctx.db.rollback()
+    except Exception:
+        pass
+    if isinstance(e, RateLimited):
+        # 한도가 풀릴 때까지 실패 대신 큐로 되돌린다
+        defer_upload(
+            ctx.db,
+            upload_id=ctx.upload_id,
+            delay_sec=e.retry_after,
+            reason=f"{e.key} rate limited; retrying",
+        )
+        _publish(ctx, status="queued", eta_sec=e.retry_after)
+        return
+    if isinstance(e, ProviderJobFailed):
+        # 재시도 시 새 제공자 작업을 만들도록 초기화
+        ctx.upload.provider_job_id = None
+    _fail_upload(ctx, str(e))
+
+
+def _park(ctx: JobContext) -> Optional[Future]:
+    """폴러에 완료 대기를 넘긴다. 후처리까지 끝나면 완료되는 Future 반환
+
+    완료 콜백은 파킹 표시(parked_at)가 있는 동안만 작업을 큐로 되돌리므로, 폴러에 넘기기 전에 표시한다.
+    그 사이 작업을 잃었으면(유실 복구 등) 파킹하지 않고 None.
+    """
+    if not mark_upload_parked(ctx.db, upload_id=ctx.upload_id, worker_id=ctx.locked_by):
+        logger.info(f"[bg] Upload taken over by another worker before parking: upload_id={ctx.upload_id}")
+        return None
+    done: Future = Future()
+    job = ctx.provider.tracked_job(ctx, ctx.provider_job_id)
+    job.poll_now = ctx.resumed_provider_job
+    if webhook_enabled(ctx.provider.name):
+        job.min_interval = WEBHOOK_FALLBACK_POLL_SEC
+    job.on_status = lambda status: _report_progress(
+        ctx,
+        "provider-running" if status in ctx.provider.running_statuses else "provider-queued",
+        _provider_eta(ctx, job.submitted_at),
+    )
+    tracked = get_provider_poller().track(ctx.provider, job)
+    tracked.add_done_callback(lambda result: _dispatch_resume(ctx, result, done))
+    logger.info(
+        f"[bg] Upload parked until {ctx.provider.display_name} job completes: "
+        f"upload_id={ctx.upload_id}, job_id={ctx.provider_job_id}"
+    )
+    return done
+
+
+def _dispatch_resume(ctx: JobContext, result: Future, done: Future) -> None:
+    """폴러 루프 스레드에서 호출됨 — 후처리는 STT 실행기로 넘긴다"""
+    executor = get_job_executor()
+    try:
+        executor.submit(_resume, ctx, result, done)
+    except JobExecutorFull:
+        # 루프를 막지 않도록 별도 스레드에서 자리가 날 때까지 대기
+        threading.Thread(
+            target=executor.submit,
+            args=(_resume, ctx, result, done),
+            kwargs={"block": True},
+            name=f"stt-resume-{ctx.upload_id}",
+            daemon=True,
+        ).start()
+
+
+def _resume(ctx: JobContext, result: Future, done: Future) -> None:
+    """제공자 작업 완료 후 parse 단계부터 이어서 실행"""
+    ctx.db = SessionLocal()
+    db = ctx.db
+    try:
+        ctx.upload = db.query(VoiceUpload).filter(VoiceUpload.id == ctx.upload_id).first()
+        ctx.client = db.query(Client).filter(Client.id == ctx.client_id).first()
+        if not ctx.upload or not ctx.client:
+            logger.warning(f"[bg] Upload or client vanished while parked: upload_id={ctx.upload_id}")
+            return
+        if not take_parked_upload(
+            db, upload_id=ctx.upload_id, worker_id=ctx.locked_by, provider_job_id=ctx.provider_job_id,
+        ):
+            # 콜백/유실 복구로 다른 워커가 이어받은 경우
+            logger.info(f"[bg] Upload taken over by another worker, dropping parked run: upload_id={ctx.upload_id}")
+            ctx.upload = None
+            return
+        ctx.payload = result.result()
+        _run_stages(ctx, STAGES[STAGES.index("parse"):])
+        _complete(ctx)
+    except Exception as e:
+        _handle_failure(ctx, e)
+    finally:
+        _cleanup(ctx)
+        db.close()
+        done.set_result(None)
+
+
+def run_stt_pipeline(
+    provider_name: str,
+    upload_id: int,
+    s3_key: str,
+    user_id: int,
+    client_id: int,
+    session_number: Optional[int],
+    language_code: Optional[str] = None,
+) -> Optional[Future]:
+    """VoiceUpload 하나를 모든 단계에 걸쳐 처리
+
+    async_polling 제공자는 작업 제출 후 스레드를 반환하고, 후처리가 끝나면 완료되는
+    Future 를 돌려준다 (그 외에는 None).
+    """
+    from config.clients import get_client_container
+
+    provider = get_provider(provider_name)
+    ctx = JobContext(
+        upload_id=upload_id,
+        provider=provider,
+        s3_key=s3_key,
+        user_id=user_id,
+        client_id=client_id,
+        session_number=session_number,
+        language_code=language_code or "ko",
+    )
+    ctx.db = SessionLocal()
+    db = ctx.db
+    parked: Optional[Future] = None
+    try:
+        ctx.upload = db.query(VoiceUpload).filter(
+            VoiceUpload.id == upload_id,
+            VoiceUpload.user_id == user_id,
+        ).first()
+        if not ctx.upload:
+            logger.warning(f"[bg] Upload not found for processing: upload_id={upload_id}, user_id={user_id}")
+            return None
+        ctx.upload.status = "processing"
+        ctx.locked_by = ctx.upload.locked_by
+        db.commit()
+
+        ctx.client = db.query(Client).filter(
+            Client.id == client_id,
+            Client.user_id == user_id,
+        ).first()
+        if not ctx.client:
+            logger.warning(f"[bg] Client not found or unauthorized: client_id={client_id}, user_id={user_id}")
+            _fail_upload(ctx, "Client not found or unauthorized")
+            return None
+
+        ctx.container = get_client_container()
+        missing = provider.missing_config(ctx.container)
+        if missing:
+            logger.error(f"{missing}; skipping STT")
+            _fail_upload(ctx, missing)
+            return None
+        if not ctx.container.s3_client:
+            logger.error("S3 client not configured; skipping STT")
+            _fail_upload(ctx, "S3 client not configured")
+            return None
+
+        if _run_stages(ctx, STAGES):
+            parked = _park(ctx)
+            return parked
+        _complete(ctx)
+    except Exception as e:
+        _handle_failure(ctx, e)
+    finally:
+        # 파킹된 작업은 임시 파일을 남겨두고 재개 시 새 세션을 연다
+        if parked is None:
+            _cleanup(ctx)
+        db.close()
+    return None
@@ -0,0 +1,204 @@
+"""
+제공자 작업 비동기 폴러
+
+Speechmatics / VITO 처럼 작업을 만들고 완료를 조회해야 하는 제공자는
+작업마다 스레드를 잡고 10초씩 잠드는 대신, 상주 이벤트 루프(voice.async_runtime)의
+코루틴 하나가 완료를 기다린다. 완료되면 결과를 Future 로 넘겨 후처리 단계를 이어간다.
+
+조회 간격은 오디오 길이와 제공자별 실시간 배율(RTF, 처리 시간 / 오디오 길이) 추정치로 정한다.
+예상 완료 시점 전에는 드물게, 가까워지거나 지나면 촘촘하게 조회한다.
+RTF 는 완료된 작업으로 지수이동평균(EWMA) 갱신한다.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+
+from logs.logging_util import LoggerSingleton
+from voice.async_runtime import AsyncRuntime, get_async_runtime
+
+if TYPE_CHECKING:
+    from voice.providers.base import SttProvider
+
+logger = LoggerSingleton.get_logger(logger_name="stt_poller", level=logging.INFO)
+
+POLL_MIN_INTERVAL = float(os.getenv("STT_POLL_MIN_SEC", "2"))
+POLL_MAX_INTERVAL = float(os.getenv("STT_POLL_MAX_SEC", "60"))
+POLL_TIMEOUT = int(os.getenv("STT_POLL_TIMEOUT_SEC", "21600"))
+POLL_MAX_ERRORS = int(os.getenv("STT_POLL_MAX_ERRORS", "5"))
+RTF_ALPHA = float(os.getenv("STT_POLL_RTF_ALPHA", "0.3"))
+
+POLLER_INFLIGHT = Gauge("stt_poller_inflight_jobs", "폴러가 완료를 기다리는 제공자 작업 수", ["provider"])
+POLLER_REQUESTS = Counter("stt_poller_requests_total", "제공자 상태 조회 횟수", ["provider", "outcome"])
+POLLER_RTF = Gauge("stt_poller_rtf_estimate", "제공자별 실시간 배율 추정치", ["provider"])
+POLLER_PICKUP_DELAY = Histogram(
+    "stt_poller_job_seconds",
+    "제공자 작업 제출부터 완료 확인까지 걸린 시간",
+    ["provider"],
+    buckets=(5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200),
+)
+
+
+class ProviderJobFailed(RuntimeError):
+    """제공자가 작업 실패를 보고한 경우 (재시도 시 새 작업을 만들어야 함)"""
+
+
+@dataclass
+class TrackedJob:
+    """폴러가 추적하는 제공자 작업"""
+    provider: str
+    job_id: str
+    upload_id: int
+    state: dict = field(default_factory=dict)  # 인증 헤더 등 제공자별 조회 정보
+    audio_duration: Optional[float] = None  # 초 (모르면 None, 조회 중 알게 되면 갱신)
+    submitted_at: float = field(default_factory=time.monotonic)
+    polls: int = 0
+    overdue_polls: int = 0
+    errors: int = 0
+    poll_now: bool = False  # 이미 끝났을 수 있는 작업 (재개/콜백) 은 바로 1회 조회
+    min_interval: float = 0.0  # 콜백을 받는 제공자는 느린 보조 폴링만 수행
+    provider_status: Optional[str] = None  # 마지막 조회에서 제공자가 보고한 상태
+    on_status: Optional[Callable[[str], None]] = None  # 상태가 바뀌면 스레드에서 호출 (진행 상황 알림)
+
+
+class RtfEstimator:
+    """제공자별 실시간 배율 EWMA"""
+
+    def __init__(self, alpha: float = RTF_ALPHA):
+        self.alpha = alpha
+        self._rtf: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, provider: "SttProvider") -> float:
+        with self._lock:
+            return self._rtf.get(provider.name, provider.expected_rtf)
+
+    def observe(self, provider: "SttProvider", audio_duration: Optional[float], elapsed: float) -> None:
+        if not audio_duration or audio_duration <= 0:
+            return
+        sample = elapsed / audio_duration
+        with self._lock:
+            prev = self._rtf.get(provider.name, provider.expected_rtf)
+            value = prev + self.alpha * (sample - prev)
+            self._rtf[provider.name] = value
+        POLLER_RTF.labels(provider=provider.name).set(value)
+
+
+class ProviderJobPoller:
+    """상주 루프에서 제공자 작업 완료를 기다리는 폴러"""
+
+    def __init__(self, runtime: Optional[AsyncRuntime] = None):
+        self._runtime = runtime or get_async_runtime()
+        self.rtf = RtfEstimator()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._jobs: dict[tuple[str, str], TrackedJob] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        # 루프 스레드에서만 호출
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            )
+        return self._http
+
+    def inflight(self) -> int:
+        return len(self._jobs)
+
+    def next_interval(self, provider: "SttProvider", job: TrackedJob) -> float:
+        """다음 조회까지 대기 시간 (초)"""
+        if job.poll_now and job.polls == 0:
+            return 0.0
+        elapsed = time.monotonic() - job.submitted_at
+        if job.audio_duration:
+            remaining = job.audio_duration * self.rtf.estimate(provider) - elapsed
+            if remaining > 0:
+                interval = remaining / 2
+            else:
+                # 예상보다 늦어지면 최소 간격부터 천천히 늘린다
+                interval = POLL_MIN_INTERVAL * (1.5 ** job.overdue_polls)
+                job.overdue_polls += 1
+        else:
+            # 길이를 모르면 경과 시간에 비례해 간격을 늘린다
+            interval = elapsed * 0.2
+        return max(job.min_interval, min(POLL_MAX_INTERVAL, max(POLL_MIN_INTERVAL, interval)))
+
+    def track(self, provider: "SttProvider", job: TrackedJob) -> Future:
+        """작업 추적 시작. 완료 시 제공자 결과(dict) 를 담는 Future 반환"""
+        return self._runtime.submit(self._watch(provider, job))
+
+    async def _watch(self, provider: "SttProvider", job: TrackedJob) -> dict:
+        key = (job.provider, job.job_id)
+        self._jobs[key] = job
+        POLLER_INFLIGHT.labels(provider=provider.name).inc()
+        logger.info(
+            f"Tracking {provider.display_name} job: job_id={job.job_id}, upload_id={job.upload_id}"
+        )
+        reported_status: Optional[str] = None
+        try:
+            while True:
+                await asyncio.sleep(self.next_interval(provider, job))
+                job.polls += 1
+                try:
+                    payload = await provider.poll(self._client(), job)
+                except ProviderJobFailed:
+                    POLLER_REQUESTS.labels(provider=provider.name, outcome="failed").inc()
+                    raise
+                except Exception as e:
+                    POLLER_REQUESTS.labels(provider=provider.name, outcome="error").inc()
+                    job.errors += 1
+                    logger.warning(
+                        f"{provider.display_name} status check failed "
+                        f"({job.errors}/{POLL_MAX_ERRORS}): job_id={job.job_id}, {str(e)}"
+                    )
+                    if job.errors >= POLL_MAX_ERRORS:
+                        raise
+                    continue
+
+                job.errors = 0
+                elapsed = time.monotonic() - job.submitted_at
+                if payload is not None:
+                    POLLER_REQUESTS.labels(provider=provider.name, outcome="done").inc()
+                    POLLER_PICKUP_DELAY.labels(provider=provider.name).observe(elapsed)
+                    if not job.poll_now:
+                        self.rtf.observe(provider, job.audio_duration, elapsed)
+                    logger.info(
+                        f"{provider.display_name} job completed: job_id={job.job_id}, "
+                        f"polls={job.polls}, elapsed={elapsed:.1f}s"
+                    )
+                    return payload
+
+                POLLER_REQUESTS.labels(provider=provider.name, outcome="pending").inc()
+                if job.on_status and job.provider_status and job.provider_status != reported_status:
+                    reported_status = job.provider_status
+                    try:
+                        await asyncio.to_thread(job.on_status, reported_status)
+                    except Exception:
+                        logger.exception(f"Status callback failed: job_id={job.job_id}")
+                if elapsed > POLL_TIMEOUT:
+                    raise TimeoutError(f"{provider.display_name} job timed out")
+        finally:
+            self._jobs.pop(key, None)
+            POLLER_INFLIGHT.labels(provider=provider.name).dec()
+
+
+_poller: Optional[ProviderJobPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_provider_poller() -> ProviderJobPoller:
+    """프로세스 공용 제공자 작업 폴러"""
+    global _poller
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                _poller = ProviderJobPoller()
+    return _poller
@@ -0,0 +1,207 @@
+"""
+STT 작업 진행 상황 알림 (Postgres LISTEN/NOTIFY)
+
+워커는 단계가 바뀔 때마다 voice_uploads.progress_stage 를 갱신하고
+voice_upload_progress 채널로 NOTIFY 를 보낸다.
+웹 프로세스는 채널을 LISTEN 하는 스레드 하나를 두고, 사용자별 구독자(SSE 연결)에게 이벤트를 나눠준다.
+
+진행 단계: downloading → transcoding → provider-queued → provider-running → diarizing
+         → labeling → persisting → analyzing
+"""
+
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Optional
+
+import psycopg2
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+
+from database import DATABASE_URL, engine
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="progress", level=logging.INFO)
+
+PROGRESS_CHANNEL = "voice_upload_progress"
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("PROGRESS_SUBSCRIBER_QUEUE_SIZE", "100"))
+
+PROGRESS_STAGES = (
+    "downloading",
+    "transcoding",
+    "provider-queued",
+    "provider-running",
+    "diarizing",
+    "labeling",
+    "persisting",
+    "analyzing",
+)
+
+# 파이프라인 단계 → 사용자에게 보여줄 진행 단계
+PIPELINE_STAGE_PROGRESS = {
+    "fetch": "downloading",
+    "transcode": "transcoding",
+    "transcribe": "provider-queued",
+    "parse": "diarizing",
+    "diarize_refine": "diarizing",
+    "label": "labeling",
+    "mask": "labeling",
+    "enrich_dispatch": "persisting",
+    "persist": "persisting",
+    "enrich": "analyzing",
+}
+
+PROGRESS_EVENTS = Counter("stt_progress_events_total", "발행한 진행 상황 이벤트 수", ["stage"])
+PROGRESS_SUBSCRIBERS = Gauge("stt_progress_subscribers", "진행 상황 스트림 구독자 수")
+
+
+def publish_progress(
+    upload_id: int,
+    *,
+    user_id: int,
+    client_id: int,
+    session_number: Optional[int] = None,
+    stage: Optional[str] = None,
+    status: Optional[str] = None,
+    eta_sec: Optional[float] = None,
+    error_message: Optional[str] = None,
+) -> None:
+    """진행 단계 저장 + NOTIFY (실패해도 작업에는 영향 없음)
+
+    작업 세션의 트랜잭션과 섞이지 않도록 별도 연결에서 바로 커밋한다.
+    """
+    event = {
+        "upload_id": upload_id,
+        "user_id": user_id,
+        "client_id": client_id,
+        "session_number": session_number,
+        "stage": stage,
+        "status": status,
+        "eta_sec": round(eta_sec) if eta_sec is not None else None,
+        "error_message": error_message,
+        "at": time.time(),
+    }
+    try:
+        with engine.begin() as conn:
+            if stage is not None:
+                conn.execute(
+                    text("UPDATE voice_uploads SET progress_stage = :stage WHERE id = :id"),
+                    {"stage": stage, "id": upload_id},
+                )
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": PROGRESS_CHANNEL, "payload": json.dumps(event, ensure_ascii=False)},
+            )
+        PROGRESS_EVENTS.labels(stage=stage or status or "unknown").inc()
+    except Exception:
+        logger.exception(f"Failed to publish progress: upload_id={upload_id}, stage={stage}, status={status}")
+
+
+class ProgressBroker:
+    """LISTEN 스레드 하나로 받은 이벤트를 사용자별 asyncio 큐로 전달"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="progress-listener", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """현재 이벤트 루프에서 읽을 큐를 등록"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(entry)
+            self._ensure_started()
+        PROGRESS_SUBSCRIBERS.inc()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            entries = self._subscribers.get(user_id, set())
+            for entry in [e for e in entries if e[1] is queue]:
+                entries.discard(entry)
+                PROGRESS_SUBSCRIBERS.dec()
+            if not entries:
+                self._subscribers.pop(user_id, None)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        # 느린 구독자는 오래된 이벤트를 버리고 최신 상태를 유지
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(event)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Malformed progress payload: {payload[:200]}")
+            return
+        with self._lock:
+            entries = list(self._subscribers.get(event.get("user_id"), ()))
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # 구독한 루프가 이미 닫힘
+                self.unsubscribe(event.get("user_id"), queue)
+
+    def _listen_forever(self) -> None:
+        backoff = 1.0
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {PROGRESS_CHANNEL}")
+                logger.info(f"Listening for progress events on {PROGRESS_CHANNEL}")
+                backoff = 1.0
+                while not self._stopped.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception(f"Progress listener disconnected, reconnecting in {backoff:.0f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+_broker: Optional[ProgressBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_progress_broker() -> ProgressBroker:
+    """웹 프로세스 공용 진행 상황 브로커"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = ProgressBroker()
+    return _broker
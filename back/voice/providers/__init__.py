@@ -0,0 +1,33 @@
+# STT provider adapters
+from .base import ParsedTranscript, SttProvider
+from .assemblyai import AssemblyAIProvider
+from .speechmatics import SpeechmaticsProvider
+from .deepgram import DeepgramNova2Provider
+from .vito import VitoProvider
+from .voxtral import VoxtralProvider
+
+PROVIDERS: dict[str, SttProvider] = {
+    provider.name: provider
+    for provider in (
+        AssemblyAIProvider(),
+        SpeechmaticsProvider(),
+        DeepgramNova2Provider(),
+        VitoProvider(),
+        VoxtralProvider(),
+    )
+}
+
+
+def get_provider(name: str) -> SttProvider:
+    try:
+        return PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown STT provider: {name}")
+
+
+__all__ = [
+    "ParsedTranscript",
+    "SttProvider",
+    "PROVIDERS",
+    "get_provider",
+]
@@ -0,0 +1,99 @@
+"""
+AssemblyAI 어댑터
+"""
+
+import logging
+from typing import Optional
+
+import assemblyai as aai
+
+from logs.logging_util import LoggerSingleton
+from voice.providers.base import ParsedTranscript, SttProvider
+from voice.rate_limit import call_sdk_with_limit, is_rate_limited
+from voice.transcript import parse_assemblyai_results
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+
+class AssemblyAIProvider(SttProvider):
+    name = "assemblyai"
+    display_name = "AssemblyAI"
+    streams_audio = True
+    supports_url_ingest = True
+    supports_chunking = True
+    supports_channel_split = True
+
+    def missing_config(self, container) -> Optional[str]:
+        if not container.assemblyai_api_key:
+            return "ASSEMBLYAI_API_KEY not configured"
+        return None
+
+    def build_options(self, ctx, diarize: bool = True) -> dict:
+        return {
+            "speaker_labels": diarize,
+            "language_code": self.language_for(ctx),
+            "punctuate": True,
+            "format_text": False,
+            # disfluencies 는 영어만 지원
+            "disfluencies": self.language_for(ctx).lower().startswith("en"),
+            "filter_profanity": False,
+        }
+
+    def cache_config(self, ctx) -> Optional[dict]:
+        return self.build_options(ctx)
+
+    def build_config(self, ctx, diarize: bool = True) -> aai.TranscriptionConfig:
+        options = self.build_options(ctx, diarize)
+        if not options["disfluencies"]:
+            logger.info(f"[bg] Disfluencies not supported for language_code={options['language_code']}, disabling.")
+        return aai.TranscriptionConfig(**options)
+
+    @staticmethod
+    def _transcribe(transcriber: aai.Transcriber, source, config: aai.TranscriptionConfig) -> aai.Transcript:
+        # SDK 는 요청 오류를 예외 대신 error 상태 전사로 돌려주므로, 429 는 예외로 바꿔 대기/재시도하게 한다
+        transcript = transcriber.transcribe(source, config)
+        if transcript.status == aai.TranscriptStatus.error and is_rate_limited(RuntimeError(str(transcript.error))):
+            raise RuntimeError(f"AssemblyAI rate limited: {transcript.error}")
+        return transcript
+
+    def transcribe(self, ctx) -> dict:
+        transcriber = aai.Transcriber()
+        config = self.build_config(ctx)
+
+        transcript = None
+        if self.url_ingest(ctx):
+            # presigned URL 을 넘기면 AssemblyAI 가 S3 에서 직접 가져간다
+            logger.info("[bg] Starting transcription with AssemblyAI (URL ingest)...")
+            transcript = call_sdk_with_limit(self.name, self._transcribe, transcriber, ctx.presigned_url, config)
+            if transcript.status == aai.TranscriptStatus.error and "download" in str(transcript.error).lower():
+                logger.warning(f"AssemblyAI could not fetch the URL, uploading instead: {transcript.error}")
+                transcript = None
+
+        if transcript is None:
+            logger.info("[bg] Starting transcription with AssemblyAI...")
+
+            def upload() -> aai.Transcript:
+                # SDK 업로드에 S3 본문 스트림을 그대로 넘긴다 (429 재시도 시 스트림을 다시 연다)
+                with ctx.open_audio_stream() as audio_stream:
+                    return self._transcribe(transcriber, audio_stream, config)
+
+            transcript = call_sdk_with_limit(self.name, upload)
+
+        if transcript.status == aai.TranscriptStatus.error:
+            logger.error(f"AssemblyAI transcription failed: {transcript.error}")
+            raise RuntimeError(f"AssemblyAI transcription failed: {transcript.error}")
+
+        logger.info(f"[bg] Transcription completed: {len(transcript.utterances or [])} utterances")
+        return transcript.json_response
+
+    def transcribe_chunk(self, ctx, path: str, diarize: bool = True) -> dict:
+        transcript = call_sdk_with_limit(
+            self.name, self._transcribe, aai.Transcriber(), path, self.build_config(ctx, diarize),
+        )
+        if transcript.status == aai.TranscriptStatus.error:
+            raise RuntimeError(f"AssemblyAI chunk transcription failed: {transcript.error}")
+        return transcript.json_response
+
+    def parse(self, ctx, payload: dict) -> ParsedTranscript:
+        segments, speakers, full_transcript = parse_assemblyai_results(payload)
+        return ParsedTranscript(segments=segments, speakers=speakers, full_transcript=full_transcript)
@@ -0,0 +1,157 @@
+"""
+STT 제공자 어댑터 공통 인터페이스
+
+파이프라인(voice.pipeline)은 제공자와 무관한 단계(fetch → ... → enrich)를 실행하고,
+제공자별로 다른 부분(설정 확인, 전사 요청, 결과 파싱)만 어댑터에 위임한다.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+    from voice.pipeline import JobContext
+    from voice.poller import TrackedJob
+
+
+# presigned URL 을 넘겨 제공자가 직접 오디오를 가져가게 할 제공자 (지원하는 어댑터만 해당)
+URL_INGEST_PROVIDERS = {
+    name.strip()
+    for name in os.getenv("STT_URL_INGEST_PROVIDERS", "assemblyai,voxtral").split(",")
+    if name.strip()
+}
+
+
+@dataclass
+class ParsedTranscript:
+    """제공자 응답을 공통 형식으로 변환한 결과"""
+    segments: list[dict]
+    speakers: dict[str, dict]
+    full_transcript: str
+    words: list[dict] = field(default_factory=list)  # OSD 화자 재배정용 단어 타임스탬프
+    audio_events: list[dict] = field(default_factory=list)  # 비언어 이벤트 (Speechmatics)
+    duration: Optional[float] = None  # 제공자가 알려준 오디오 길이 (초)
+
+
+class SttProvider:
+    """STT 제공자 어댑터 기본 클래스"""
+
+    name: str = ""
+    display_name: str = ""
+    # 기록 제목에 붙는 제공자 표기 (예: "VITO" → "... 1회기 상담 (VITO)")
+    title_label: Optional[str] = None
+    # 요청 언어와 무관하게 고정 사용하는 언어 (None 이면 요청 언어 사용)
+    fixed_language: Optional[str] = None
+    # 전사 전에 로컬 오디오 파일이 필요한지 (presigned URL 을 직접 넘길 수 없는 경우)
+    needs_local_audio: bool = False
+    # 로컬 파일 대신 S3 본문을 제공자 업로드로 바로 흘려보내는지 (ctx.open_audio_stream)
+    streams_audio: bool = False
+    # presigned URL 을 받아 제공자가 직접 가져가는 방식을 지원하는지 (URL_INGEST_PROVIDERS 로 켬)
+    supports_url_ingest: bool = False
+    # 원본 그대로 보낼 수 없는 확장자와, 그때 다시 인코딩할 코덱 (voice.streaming.UPLOAD_CODECS,
+    # STT_UPLOAD_CODEC_<NAME> 으로 변경 가능)
+    transcode_extensions: tuple[str, ...] = ()
+    upload_codec: Optional[str] = None
+    # 긴 녹음을 무음 기준으로 나눠 동시에 전사할 수 있는지 (voice.chunking, transcribe_chunk 구현 필요)
+    supports_chunking: bool = False
+    # 화자별 채널 녹음을 채널마다 화자 분리 없이 전사할 수 있는지 (voice.channels, transcribe_chunk(diarize=False))
+    supports_channel_split: bool = False
+    # 저장 전 민감정보 마스킹 여부
+    mask_pii: bool = False
+    # segments_merged_data 저장 여부
+    store_merged_segments: bool = False
+    # 작업 생성 후 완료를 조회하는 제공자 (voice.poller 가 스레드 없이 대기)
+    async_polling: bool = False
+    # 처리 시간 / 오디오 길이 초기 추정치 (폴링 간격 계산용, 완료 작업으로 갱신)
+    expected_rtf: float = 0.3
+    # 제공자가 실제 전사를 시작했음을 뜻하는 작업 상태 (진행 상황 표시용)
+    running_statuses: tuple[str, ...] = ()
+
+    def missing_config(self, container) -> Optional[str]:
+        """필수 설정이 없으면 오류 메시지 반환"""
+        return None
+
+    def local_audio_required(self, ctx: "JobContext") -> bool:
+        """이 작업의 전사 전에 로컬 파일로 받아야 하는지"""
+        return self.needs_local_audio
+
+    def url_ingest(self, ctx: "JobContext") -> bool:
+        """이 작업을 presigned URL 로 넘길지 (워커는 오디오를 주고받지 않음)"""
+        return self.supports_url_ingest and self.name in URL_INGEST_PROVIDERS
+
+    def uploads_stream(self, ctx: "JobContext") -> bool:
+        """이 작업에서 S3 본문을 업로드 스트림으로 보낼지 (OSD tee 여부 판단용)"""
+        return self.streams_audio and not self.url_ingest(ctx) and not self.needs_transcode(ctx)
+
+    def codec(self) -> Optional[str]:
+        """재인코딩에 쓸 코덱 이름"""
+        return os.getenv(f"STT_UPLOAD_CODEC_{self.name.upper()}", self.upload_codec or "") or None
+
+    def needs_transcode(self, ctx: "JobContext") -> bool:
+        """이 작업의 원본을 업로드 전에 다시 인코딩해야 하는지"""
+        extension = (os.path.splitext(ctx.s3_key)[1] or ".m4a").lower()
+        return self.codec() is not None and extension in self.transcode_extensions
+
+    def cache_config(self, ctx: "JobContext") -> Optional[dict]:
+        """결과 캐시 키에 넣을 설정 (언어, 화자 분리 옵션, 모델 등). None 이면 캐시하지 않음"""
+        return {"language": self.language_for(ctx)}
+
+    def transcode(self, ctx: "JobContext") -> None:
+        """제공자 업로드 전 포맷 결정
+
+        변환이 필요하면 코덱과 업로드 파일명만 정해 두고, 실제 인코딩은 전사 요청이
+        ctx.open_transcoded_stream() 을 읽는 동안 ffmpeg 파이프로 진행된다.
+        """
+        if not self.needs_transcode(ctx):
+            return None
+        from voice.audio import SAMPLE_RATE, probe_audio
+        from voice.streaming import UPLOAD_CODECS
+
+        ctx.upload_codec = self.codec()
+        ctx.upload_name = (
+            os.path.splitext(os.path.basename(ctx.s3_key))[0] + UPLOAD_CODECS[ctx.upload_codec].extension
+        )
+        info = probe_audio(ctx.local_audio_path or ctx.presigned_url)
+        duration = info["duration"] or ctx.audio_duration
+        if duration:
+            # 이전 방식(16 kHz PCM WAV, 채널 유지)으로 보냈을 때의 크기 — 절감량 메트릭 기준
+            ctx.transcode_baseline_bytes = int(duration * SAMPLE_RATE * 2 * (info["channels"] or 1)) + 44
+        return None
+
+    def transcribe(self, ctx: "JobContext") -> dict:
+        """전사 요청 후 제공자 원본 응답(dict) 반환"""
+        if not self.async_polling:
+            raise NotImplementedError
+        from voice.poller import get_provider_poller
+
+        job = self.tracked_job(ctx, self.submit(ctx))
+        return get_provider_poller().track(self, job).result()
+
+    def transcribe_chunk(self, ctx: "JobContext", path: str, diarize: bool = True) -> dict:
+        """로컬 파일 하나를 전사해 원본 응답 반환 (분할 전사 조각, 채널별 전사 — diarize=False 면 화자 분리 끔)"""
+        raise NotImplementedError
+
+    # --- async_polling 제공자용 ---
+    def submit(self, ctx: "JobContext") -> str:
+        """제공자 작업 생성 후 작업 ID 반환"""
+        raise NotImplementedError
+
+    def tracked_job(self, ctx: "JobContext", job_id: str) -> "TrackedJob":
+        """폴러에 넘길 추적 정보 (인증 헤더 등)"""
+        from voice.poller import TrackedJob
+
+        return TrackedJob(
+            provider=self.name, job_id=job_id, upload_id=ctx.upload_id, audio_duration=ctx.audio_duration,
+        )
+
+    async def poll(self, http: "httpx.AsyncClient", job: "TrackedJob") -> Optional[dict]:
+        """상태 1회 조회. 완료면 결과, 진행 중이면 None, 실패면 ProviderJobFailed"""
+        raise NotImplementedError
+
+    def parse(self, ctx: "JobContext", payload: dict) -> ParsedTranscript:
+        raise NotImplementedError
+
+    def language_for(self, ctx: "JobContext") -> str:
+        return self.fixed_language or ctx.language_code or "ko"
@@ -0,0 +1,69 @@
+"""
+Deepgram Nova-2 어댑터
+"""
+
+import logging
+from typing import Optional
+
+
+from logs.logging_util import LoggerSingleton
+from voice.providers.base import ParsedTranscript, SttProvider
+from voice.rate_limit import call_with_limit
+from voice.transcript import parse_deepgram_results
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+
+class DeepgramNova2Provider(SttProvider):
+    name = "deepgram_nova2"
+    display_name = "Deepgram"
+    title_label = "Deepgram"
+    fixed_language = "ko"
+    mask_pii = True
+    store_merged_segments = True
+
+    def missing_config(self, container) -> Optional[str]:
+        if not container.deepgram_api_key:
+            return "DEEPGRAM_API_KEY not configured"
+        return None
+
+    def build_params(self) -> dict:
+        return {
+            "model": "nova-2",
+            "language": "ko",
+            "diarize": "true",
+            "utterances": "true",
+            "punctuate": "true",
+            "smart_format": "false",
+            "redact": ["pii", "pci", "phi"],
+        }
+
+    def cache_config(self, ctx) -> Optional[dict]:
+        return self.build_params()
+
+    def transcribe(self, ctx) -> dict:
+        params = self.build_params()
+        headers = {
+            "Authorization": f"Token {ctx.container.deepgram_api_key}",
+            "Content-Type": "application/json",
+        }
+
+        logger.info("[bg] Starting transcription with Deepgram Nova-2...")
+        response = call_with_limit(
+            self.name,
+            ctx.container.http(self.name).post,
+            "https://api.deepgram.com/v1/listen",
+            params=params,
+            headers=headers,
+            json={"url": ctx.presigned_url},
+            timeout=120,
+        )
+        if not response.ok:
+            raise RuntimeError(
+                f"Deepgram transcription failed: {response.status_code} {response.text}"
+            )
+        return response.json()
+
+    def parse(self, ctx, payload: dict) -> ParsedTranscript:
+        segments, speakers, full_transcript = parse_deepgram_results(payload)
+        return ParsedTranscript(segments=segments, speakers=speakers, full_transcript=full_transcript)
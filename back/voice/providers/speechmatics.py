@@ -0,0 +1,184 @@
+"""
+Speechmatics 어댑터
+"""
+
+import json
+import logging
+from typing import Optional
+
+from logs.logging_util import LoggerSingleton
+from voice.poller import ProviderJobFailed, TrackedJob
+from voice.providers.base import ParsedTranscript, SttProvider
+from voice.rate_limit import acquire_token_async, call_with_limit
+from voice.transcript import extract_speechmatics_words, parse_speechmatics_results
+from voice.webhooks import callback_url
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+FAILED_STATUSES = {"rejected", "failed", "error", "expired", "deleted"}
+
+
+class SpeechmaticsProvider(SttProvider):
+    name = "speechmatics"
+    display_name = "Speechmatics"
+    async_polling = True
+    expected_rtf = 0.4
+    running_statuses = ("running",)
+
+    def missing_config(self, container) -> Optional[str]:
+        if not container.speechmatics_api_key:
+            return "SPEECHMATICS_API_KEY not configured"
+        return None
+
+    def _api(self, ctx) -> tuple[str, dict]:
+        api_url = (
+            ctx.container.speechmatics_api_url
+            or "https://asr.api.speechmatics.com/v2"
+        ).rstrip("/")
+        headers = {"Authorization": f"Bearer {ctx.container.speechmatics_api_key}"}
+        return api_url, headers
+
+    def build_config(self, ctx) -> dict:
+        config = {
+            "type": "transcription",
+            "fetch_data": {"url": ctx.presigned_url},
+            "transcription_config": {
+                "language": self.language_for(ctx),
+                "operating_point": "enhanced",
+                "diarization": "speaker",
+                "speaker_diarization_config": {
+                    "prefer_current_speaker": True,
+                    "speaker_sensitivity": 1.0,
+                },
+                "transcript_filtering_config": {"remove_disfluencies": False},
+                "audio_filtering_config": {"volume_threshold": 0},
+            },
+            "audio_events_config": {},
+        }
+        notify_url = callback_url(self.name, ctx.upload_id)
+        if notify_url:
+            # 완료 시 ?id=<job_id>&status=<status> 가 붙어 호출된다
+            config["notification_config"] = [{"url": notify_url, "contents": ["jobinfo"], "method": "post"}]
+        return config
+
+    def cache_config(self, ctx) -> Optional[dict]:
+        config = self.build_config(ctx)
+        config.pop("fetch_data", None)
+        config.pop("notification_config", None)
+        return config
+
+    def submit(self, ctx) -> str:
+        api_url, headers = self._api(ctx)
+        config = self.build_config(ctx)
+
+        logger.info("[bg] Starting transcription with Speechmatics...")
+        create_response = call_with_limit(
+            self.name,
+            ctx.container.http(self.name).post,
+            f"{api_url}/jobs",
+            headers=headers,
+            files={"config": (None, json.dumps(config), "application/json")},
+            timeout=30,
+        )
+        if not create_response.ok:
+            raise RuntimeError(
+                f"Speechmatics job creation failed: {create_response.status_code} {create_response.text}"
+            )
+
+        create_payload = create_response.json()
+        create_job = create_payload.get("job", create_payload)
+        job_id = create_job.get("id") or create_job.get("job_id")
+        if not job_id:
+            raise RuntimeError("Speechmatics job ID missing from response")
+
+        logger.info(f"[bg] Speechmatics job created: id={job_id}")
+        return str(job_id)
+
+    def tracked_job(self, ctx, job_id: str) -> TrackedJob:
+        api_url, headers = self._api(ctx)
+        return TrackedJob(
+            provider=self.name,
+            job_id=job_id,
+            upload_id=ctx.upload_id,
+            audio_duration=ctx.audio_duration,
+            state={"api_url": api_url, "headers": headers},
+        )
+
+    async def poll(self, http, job: TrackedJob) -> Optional[dict]:
+        await acquire_token_async(self.name)
+        api_url = job.state["api_url"]
+        headers = job.state["headers"]
+
+        status_response = await http.get(f"{api_url}/jobs/{job.job_id}", headers=headers, timeout=30)
+        status_response.raise_for_status()
+        status_payload = status_response.json()
+        status_job = status_payload.get("job", status_payload)
+        status = str(status_job.get("status") or "").lower()
+        job.provider_status = status
+        # 작업 상태에 오디오 길이가 실려오면 폴링 간격 계산에 사용
+        if status_job.get("duration"):
+            job.audio_duration = float(status_job["duration"])
+
+        if status in FAILED_STATUSES:
+            status_message = (
+                status_job.get("message")
+                or status_job.get("detail")
+                or status_job.get("error")
+            )
+            status_errors = status_job.get("errors")
+            try:
+                payload_text = json.dumps(status_payload, ensure_ascii=False)
+            except Exception:
+                payload_text = str(status_payload)
+            if len(payload_text) > 2000:
+                payload_text = payload_text[:2000] + "...(truncated)"
+            logger.error(
+                "[bg] Speechmatics job failed: "
+                f"status={status}, message={status_message}, errors={status_errors}, payload={payload_text}"
+            )
+            raise ProviderJobFailed(f"Speechmatics job failed with status: {status}")
+        if status != "done":
+            return None
+
+        transcript_response = await http.get(
+            f"{api_url}/jobs/{job.job_id}/transcript",
+            headers=headers,
+            timeout=60,
+        )
+        transcript_response.raise_for_status()
+        transcript_payload = transcript_response.json()
+        if job.audio_duration and not (transcript_payload.get("job") or {}).get("duration"):
+            transcript_payload.setdefault("job", {})["duration"] = job.audio_duration
+        return transcript_payload
+
+    def parse(self, ctx, payload: dict) -> ParsedTranscript:
+        try:
+            logger.info(
+                "[bg] Speechmatics transcript payload: %s",
+                json.dumps(payload, ensure_ascii=False),
+            )
+        except Exception:
+            logger.info("[bg] Speechmatics transcript payload: %s", payload)
+        audio_events = payload.get("audio_events")
+        if audio_events is not None:
+            try:
+                logger.info(
+                    "[bg] Speechmatics audio events: %s",
+                    json.dumps(audio_events, ensure_ascii=False),
+                )
+            except Exception:
+                logger.info("[bg] Speechmatics audio events: %s", audio_events)
+
+        results = payload.get("results") or []
+        if not results:
+            raise RuntimeError("Speechmatics transcript missing results")
+
+        segments, speakers, full_transcript = parse_speechmatics_results(results)
+        return ParsedTranscript(
+            segments=segments,
+            speakers=speakers,
+            full_transcript=full_transcript,
+            words=extract_speechmatics_words(results),
+            audio_events=audio_events or [],
+            duration=(payload.get("job") or {}).get("duration"),
+        )
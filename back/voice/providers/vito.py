@@ -0,0 +1,174 @@
+"""
+VITO (RTZR) 어댑터
+"""
+
+import json
+import logging
+import os
+from typing import Optional
+
+import requests
+
+from logs.logging_util import LoggerSingleton
+from voice.poller import ProviderJobFailed, TrackedJob
+from voice.providers.base import ParsedTranscript, SttProvider
+from voice.rate_limit import acquire_token_async, call_with_limit
+from voice.streaming import MultipartStream
+from voice.transcript import parse_vito_results
+from voice.webhooks import callback_url
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+VITO_API_URL = "https://openapi.vito.ai/v1"
+
+
+def get_vito_access_token(client_id: str, client_secret: str, http: requests.Session | None = None) -> str:
+    response = (http or requests).post(
+        f"{VITO_API_URL}/authenticate",
+        data={"client_id": client_id, "client_secret": client_secret},
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    token = payload.get("access_token")
+    if not token:
+        raise RuntimeError("VITO access_token missing from response")
+    return token
+
+
+class VitoProvider(SttProvider):
+    name = "vito"
+    display_name = "VITO"
+    title_label = "VITO"
+    fixed_language = "ko"
+    streams_audio = True
+    mask_pii = True
+    store_merged_segments = True
+    async_polling = True
+    expected_rtf = 0.15
+    running_statuses = ("transcribing",)
+
+    def missing_config(self, container) -> Optional[str]:
+        if not container.vito_client_id or not container.vito_client_secret:
+            return "VITO_CLIENT_ID/SECRET not configured"
+        return None
+
+    def build_config(self, ctx) -> dict:
+        config = {
+            "model_name": "sommers",
+            "language": "ko",
+            "use_diarization": True,
+            "diarization": {"spk_count": 0},
+            "use_itn": True,
+            "use_disfluency_filter": False,
+            "use_profanity_filter": False,
+            "use_paragraph_splitter": False,
+            "use_word_timestamp": True,
+        }
+        notify_url = callback_url(self.name, ctx.upload_id)
+        if notify_url:
+            config["callback_url"] = notify_url
+        return config
+
+    def cache_config(self, ctx) -> Optional[dict]:
+        config = self.build_config(ctx)
+        config.pop("callback_url", None)
+        return config
+
+    def _auth_headers(self, ctx) -> dict:
+        token = get_vito_access_token(
+            ctx.container.vito_client_id,
+            ctx.container.vito_client_secret,
+            http=ctx.container.http(self.name),
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    def submit(self, ctx) -> str:
+        headers = self._auth_headers(ctx)
+        config = self.build_config(ctx)
+
+        def post_audio():
+            # S3 본문을 multipart 업로드로 바로 흘려보낸다 (429 재시도 시 처음부터 다시 연다)
+            body = MultipartStream(
+                {"config": (None, json.dumps(config), "application/json")},
+                "file",
+                os.path.basename(ctx.s3_key),
+                ctx.open_audio_stream(),
+            )
+            try:
+                return ctx.container.http(self.name).post(
+                    f"{VITO_API_URL}/transcribe",
+                    headers={**headers, "Content-Type": body.content_type},
+                    data=body,
+                    timeout=120,
+                )
+            finally:
+                body.close()
+
+        logger.info("[bg] Starting transcription with VITO...")
+        create_response = call_with_limit(self.name, post_audio)
+        if not create_response.ok:
+            raise RuntimeError(
+                f"VITO transcription start failed: {create_response.status_code} {create_response.text}"
+            )
+        create_payload = create_response.json()
+        job_id = create_payload.get("id")
+        if not job_id:
+            raise RuntimeError("VITO transcription id missing from response")
+        logger.info(f"[bg] VITO job created: id={job_id}")
+        return str(job_id)
+
+    def tracked_job(self, ctx, job_id: str) -> TrackedJob:
+        return TrackedJob(
+            provider=self.name,
+            job_id=job_id,
+            upload_id=ctx.upload_id,
+            audio_duration=ctx.audio_duration,
+            state={
+                "client_id": ctx.container.vito_client_id,
+                "client_secret": ctx.container.vito_client_secret,
+                "headers": None,
+            },
+        )
+
+    async def _refresh_token(self, http, job: TrackedJob) -> dict:
+        response = await http.post(
+            f"{VITO_API_URL}/authenticate",
+            data={"client_id": job.state["client_id"], "client_secret": job.state["client_secret"]},
+            timeout=30,
+        )
+        response.raise_for_status()
+        token = response.json().get("access_token")
+        if not token:
+            raise RuntimeError("VITO access_token missing from response")
+        job.state["headers"] = {"Authorization": f"Bearer {token}"}
+        return job.state["headers"]
+
+    async def poll(self, http, job: TrackedJob) -> Optional[dict]:
+        await acquire_token_async(self.name)
+        headers = job.state.get("headers") or await self._refresh_token(http, job)
+        status_response = await http.get(f"{VITO_API_URL}/transcribe/{job.job_id}", headers=headers, timeout=30)
+        if status_response.status_code == 401:
+            headers = await self._refresh_token(http, job)
+            status_response = await http.get(
+                f"{VITO_API_URL}/transcribe/{job.job_id}", headers=headers, timeout=30,
+            )
+        status_response.raise_for_status()
+        status_payload = status_response.json()
+        status = str(status_payload.get("status") or "").lower()
+        job.provider_status = status
+
+        if status in {"completed", "done", "success"}:
+            return status_payload
+        if status in {"failed", "error"}:
+            raise ProviderJobFailed(f"VITO job failed with status: {status}")
+        return None
+
+    def parse(self, ctx, payload: dict) -> ParsedTranscript:
+        segments, speakers, full_transcript, words = parse_vito_results(payload)
+        return ParsedTranscript(
+            segments=segments,
+            speakers=speakers,
+            full_transcript=full_transcript,
+            words=words,
+        )
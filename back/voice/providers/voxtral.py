@@ -0,0 +1,151 @@
+"""
+Mistral Voxtral Transcribe 2 어댑터
+"""
+
+import json
+import logging
+import os
+from typing import Optional
+
+from logs.logging_util import LoggerSingleton
+from voice.providers.base import ParsedTranscript, SttProvider
+from voice.rate_limit import RateLimited, call_sdk_with_limit
+from voice.transcript import parse_voxtral_results
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+VOXTRAL_MODEL = "voxtral-mini-2602"
+# 컨테이너 포맷은 다시 인코딩해서 업로드
+CONTAINER_EXTENSIONS = (".m4a", ".aac", ".ogg", ".wma", ".webm")
+
+
+class VoxtralProvider(SttProvider):
+    name = "voxtral"
+    display_name = "Voxtral"
+    title_label = "Voxtral"
+    fixed_language = "ko"
+    streams_audio = True
+    supports_url_ingest = True
+    # 채널을 유지하는 무손실 FLAC (이전 16 kHz WAV 대비 업로드 크기 약 절반)
+    transcode_extensions = CONTAINER_EXTENSIONS
+    upload_codec = "flac"
+    supports_chunking = True
+    supports_channel_split = True
+    mask_pii = True
+    store_merged_segments = True
+
+    def missing_config(self, container) -> Optional[str]:
+        if not container.mistral_api_key:
+            return "MISTRAL_API_KEY not configured"
+        return None
+
+    def url_ingest(self, ctx) -> bool:
+        # 재인코딩이 필요한 포맷은 변환 스트림을 업로드한다
+        return super().url_ingest(ctx) and not self.needs_transcode(ctx)
+
+    def cache_config(self, ctx) -> Optional[dict]:
+        config = {"model": VOXTRAL_MODEL, "language": self.language_for(ctx), "diarize": True, "granularity": "segment"}
+        if self.needs_transcode(ctx):
+            # 손실 코덱을 고르면 결과가 달라질 수 있다
+            config["upload_codec"] = self.codec()
+        return config
+
+    def _client(self, ctx):
+        # Mistral Python SDK로 호출 (공용 레지스트리 클라이언트 재사용)
+        mistral_client = ctx.container.mistral_client
+        if mistral_client is None:
+            from mistralai import Mistral as MistralClient
+            mistral_client = MistralClient(api_key=ctx.container.mistral_api_key)
+        return mistral_client
+
+    @staticmethod
+    def _to_dict(transcription) -> dict:
+        # SDK 응답을 dict로 변환
+        if hasattr(transcription, "model_dump"):
+            return transcription.model_dump()
+        if hasattr(transcription, "dict"):
+            return transcription.dict()
+        return json.loads(transcription.json()) if hasattr(transcription, "json") else {"text": str(transcription)}
+
+    def transcribe(self, ctx) -> dict:
+        mistral_client = self._client(ctx)
+
+        transcription = None
+        if self.url_ingest(ctx):
+            # presigned URL 을 넘기면 Mistral 이 S3 에서 직접 가져간다
+            logger.info("[bg] Starting Voxtral transcription via SDK (URL ingest)")
+            try:
+                transcription = call_sdk_with_limit(
+                    self.name,
+                    mistral_client.audio.transcriptions.complete,
+                    model=VOXTRAL_MODEL,
+                    file_url=ctx.presigned_url,
+                    diarize=True,
+                    timestamp_granularities=["segment"],
+                )
+            except RateLimited:
+                # 같은 한도에 걸린 API 로 파일 전체를 다시 올리지 않는다
+                raise
+            except Exception as e:
+                logger.warning(f"[bg] Voxtral URL ingest failed, uploading instead: {str(e)}")
+
+        if transcription is None:
+            send_file_name = ctx.upload_name or os.path.basename(ctx.s3_key)
+            logger.info(
+                f"[bg] Starting Voxtral transcription via SDK, file={send_file_name}, "
+                f"source={'ffmpeg ' + ctx.upload_codec if ctx.upload_codec else 's3 stream'}"
+            )
+
+            def upload():
+                # 변환이 필요하면 ffmpeg 출력을, 아니면 S3 본문을 그대로 업로드 스트림으로 넘긴다
+                # (429 재시도 시 스트림을 다시 연다)
+                audio_source = ctx.open_transcoded_stream() if ctx.upload_codec else ctx.open_audio_stream()
+                with audio_source as f:
+                    return mistral_client.audio.transcriptions.complete(
+                        model=VOXTRAL_MODEL,
+                        file={
+                            "file_name": send_file_name,
+                            "content": f,
+                        },
+                        diarize=True,
+                        timestamp_granularities=["segment"],
+                    )
+
+            transcription = call_sdk_with_limit(self.name, upload)
+
+        return self._to_dict(transcription)
+
+    def transcribe_chunk(self, ctx, path: str, diarize: bool = True) -> dict:
+        mistral_client = self._client(ctx)
+
+        def upload():
+            with open(path, "rb") as f:
+                return mistral_client.audio.transcriptions.complete(
+                    model=VOXTRAL_MODEL,
+                    file={
+                        "file_name": os.path.basename(path),
+                        "content": f,
+                    },
+                    diarize=diarize,
+                    timestamp_granularities=["segment"],
+                )
+
+        return self._to_dict(call_sdk_with_limit(self.name, upload))
+
+    def parse(self, ctx, payload: dict) -> ParsedTranscript:
+        logger.info(
+            f"[bg] Voxtral raw response keys={list(payload.keys())}, "
+            f"text_length={len(payload.get('text') or '')}, "
+            f"segments_count={len(payload.get('segments') or [])}, "
+            f"language={payload.get('language')}, "
+            f"model={payload.get('model')}"
+        )
+        # 첫 3개 segment 샘플 로그
+        raw_segments = payload.get("segments") or []
+        for i, seg in enumerate(raw_segments[:3]):
+            logger.info(f"[bg] Voxtral segment[{i}]: {json.dumps(seg, ensure_ascii=False)[:500]}")
+        if len(raw_segments) > 3:
+            logger.info(f"[bg] ... and {len(raw_segments) - 3} more segments")
+
+        segments, speakers, full_transcript = parse_voxtral_results(payload)
+        return ParsedTranscript(segments=segments, speakers=speakers, full_transcript=full_transcript)
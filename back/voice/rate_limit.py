@@ -0,0 +1,360 @@
+"""
+제공자/모델별 요청 속도 제한 및 동시 실행 상한 (Postgres 공유)
+
+여러 워커가 같은 한도를 나눠 쓰도록 상태를 Postgres 에 둔다.
+  - 속도 제한: provider_rate_limits 테이블의 토큰 버킷 (초당 rps, 최대 burst)
+  - 동시 실행: 세션 advisory lock 슬롯 (키마다 concurrency 개). 잠금은 전용 연결에 묶여 있어
+    워커가 죽으면 연결이 끊기면서 자동으로 풀린다.
+
+한도를 넘는 요청은 실패하지 않고 자리가 날 때까지 기다린다.
+제공자가 429 를 돌려주면 Retry-After 만큼 기다렸다 재시도하고,
+RATE_LIMIT_MAX_WAIT_SEC 를 넘기면 RateLimited 를 던져 작업을 큐로 되돌린다.
+HTTP 응답을 직접 다루면 call_with_limit, 제공자 SDK(AssemblyAI, Mistral)처럼 429 가 예외로 오면
+call_sdk_with_limit 를 쓴다.
+
+한도 설정 (KEY 는 대문자, ':' '-' '.' 는 '_', 예: speechmatics → SPEECHMATICS,
+openai:gpt-4o-mini → OPENAI_GPT_4O_MINI). 설정하지 않으면 제한 없음.
+  RATE_LIMIT_<KEY>_RPS          초당 요청 수
+  RATE_LIMIT_<KEY>_BURST        순간 최대 요청 수 (기본: max(1, RPS))
+  RATE_LIMIT_<KEY>_CONCURRENCY  동시 실행 상한
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import DATABASE_URL, engine
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="rate_limit", level=logging.INFO)
+
+MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT_SEC", "600"))
+RETRY_POLL_INTERVAL = float(os.getenv("RATE_LIMIT_POLL_SEC", "1"))
+
+RATE_LIMIT_INFLIGHT = Gauge("rate_limit_inflight", "이 프로세스에서 실행 중인 제한 대상 요청 수", ["key"])
+RATE_LIMIT_SATURATION = Gauge(
+    "rate_limit_saturation", "동시 실행 슬롯 사용률 (전체 워커 기준, 0~1)", ["key"]
+)
+RATE_LIMIT_WAIT = Histogram(
+    "rate_limit_wait_seconds",
+    "한도 때문에 요청이 기다린 시간",
+    ["key", "reason"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+RATE_LIMIT_THROTTLED = Counter(
+    "rate_limit_throttled_total", "한도 초과로 대기한 요청 수", ["key", "reason"]
+)
+
+# 동시 실행 슬롯 전용 엔진 (연결 하나 = 슬롯 하나, 반납 시 연결 종료)
+_lease_engine = create_engine(
+    DATABASE_URL,
+    poolclass=NullPool,
+    pool_pre_ping=True,
+    connect_args={"options": "-c timezone=Asia/Seoul"},
+)
+
+
+class RateLimited(RuntimeError):
+    """제공자 429 가 대기 상한을 넘겨 계속된 경우 (작업을 큐로 되돌려야 함)"""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"{key} rate limited, retry after {retry_after:.0f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class LimitConfig:
+    rps: float = 0.0
+    burst: float = 0.0
+    concurrency: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rps > 0 or self.concurrency > 0
+
+
+def _env_key(key: str) -> str:
+    return re.sub(r"[^A-Z0-9]", "_", key.upper())
+
+
+_configs: dict[str, LimitConfig] = {}
+
+
+def limit_config(key: str) -> LimitConfig:
+    config = _configs.get(key)
+    if config is None:
+        prefix = f"RATE_LIMIT_{_env_key(key)}_"
+        rps = float(os.getenv(prefix + "RPS", "0"))
+        config = LimitConfig(
+            rps=rps,
+            burst=float(os.getenv(prefix + "BURST", max(1.0, rps))),
+            concurrency=int(os.getenv(prefix + "CONCURRENCY", "0")),
+        )
+        _configs[key] = config
+    return config
+
+
+def ensure_rate_limit_schema(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS provider_rate_limits (
+                key VARCHAR(100) PRIMARY KEY,
+                tokens DOUBLE PRECISION NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """
+        ))
+
+
+# --- 토큰 버킷 ---
+
+def _take_token(key: str, config: LimitConfig) -> float:
+    """토큰 하나를 가져오면 0, 모자라면 다음 토큰까지 남은 시간(초) 반환"""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO provider_rate_limits (key, tokens) VALUES (:key, :burst) "
+                "ON CONFLICT (key) DO NOTHING"
+            ),
+            {"key": key, "burst": config.burst},
+        )
+        row = conn.execute(
+            text(
+                """
+                UPDATE provider_rate_limits
+                SET tokens = LEAST(:burst, tokens + EXTRACT(EPOCH FROM NOW() - updated_at) * :rps) - 1,
+                    updated_at = NOW()
+                WHERE key = :key
+                  AND LEAST(:burst, tokens + EXTRACT(EPOCH FROM NOW() - updated_at) * :rps) >= 1
+                RETURNING tokens
+                """
+            ),
+            {"key": key, "burst": config.burst, "rps": config.rps},
+        ).first()
+        if row is not None:
+            return 0.0
+        current = conn.execute(
+            text(
+                "SELECT LEAST(:burst, tokens + EXTRACT(EPOCH FROM NOW() - updated_at) * :rps) "
+                "FROM provider_rate_limits WHERE key = :key"
+            ),
+            {"key": key, "burst": config.burst, "rps": config.rps},
+        ).scalar() or 0.0
+    return max(0.05, (1 - float(current)) / config.rps)
+
+
+def acquire_token(key: str) -> None:
+    """속도 제한 토큰 하나를 얻을 때까지 대기"""
+    config = limit_config(key)
+    if config.rps <= 0:
+        return
+    started = time.monotonic()
+    waited = False
+    while True:
+        delay = _take_token(key, config)
+        if delay <= 0:
+            break
+        if not waited:
+            RATE_LIMIT_THROTTLED.labels(key=key, reason="rate").inc()
+            waited = True
+        time.sleep(min(delay, RETRY_POLL_INTERVAL * 5))
+    if waited:
+        RATE_LIMIT_WAIT.labels(key=key, reason="rate").observe(time.monotonic() - started)
+
+
+# --- 동시 실행 슬롯 ---
+
+class ConcurrencyLease:
+    """advisory lock 으로 잡은 동시 실행 슬롯"""
+
+    def __init__(self, key: str, limit: int):
+        self.key = key
+        self.limit = limit
+        self._lock_id = zlib.crc32(key.encode("utf-8")) & 0x7FFFFFFF
+        self._conn = None
+        self.slot: Optional[int] = None
+
+    def _try_acquire(self) -> bool:
+        if self._conn is None:
+            self._conn = _lease_engine.connect()
+        for slot in range(self.limit):
+            locked = self._conn.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id, :slot)"),
+                {"lock_id": self._lock_id, "slot": slot},
+            ).scalar()
+            if locked:
+                self._conn.commit()
+                self.slot = slot
+                return True
+        self._conn.commit()
+        return False
+
+    def _held_slots(self) -> int:
+        return int(self._conn.execute(
+            text(
+                "SELECT COUNT(*) FROM pg_locks "
+                "WHERE locktype = 'advisory' AND classid = :lock_id AND granted"
+            ),
+            {"lock_id": self._lock_id},
+        ).scalar() or 0)
+
+    def acquire(self) -> None:
+        started = time.monotonic()
+        waited = False
+        try:
+            while not self._try_acquire():
+                if not waited:
+                    RATE_LIMIT_THROTTLED.labels(key=self.key, reason="concurrency").inc()
+                    waited = True
+                time.sleep(RETRY_POLL_INTERVAL)
+            try:
+                RATE_LIMIT_SATURATION.labels(key=self.key).set(self._held_slots() / self.limit)
+            except Exception:
+                pass
+        except Exception:
+            self.release()
+            raise
+        if waited:
+            RATE_LIMIT_WAIT.labels(key=self.key, reason="concurrency").observe(time.monotonic() - started)
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            # 연결을 닫으면 세션 advisory lock 도 함께 해제된다
+            self._conn.close()
+        finally:
+            self._conn = None
+            self.slot = None
+
+
+# --- 공개 API ---
+
+def _retry_after(response) -> float:
+    headers = getattr(response, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    try:
+        return max(1.0, float(value))
+    except (TypeError, ValueError):
+        return 5.0
+
+
+@contextmanager
+def limited(key: str):
+    """동기 호출용: 토큰과 동시 실행 슬롯을 얻은 뒤 실행"""
+    config = limit_config(key)
+    if not config.enabled:
+        yield
+        return
+    acquire_token(key)
+    lease = ConcurrencyLease(key, config.concurrency) if config.concurrency > 0 else None
+    if lease:
+        lease.acquire()
+    RATE_LIMIT_INFLIGHT.labels(key=key).inc()
+    try:
+        yield
+    finally:
+        RATE_LIMIT_INFLIGHT.labels(key=key).dec()
+        if lease:
+            lease.release()
+
+
+def _wait_after_429(key: str, started: float, retry_after: float) -> None:
+    """429 후 Retry-After 만큼 대기. 총 대기가 MAX_WAIT 를 넘으면 RateLimited"""
+    RATE_LIMIT_THROTTLED.labels(key=key, reason="provider_429").inc()
+    if time.monotonic() - started + retry_after > MAX_WAIT:
+        raise RateLimited(key, retry_after)
+    logger.warning(f"{key} returned 429, retrying in {retry_after:.0f}s")
+    RATE_LIMIT_WAIT.labels(key=key, reason="provider_429").observe(retry_after)
+    time.sleep(retry_after)
+
+
+def call_with_limit(key: str, fn, *args, **kwargs):
+    """한도 안에서 HTTP 호출. 429 면 Retry-After 만큼 기다렸다 재시도 (총 MAX_WAIT 까지)"""
+    started = time.monotonic()
+    while True:
+        with limited(key):
+            response = fn(*args, **kwargs)
+        if getattr(response, "status_code", None) != 429:
+            return response
+        _wait_after_429(key, started, _retry_after(response))
+
+
+_RATE_LIMIT_MESSAGE = re.compile(r"\b429\b|too many requests|rate[ _-]?limit", re.IGNORECASE)
+
+
+def _error_response(error: BaseException):
+    # Mistral SDKError: raw_response, httpx/requests 예외: response
+    return getattr(error, "raw_response", None) or getattr(error, "response", None)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """SDK 예외가 제공자 429 인지 (상태 코드 속성 → 응답 → 메시지 순으로 확인)"""
+    if isinstance(error, RateLimited):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(_error_response(error), "status_code", None)
+    if isinstance(status, int):
+        return status == 429
+    return bool(_RATE_LIMIT_MESSAGE.search(str(error)))
+
+
+def call_sdk_with_limit(key: str, fn, *args, **kwargs):
+    """한도 안에서 SDK 호출. 429 예외면 call_with_limit 와 같이 기다렸다 재시도, 상한을 넘기면 RateLimited
+
+    fn 은 재시도마다 처음부터 다시 실행되므로 업로드 스트림은 fn 안에서 연다.
+    """
+    started = time.monotonic()
+    while True:
+        try:
+            with limited(key):
+                return fn(*args, **kwargs)
+        except RateLimited:
+            raise
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            _wait_after_429(key, started, _retry_after(_error_response(e)))
+
+
+@asynccontextmanager
+async def limited_async(key: str):
+    """이벤트 루프용: DB 대기는 스레드에서 처리해 루프를 막지 않는다"""
+    config = limit_config(key)
+    if not config.enabled:
+        yield
+        return
+    await asyncio.to_thread(acquire_token, key)
+    lease = ConcurrencyLease(key, config.concurrency) if config.concurrency > 0 else None
+    if lease:
+        await asyncio.to_thread(lease.acquire)
+    RATE_LIMIT_INFLIGHT.labels(key=key).inc()
+    try:
+        yield
+    finally:
+        RATE_LIMIT_INFLIGHT.labels(key=key).dec()
+        if lease:
+            await asyncio.to_thread(lease.release)
+
+
+async def acquire_token_async(key: str) -> None:
+    """토큰만 필요한 가벼운 호출(상태 조회 등)용"""
+    if limit_config(key).rps > 0:
+        await asyncio.to_thread(acquire_token, key)
+
+
+def openai_key(model: str) -> str:
+    return f"openai:{model}"
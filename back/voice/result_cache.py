@@ -0,0 +1,166 @@
+"""
+전사 결과 캐시 (오디오 내용 기준)
+
+같은 녹음을 다시 올리는 경우(기록 삭제 후 재업로드, 실패 후 재시도 등) 제공자를 다시 호출하지 않도록
+제공자 원본 응답을 stt_result_cache 테이블에 저장한다.
+
+캐시 키 = sha256(제공자 + S3 객체 ETag/크기 + 제공자 설정 해시)
+  - 설정에는 언어, 화자 분리 옵션, 모델 등 결과에 영향을 주는 값만 넣는다 (SttProvider.cache_config)
+  - 적중하면 transcribe 단계를 건너뛰고 저장된 응답으로 parse 단계를 진행한다
+
+만료/정리 (워커 sweeper 가 STT_CACHE_EVICT_SEC 마다 실행)
+  - STT_CACHE_TTL_DAYS 가 지난 항목 삭제
+  - 전체 크기가 STT_CACHE_MAX_MB 를 넘으면 가장 오래 안 쓰인 항목부터 삭제
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+
+from database import engine
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="stt_cache", level=logging.INFO)
+
+CACHE_ENABLED = os.getenv("STT_CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_DAYS = int(os.getenv("STT_CACHE_TTL_DAYS", "30"))
+CACHE_MAX_BYTES = int(os.getenv("STT_CACHE_MAX_MB", "1024")) * 1024 * 1024
+CACHE_EVICT_INTERVAL = int(os.getenv("STT_CACHE_EVICT_SEC", "3600"))
+
+CACHE_REQUESTS = Counter("stt_cache_requests_total", "전사 결과 캐시 조회 수", ["provider", "outcome"])
+CACHE_EVICTIONS = Counter("stt_cache_evictions_total", "정리된 캐시 항목 수", ["reason"])
+CACHE_BYTES = Gauge("stt_cache_bytes", "캐시에 저장된 응답 크기 합계 (마지막 정리 시점)")
+
+
+def ensure_result_cache_schema(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS stt_result_cache (
+                cache_key VARCHAR(64) PRIMARY KEY,
+                provider VARCHAR(30) NOT NULL,
+                content_key VARCHAR(200) NOT NULL,
+                payload JSONB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                last_used_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_stt_result_cache_last_used "
+            "ON stt_result_cache (last_used_at)"
+        ))
+
+
+def content_key(s3_client, bucket: str, key: str) -> Optional[str]:
+    """S3 객체 내용 식별자 (ETag + 크기). 조회 실패 시 None"""
+    try:
+        head = s3_client.head_object(Bucket=bucket, Key=key)
+    except Exception as e:
+        logger.warning(f"S3 head_object failed, cache disabled for this job: {str(e)}")
+        return None
+    etag = str(head.get("ETag") or "").strip('"')
+    if not etag:
+        return None
+    return f"{etag}:{head.get('ContentLength', 0)}"
+
+
+def cache_key(provider: str, content: str, config: dict) -> str:
+    config_json = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{provider}|{content}|{config_json}".encode("utf-8")).hexdigest()
+
+
+def lookup(key: str, provider: str) -> Optional[dict]:
+    """만료되지 않은 캐시 응답 반환 (적중 시 사용 시각 갱신)"""
+    try:
+        with engine.begin() as conn:
+            row = conn.execute(
+                text(
+                    """
+                    UPDATE stt_result_cache
+                    SET hits = hits + 1, last_used_at = NOW()
+                    WHERE cache_key = :key
+                      AND created_at > NOW() - make_interval(days => :ttl)
+                    RETURNING payload
+                    """
+                ),
+                {"key": key, "ttl": CACHE_TTL_DAYS},
+            ).first()
+    except Exception as e:
+        CACHE_REQUESTS.labels(provider=provider, outcome="error").inc()
+        logger.warning(f"STT cache lookup failed: {str(e)}")
+        return None
+    if row is None:
+        CACHE_REQUESTS.labels(provider=provider, outcome="miss").inc()
+        return None
+    CACHE_REQUESTS.labels(provider=provider, outcome="hit").inc()
+    payload = row[0]
+    return json.loads(payload) if isinstance(payload, str) else payload
+
+
+def store(key: str, provider: str, content: str, payload: dict) -> None:
+    payload_json = json.dumps(payload, ensure_ascii=False)
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO stt_result_cache (cache_key, provider, content_key, payload, size_bytes)
+                    VALUES (:key, :provider, :content, CAST(:payload AS JSONB), :size)
+                    ON CONFLICT (cache_key) DO UPDATE
+                    SET payload = EXCLUDED.payload,
+                        size_bytes = EXCLUDED.size_bytes,
+                        created_at = NOW(),
+                        last_used_at = NOW()
+                    """
+                ),
+                {
+                    "key": key,
+                    "provider": provider,
+                    "content": content,
+                    "payload": payload_json,
+                    "size": len(payload_json.encode("utf-8")),
+                },
+            )
+    except Exception as e:
+        logger.warning(f"STT cache store failed: {str(e)}")
+
+
+def evict() -> None:
+    """만료 항목 삭제 후, 크기 상한을 넘는 만큼 오래 안 쓰인 항목부터 삭제"""
+    with engine.begin() as conn:
+        expired = conn.execute(
+            text("DELETE FROM stt_result_cache WHERE created_at < NOW() - make_interval(days => :ttl)"),
+            {"ttl": CACHE_TTL_DAYS},
+        ).rowcount
+        oversized = conn.execute(
+            text(
+                """
+                DELETE FROM stt_result_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key,
+                               SUM(size_bytes) OVER (ORDER BY last_used_at DESC, cache_key) AS running
+                        FROM stt_result_cache
+                    ) ranked
+                    WHERE running > :max_bytes
+                )
+                """
+            ),
+            {"max_bytes": CACHE_MAX_BYTES},
+        ).rowcount
+        total = conn.execute(text("SELECT COALESCE(SUM(size_bytes), 0) FROM stt_result_cache")).scalar()
+    CACHE_BYTES.set(float(total or 0))
+    if expired:
+        CACHE_EVICTIONS.labels(reason="ttl").inc(expired)
+    if oversized:
+        CACHE_EVICTIONS.labels(reason="size").inc(oversized)
+    if expired or oversized:
+        logger.info(f"STT cache evicted: expired={expired}, oversized={oversized}, remaining_bytes={total}")
@@ -0,0 +1,306 @@
+"""
+S3 → 제공자 업로드 스트리밍
+
+presigned URL GET 본문을 임시 파일에 쓰고 다시 읽는 대신, 읽는 만큼만 S3 에서 가져와
+제공자 업로드 요청 본문으로 바로 흘려보낸다. 메모리에는 청크 하나(STT_STREAM_CHUNK_KB) 정도만 머문다.
+
+OSD 처럼 로컬 파일이 꼭 필요한 단계가 있으면 업로드와 동시에 같은 바이트를 임시 파일에 기록(tee)하고,
+스트림이 끝나면 tee_future 로 경로를 넘긴다. 제공자가 본문을 끝까지 읽지 않고 닫아도
+나머지를 마저 받아 tee 파일을 완성한다.
+
+제공자가 원본 포맷을 받지 못하면 TranscodeStream 이 ffmpeg 출력(stdout)을 그대로 업로드 본문으로 넘긴다.
+변환 결과는 디스크에 쓰지 않고, 코덱은 제공자가 받는 포맷 중 가장 작은 것(UPLOAD_CODECS)을 고른다.
+"""
+
+import io
+import logging
+import os
+import subprocess
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import Counter
+
+from logs.logging_util import LoggerSingleton
+
+logger = LoggerSingleton.get_logger(logger_name="voice", level=logging.INFO)
+
+STREAM_CHUNK_SIZE = int(os.getenv("STT_STREAM_CHUNK_KB", "1024")) * 1024
+
+STREAM_BYTES = Counter(
+    "stt_stream_bytes_total", "S3 에서 제공자로 스트리밍한 바이트 수", ["provider", "target"]
+)
+TRANSCODE_BYTES = Counter(
+    "stt_transcode_bytes_total", "다시 인코딩해 제공자로 보낸 바이트 수", ["provider", "codec"]
+)
+TRANSCODE_BYTES_SAVED = Counter(
+    "stt_transcode_bytes_saved_total",
+    "16 kHz PCM WAV 로 변환해 보냈을 때보다 줄어든 업로드 바이트 수",
+    ["provider", "codec"],
+)
+
+
+@dataclass(frozen=True)
+class UploadCodec:
+    """업로드용 재인코딩 설정"""
+    args: tuple[str, ...]
+    format: str
+    extension: str
+    content_type: str
+
+
+UPLOAD_CODECS = {
+    # 무손실 — 채널을 유지하므로 제공자의 화자 구분에 영향 없음 (WAV 대비 약 절반)
+    "flac": UploadCodec(("-c:a", "flac", "-sample_fmt", "s16", "-ar", "16000"), "flac", ".flac", "audio/flac"),
+    # 음성용 손실 압축 (mono) — 대역폭이 가장 작지만 원본을 다시 손실 압축한다
+    "opus": UploadCodec(
+        ("-c:a", "libopus", "-application", "voip", "-b:a", "24k", "-ar", "16000", "-ac", "1"),
+        "ogg", ".ogg", "audio/ogg",
+    ),
+}
+
+
+class S3AudioStream:
+    """presigned URL GET 본문을 읽기 전용 파일 객체로 노출"""
+
+    def __init__(
+        self,
+        http,
+        url: str,
+        *,
+        provider: str = "",
+        tee_path: Optional[str] = None,
+        tee_future: Optional[Future] = None,
+    ):
+        self.provider = provider
+        self._response = http.get(url, stream=True, timeout=120)
+        self._response.raise_for_status()
+        content_length = self._response.headers.get("Content-Length")
+        self.length: Optional[int] = int(content_length) if content_length else None
+        self._chunks = self._response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        self._buffer = b""
+        self._offset = 0
+        self._eof = False
+        self._closed = False
+        self._tee_path = tee_path
+        self._tee_future = tee_future
+        self._tee = open(tee_path, "wb") if tee_path else None
+
+    def _next_chunk(self) -> bytes:
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self._tee is not None:
+                self._tee.write(chunk)
+                STREAM_BYTES.labels(provider=self.provider, target="tee").inc(len(chunk))
+            return chunk
+        self._eof = True
+        self._finish_tee()
+        return b""
+
+    def _finish_tee(self, error: Optional[BaseException] = None) -> None:
+        if self._tee is None:
+            return
+        self._tee.close()
+        self._tee = None
+        future = self._tee_future
+        if future is None or future.done():
+            return
+        if error is None:
+            future.set_result(self._tee_path)
+        else:
+            future.set_exception(error)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [self._buffer[self._offset:]]
+            self._buffer, self._offset = b"", 0
+            while not self._eof:
+                parts.append(self._next_chunk())
+            data = b"".join(parts)
+        else:
+            # 현재 청크 안에서만 잘라 돌려준다 (짧은 읽기 허용, 버퍼 복사 없음)
+            while self._offset >= len(self._buffer) and not self._eof:
+                self._buffer, self._offset = self._next_chunk(), 0
+            data = self._buffer[self._offset:self._offset + size]
+            self._offset += len(data)
+        STREAM_BYTES.labels(provider=self.provider, target="provider").inc(len(data))
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self) -> int:
+        # requests 는 길이가 0 이면 chunked 전송을 사용
+        return self.length or 0
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._tee is not None:
+                # 업로드가 중간에 끝나도 OSD 용 파일은 완성해 둔다
+                while not self._eof:
+                    self._next_chunk()
+        except Exception as e:
+            logger.warning(f"[bg] Failed to complete tee file from S3 stream: {str(e)}")
+            self._finish_tee(e)
+        finally:
+            self._response.close()
+
+    def __enter__(self) -> "S3AudioStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TranscodeStream:
+    """ffmpeg 로 원본을 다시 인코딩하면서 stdout 을 읽기 전용 파일 객체로 노출 (중간 파일 없음)
+
+    baseline_bytes 가 있으면(같은 오디오를 16 kHz PCM WAV 로 보냈을 때의 크기) 닫을 때 줄어든 바이트 수를 기록한다.
+    """
+
+    def __init__(self, source: str, codec: str, *, provider: str = "", baseline_bytes: Optional[int] = None):
+        self.provider = provider
+        self.codec = codec
+        self.baseline_bytes = baseline_bytes
+        spec = UPLOAD_CODECS[codec]
+        self.content_type = spec.content_type
+        self._proc = subprocess.Popen(
+            [
+                "ffmpeg", "-nostdin", "-v", "error",
+                "-i", source, "-vn", *spec.args,
+                "-f", spec.format, "pipe:1",
+            ],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self._written = 0
+        self._eof = False
+        self._closed = False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if self._eof:
+            return b""
+        data = self._proc.stdout.read() if size is None or size < 0 else self._proc.stdout.read1(size)
+        if data:
+            self._written += len(data)
+            TRANSCODE_BYTES.labels(provider=self.provider, codec=self.codec).inc(len(data))
+        if not data or size is None or size < 0:
+            self._finish()
+        return data
+
+    def _finish(self) -> None:
+        self._eof = True
+        stderr = self._proc.stderr.read().decode("utf-8", errors="replace")
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg transcode failed: {stderr[:500]}")
+        saved = (self.baseline_bytes or 0) - self._written
+        if self.baseline_bytes and saved > 0:
+            TRANSCODE_BYTES_SAVED.labels(provider=self.provider, codec=self.codec).inc(saved)
+        logger.info(
+            f"[bg] Transcoded upload ({self.codec}): {self._written} bytes "
+            f"({self._written / 1024 / 1024:.1f} MB), wav_equivalent={self.baseline_bytes}"
+        )
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self) -> int:
+        # 길이를 미리 알 수 없으므로 chunked 전송
+        return 0
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._proc.stdout.close()
+        self._proc.stderr.close()
+
+    def __enter__(self) -> "TranscodeStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MultipartStream:
+    """multipart/form-data 본문을 스트림으로 구성 (파일 파트는 원본 스트림에서 그대로 읽음)
+
+    fields: 이름 → (파일명 또는 None, 값, Content-Type). 파일 파트는 마지막에 붙는다.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, tuple[Optional[str], str, str]],
+        file_field: str,
+        file_name: str,
+        stream: S3AudioStream,
+        file_content_type: str = "application/octet-stream",
+    ):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = b""
+        for name, (filename, value, content_type) in fields.items():
+            head += self._part_header(boundary, name, filename, content_type)
+            head += value.encode("utf-8") + b"\r\n"
+        head += self._part_header(boundary, file_field, file_name, file_content_type)
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+        self._stream = stream
+        self._parts = [io.BytesIO(head), stream, io.BytesIO(tail)]
+        self.length = len(head) + stream.length + len(tail) if stream.length else None
+
+    @staticmethod
+    def _part_header(boundary: str, name: str, filename: Optional[str], content_type: str) -> bytes:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        return (
+            f"--{boundary}\r\n"
+            f"Content-Disposition: {disposition}\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(part.read() for part in self._parts)
+        while self._parts:
+            data = self._parts[0].read(size)
+            if data:
+                return data
+            self._parts.pop(0)
+        return b""
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self) -> int:
+        return self.length or 0
+
+    def close(self) -> None:
+        self._stream.close()
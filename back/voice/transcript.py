@@ -0,0 +1,643 @@
+"""
+STT 결과 파싱 및 후처리 유틸리티
+
+제공자별 응답(payload)을 공통 세그먼트 형식
+{speaker_id, text, start_time, end_time, duration} 으로 변환하고,
+화자 라벨링/민감정보 마스킹/세그먼트 병합을 수행한다.
+"""
+
+import re
+
+
+def build_speaker_label_map(speaker_ids: list[str], counselor_id: str) -> dict[str, str]:
+    """상담사/내담자 라벨 매핑 생성"""
+    label_map: dict[str, str] = {counselor_id: "상담사"}
+    client_index = 0
+    has_single_client = len(speaker_ids) == 2
+    for speaker_id in speaker_ids:
+        if speaker_id == counselor_id:
+            continue
+        if has_single_client:
+            label_map[speaker_id] = "내담자"
+            continue
+        if client_index < 26:
+            suffix = chr(ord("A") + client_index)
+        else:
+            suffix = str(client_index + 1)
+        label_map[speaker_id] = f"내담자 {suffix}"
+        client_index += 1
+    return label_map
+
+
+def append_token_text(current: str, token: str, token_type: str | None) -> str:
+    if not token:
+        return current
+    if not current:
+        return token
+    if token_type == "punctuation":
+        return f"{current}{token}"
+    return f"{current} {token}"
+
+
+def parse_speechmatics_results(results: list[dict]) -> tuple[list[dict], dict[str, dict], str]:
+    segments: list[dict] = []
+    speakers: dict[str, dict] = {}
+    current_speaker: str | None = None
+    current_text = ""
+    seg_start: float | None = None
+    seg_end: float | None = None
+    full_text = ""
+
+    def flush_segment():
+        nonlocal current_text, seg_start, seg_end, current_speaker
+        text = current_text.strip()
+        if not text or current_speaker is None:
+            current_text = ""
+            seg_start = None
+            seg_end = None
+            return
+
+        start_time = float(seg_start) if seg_start is not None else 0.0
+        end_time = float(seg_end) if seg_end is not None else start_time
+        segments.append(
+            {
+                "speaker_id": current_speaker,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+        )
+
+        if current_speaker not in speakers:
+            speakers[current_speaker] = {
+                "speaker_id": current_speaker,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+        else:
+            speakers[current_speaker]["text"] = (
+                speakers[current_speaker]["text"] + " " + text
+            ).strip()
+            speakers[current_speaker]["end_time"] = max(
+                speakers[current_speaker]["end_time"], end_time
+            )
+            speakers[current_speaker]["duration"] = (
+                speakers[current_speaker]["end_time"]
+                - speakers[current_speaker]["start_time"]
+            )
+
+        current_text = ""
+        seg_start = None
+        seg_end = None
+
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+        alternatives = item.get("alternatives") or []
+        alt = alternatives[0] if alternatives else {}
+        token = str(alt.get("content") or "").strip()
+        if not token:
+            continue
+        token_type = str(item.get("type") or "")
+        raw_speaker = alt.get("speaker")
+        if raw_speaker is None or raw_speaker == "":
+            raw_speaker = item.get("speaker")
+        speaker = str(raw_speaker).strip() if raw_speaker is not None else ""
+        if not speaker:
+            speaker = "??"
+        start_time = item.get("start_time")
+        end_time = item.get("end_time")
+
+        if token_type == "punctuation" and current_speaker is not None:
+            speaker = current_speaker
+
+        if current_speaker is None:
+            current_speaker = speaker
+            seg_start = start_time
+            seg_end = end_time
+        elif speaker != current_speaker and token_type != "punctuation":
+            flush_segment()
+            current_speaker = speaker
+            seg_start = start_time
+            seg_end = end_time
+
+        current_text = append_token_text(current_text, token, token_type)
+        full_text = append_token_text(full_text, token, token_type)
+
+        if seg_start is None and start_time is not None:
+            seg_start = start_time
+        if end_time is not None:
+            seg_end = end_time
+
+    if current_text:
+        flush_segment()
+
+    full_transcript = full_text.strip()
+    return segments, speakers, full_transcript
+
+
+SENSITIVE_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"), "[EMAIL]"),
+    (re.compile(r"\b0\d{1,2}-?\d{3,4}-?\d{4}\b"), "[PHONE]"),
+    (re.compile(r"\b\d{6}-?\d{7}\b"), "[RRN]"),
+    (re.compile(r"\b(?:\d{4}[- ]?){3}\d{4}\b"), "[CARD]"),
+]
+
+
+def mask_sensitive_text(text: str) -> str:
+    if not text:
+        return text
+    masked = text
+    for pattern, replacement in SENSITIVE_PATTERNS:
+        masked = pattern.sub(replacement, masked)
+    return masked
+
+
+def merge_segments(segments: list[dict], gap_sec: float = 1.5) -> list[dict]:
+    merged: list[dict] = []
+    current: dict | None = None
+
+    for seg in segments:
+        if not isinstance(seg, dict):
+            continue
+        speaker_id = str(seg.get("speaker_id") or "").strip()
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        start_time = float(seg.get("start_time") or 0.0)
+        end_time = float(seg.get("end_time") or start_time)
+
+        if current is None:
+            current = {
+                "speaker_id": speaker_id,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+            continue
+
+        gap = start_time - float(current.get("end_time") or start_time)
+        if speaker_id == current.get("speaker_id") and gap <= gap_sec:
+            current["text"] = (current.get("text", "") + " " + text).strip()
+            current["end_time"] = max(float(current.get("end_time") or end_time), end_time)
+            current["duration"] = float(current["end_time"]) - float(current["start_time"])
+        else:
+            merged.append(current)
+            current = {
+                "speaker_id": speaker_id,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+
+    if current is not None:
+        merged.append(current)
+
+    return merged
+
+
+def parse_deepgram_results(payload: dict) -> tuple[list[dict], dict[str, dict], str]:
+    segments: list[dict] = []
+    speakers: dict[str, dict] = {}
+    full_transcript = ""
+
+    results = payload.get("results") or {}
+    utterances = results.get("utterances")
+
+    if not utterances:
+        channels = results.get("channels") or []
+        if channels:
+            alternatives = channels[0].get("alternatives") or []
+            if alternatives:
+                alt = alternatives[0]
+                utterances = alt.get("utterances") or []
+                full_transcript = (alt.get("transcript") or "").strip()
+
+    if utterances:
+        for utt in utterances:
+            if not isinstance(utt, dict):
+                continue
+            text = (utt.get("transcript") or utt.get("text") or "").strip()
+            if not text:
+                continue
+            speaker_id = utt.get("speaker")
+            if speaker_id is None or speaker_id == "":
+                speaker_id = utt.get("speaker_id") or "UU"
+            speaker_id = str(speaker_id)
+            start_time = float(utt.get("start") or 0.0)
+            end_time = float(utt.get("end") or start_time)
+            segments.append(
+                {
+                    "speaker_id": speaker_id,
+                    "text": text,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "duration": end_time - start_time,
+                }
+            )
+            if speaker_id not in speakers:
+                speakers[speaker_id] = {
+                    "speaker_id": speaker_id,
+                    "text": text,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "duration": end_time - start_time,
+                }
+            else:
+                speakers[speaker_id]["text"] = (
+                    speakers[speaker_id]["text"] + " " + text
+                ).strip()
+                speakers[speaker_id]["end_time"] = max(
+                    speakers[speaker_id]["end_time"], end_time
+                )
+                speakers[speaker_id]["duration"] = (
+                    speakers[speaker_id]["end_time"]
+                    - speakers[speaker_id]["start_time"]
+                )
+
+        if not full_transcript:
+            full_transcript = " ".join([seg["text"] for seg in segments]).strip()
+        return segments, speakers, full_transcript
+
+    # Fallback: build segments from word-level if available
+    channels = results.get("channels") or []
+    if channels:
+        alternatives = channels[0].get("alternatives") or []
+        if alternatives:
+            alt = alternatives[0]
+            words = alt.get("words") or []
+            current_speaker = None
+            current_text = ""
+            seg_start = None
+            seg_end = None
+
+            def flush_segment():
+                nonlocal current_text, seg_start, seg_end, current_speaker
+                text = current_text.strip()
+                if not text or current_speaker is None:
+                    current_text = ""
+                    seg_start = None
+                    seg_end = None
+                    return
+                start_time = float(seg_start) if seg_start is not None else 0.0
+                end_time = float(seg_end) if seg_end is not None else start_time
+                segments.append(
+                    {
+                        "speaker_id": current_speaker,
+                        "text": text,
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "duration": end_time - start_time,
+                    }
+                )
+                if current_speaker not in speakers:
+                    speakers[current_speaker] = {
+                        "speaker_id": current_speaker,
+                        "text": text,
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "duration": end_time - start_time,
+                    }
+                else:
+                    speakers[current_speaker]["text"] = (
+                        speakers[current_speaker]["text"] + " " + text
+                    ).strip()
+                    speakers[current_speaker]["end_time"] = max(
+                        speakers[current_speaker]["end_time"], end_time
+                    )
+                    speakers[current_speaker]["duration"] = (
+                        speakers[current_speaker]["end_time"]
+                        - speakers[current_speaker]["start_time"]
+                    )
+                current_text = ""
+                seg_start = None
+                seg_end = None
+
+            for word in words:
+                if not isinstance(word, dict):
+                    continue
+                token = (word.get("punctuated_word") or word.get("word") or "").strip()
+                if not token:
+                    continue
+                speaker_id = word.get("speaker")
+                if speaker_id is None or speaker_id == "":
+                    speaker_id = "UU"
+                speaker_id = str(speaker_id)
+                start_time = word.get("start")
+                end_time = word.get("end")
+
+                if current_speaker is None:
+                    current_speaker = speaker_id
+                    seg_start = start_time
+                    seg_end = end_time
+                elif speaker_id != current_speaker:
+                    flush_segment()
+                    current_speaker = speaker_id
+                    seg_start = start_time
+                    seg_end = end_time
+
+                current_text = append_token_text(current_text, token, None)
+                full_transcript = append_token_text(full_transcript, token, None)
+
+                if seg_start is None and start_time is not None:
+                    seg_start = start_time
+                if end_time is not None:
+                    seg_end = end_time
+
+            if current_text:
+                flush_segment()
+
+    full_transcript = full_transcript.strip()
+    return segments, speakers, full_transcript
+
+
+def parse_vito_results(payload: dict) -> tuple[list[dict], dict[str, dict], str, list[dict]]:
+    """
+    VITO 결과를 파싱하여 세그먼트, 화자, 전체 텍스트, 단어 리스트를 반환한다.
+
+    Returns:
+        (segments, speakers, full_transcript, words)
+        words: [{speaker_id, text, start_time, end_time}, ...] — use_word_timestamp 사용 시
+    """
+    segments: list[dict] = []
+    speakers: dict[str, dict] = {}
+    words: list[dict] = []
+    results = payload.get("results") or {}
+    utterances = results.get("utterances") or []
+    full_transcript = (results.get("text") or "").strip()
+
+    for utt in utterances:
+        if not isinstance(utt, dict):
+            continue
+        text = (utt.get("msg") or utt.get("text") or "").strip()
+        if not text:
+            continue
+        raw_speaker = utt.get("spk")
+        if raw_speaker is None or raw_speaker == "":
+            raw_speaker = "??"
+        speaker_id = str(raw_speaker)
+        start_ms = utt.get("start_at") or utt.get("start") or 0
+        duration_ms = utt.get("duration") or 0
+        try:
+            start_ms = float(start_ms)
+        except Exception:
+            start_ms = 0.0
+        try:
+            duration_ms = float(duration_ms)
+        except Exception:
+            duration_ms = 0.0
+        start_time = start_ms / 1000.0
+        end_time = (start_ms + duration_ms) / 1000.0
+
+        segments.append(
+            {
+                "speaker_id": speaker_id,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+        )
+
+        # 단어 타임스탬프 파싱
+        utt_words = utt.get("words") or []
+        for w in utt_words:
+            if not isinstance(w, dict):
+                continue
+            w_text = (w.get("text") or "").strip()
+            if not w_text:
+                continue
+            w_start_ms = w.get("start_at") or 0
+            w_duration_ms = w.get("duration") or 0
+            try:
+                w_start_ms = float(w_start_ms)
+            except Exception:
+                w_start_ms = 0.0
+            try:
+                w_duration_ms = float(w_duration_ms)
+            except Exception:
+                w_duration_ms = 0.0
+            words.append({
+                "speaker_id": speaker_id,
+                "text": w_text,
+                "start_time": w_start_ms / 1000.0,
+                "end_time": (w_start_ms + w_duration_ms) / 1000.0,
+            })
+
+        if speaker_id not in speakers:
+            speakers[speaker_id] = {
+                "speaker_id": speaker_id,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+        else:
+            speakers[speaker_id]["text"] = (
+                speakers[speaker_id]["text"] + " " + text
+            ).strip()
+            speakers[speaker_id]["end_time"] = max(
+                speakers[speaker_id]["end_time"], end_time
+            )
+            speakers[speaker_id]["duration"] = (
+                speakers[speaker_id]["end_time"]
+                - speakers[speaker_id]["start_time"]
+            )
+
+    if not full_transcript and segments:
+        full_transcript = " ".join([seg["text"] for seg in segments]).strip()
+
+    return segments, speakers, full_transcript, words
+
+def parse_voxtral_results(payload: dict) -> tuple[list[dict], dict[str, dict], str]:
+    """Mistral Voxtral Transcribe 2 응답을 파싱하여 segments, speakers, full_transcript 반환"""
+    segments: list[dict] = []
+    speakers: dict[str, dict] = {}
+    full_transcript = (payload.get("text") or "").strip()
+
+    response_segments = payload.get("segments") or []
+    for seg in response_segments:
+        if not isinstance(seg, dict):
+            continue
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        raw_speaker = seg.get("speaker")
+        if raw_speaker is None or raw_speaker == "":
+            raw_speaker = "0"
+        speaker_id = str(raw_speaker)
+        start_time = float(seg.get("start") or 0)
+        end_time = float(seg.get("end") or 0)
+
+        segments.append(
+            {
+                "speaker_id": speaker_id,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+        )
+        if speaker_id not in speakers:
+            speakers[speaker_id] = {
+                "speaker_id": speaker_id,
+                "text": text,
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": end_time - start_time,
+            }
+        else:
+            speakers[speaker_id]["text"] = (
+                speakers[speaker_id]["text"] + " " + text
+            ).strip()
+            speakers[speaker_id]["end_time"] = max(
+                speakers[speaker_id]["end_time"], end_time
+            )
+            speakers[speaker_id]["duration"] = (
+                speakers[speaker_id]["end_time"]
+                - speakers[speaker_id]["start_time"]
+            )
+
+    if not full_transcript and segments:
+        full_transcript = " ".join([seg["text"] for seg in segments]).strip()
+
+    return segments, speakers, full_transcript
+
+
+def _utterances_from_words(words: list, gap_ms: float = 1000.0) -> list[dict]:
+    """화자 분리를 끈 응답(utterances 없음)의 단어를 쉼 기준으로 묶어 utterance 형식으로 변환"""
+    utterances: list[dict] = []
+    for word in words:
+        if not isinstance(word, dict) or not word.get("text"):
+            continue
+        start, end = word.get("start") or 0, word.get("end") or 0
+        if utterances and start - utterances[-1]["end"] <= gap_ms:
+            utterances[-1]["text"] += " " + word["text"]
+            utterances[-1]["end"] = end
+        else:
+            utterances.append({"speaker": word.get("speaker") or "A", "text": word["text"], "start": start, "end": end})
+    return utterances
+
+
+def parse_assemblyai_results(payload: dict) -> tuple[list[dict], dict[str, dict], str]:
+    """AssemblyAI transcript JSON(utterances, ms 단위)을 파싱"""
+    speakers: dict[str, dict] = {}
+    segments: list[dict] = []
+
+    utterances = payload.get("utterances") or _utterances_from_words(payload.get("words") or [])
+    for utterance in utterances:
+        if not isinstance(utterance, dict):
+            continue
+        speaker_id = str(utterance.get("speaker"))
+        utterance_text = utterance.get("text") or ""
+        start_time = float(utterance.get("start") or 0) / 1000.0
+        end_time = float(utterance.get("end") or 0) / 1000.0
+
+        segments.append({
+            "speaker_id": speaker_id,
+            "text": utterance_text,
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration": end_time - start_time,
+        })
+
+        if speaker_id not in speakers:
+            speakers[speaker_id] = {
+                "speaker_id": speaker_id,
+                "text": "",
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": 0,
+            }
+
+        speakers[speaker_id]["text"] += " " + utterance_text
+        speakers[speaker_id]["end_time"] = max(speakers[speaker_id]["end_time"], end_time)
+        speakers[speaker_id]["duration"] = (
+            speakers[speaker_id]["end_time"] - speakers[speaker_id]["start_time"]
+        )
+
+    for speaker_id in speakers:
+        speakers[speaker_id]["text"] = speakers[speaker_id]["text"].strip()
+
+    full_transcript = payload.get("text") or ""
+    return segments, speakers, full_transcript
+
+
+def extract_speechmatics_words(results: list[dict]) -> list[dict]:
+    """Speechmatics 결과에서 단어 단위 타임스탬프 추출 (OSD 화자 재배정용)"""
+    words: list[dict] = []
+    for item in results:
+        if not isinstance(item, dict) or item.get("type") != "word":
+            continue
+        alternatives = item.get("alternatives") or []
+        alt = alternatives[0] if alternatives else {}
+        token = str(alt.get("content") or "").strip()
+        if not token:
+            continue
+        raw_speaker = alt.get("speaker")
+        if raw_speaker is None or raw_speaker == "":
+            raw_speaker = item.get("speaker")
+        speaker = str(raw_speaker).strip() if raw_speaker is not None else ""
+        words.append({
+            "speaker_id": speaker or "??",
+            "text": token,
+            "start_time": float(item.get("start_time") or 0.0),
+            "end_time": float(item.get("end_time") or 0.0),
+        })
+    return words
+
+
+def collect_speaker_ids(segments: list[dict]) -> list[str]:
+    """등장 순서대로 화자 ID 목록 반환"""
+    speaker_ids: list[str] = []
+    for seg in segments:
+        seg_speaker_id = str(seg.get("speaker_id"))
+        if seg_speaker_id not in speaker_ids:
+            speaker_ids.append(seg_speaker_id)
+    return speaker_ids
+
+
+def rebuild_speakers(segments: list[dict]) -> dict[str, dict]:
+    """재배정된 세그먼트로 speakers dict 재구축"""
+    speakers: dict[str, dict] = {}
+    for seg in segments:
+        spk_id = str(seg.get("speaker_id"))
+        if spk_id not in speakers:
+            speakers[spk_id] = {
+                "speaker_id": spk_id,
+                "text": seg.get("text", ""),
+                "start_time": seg.get("start_time", 0),
+                "end_time": seg.get("end_time", 0),
+            }
+        else:
+            speakers[spk_id]["text"] += " " + seg.get("text", "")
+            speakers[spk_id]["end_time"] = max(
+                speakers[spk_id]["end_time"], seg.get("end_time", 0)
+            )
+    return speakers
+
+
+def apply_speaker_labels(segments: list[dict], speakers: dict[str, dict], label_map: dict[str, str]) -> None:
+    """세그먼트/화자 데이터의 speaker_id 를 상담사/내담자 라벨로 교체 (in-place)"""
+    for seg in segments:
+        seg_speaker_id = str(seg.get("speaker_id"))
+        seg["speaker_id"] = label_map.get(seg_speaker_id, seg_speaker_id)
+    for speaker in speakers.values():
+        spk_id = str(speaker.get("speaker_id"))
+        speaker["speaker_id"] = label_map.get(spk_id, spk_id)
+
+
+def mask_transcript(segments: list[dict], speakers: dict[str, dict], full_transcript: str) -> str:
+    """세그먼트/화자 텍스트 마스킹 (in-place) 후 마스킹된 전체 텍스트 반환"""
+    for seg in segments:
+        seg_text = seg.get("text") or ""
+        seg["text"] = mask_sensitive_text(str(seg_text))
+    for speaker in speakers.values():
+        spk_text = speaker.get("text") or ""
+        speaker["text"] = mask_sensitive_text(str(spk_text))
+    return mask_sensitive_text(full_transcript)
@@ -0,0 +1,60 @@
+"""
+STT 제공자 완료 콜백 라우터
+
+제공자가 작업 완료를 알리면 해당 VoiceUpload 를 다시 큐에 넣는다.
+워커는 저장된 provider_job_id 로 결과를 바로 가져와 parse 단계부터 이어서 처리한다.
+"""
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from database import get_db
+from logs.logging_util import LoggerSingleton
+from config.exception import NotFound, Unauthorized
+from voice.job_queue import PROVIDERS, resume_upload_from_webhook
+from voice.webhooks import verify_callback, webhook_enabled
+from typing import Optional
+import logging
+
+# 로거 설정
+logger = LoggerSingleton.get_logger(logger_name="voice_webhook", level=logging.INFO)
+
+router = APIRouter(prefix="/voice/webhooks", tags=["Voice Webhooks"])
+
+
+async def _extract_job_id(request: Request) -> Optional[str]:
+    """콜백에서 제공자 작업 ID 추출 (Speechmatics: ?id=, VITO: body.id)"""
+    job_id = request.query_params.get("id")
+    if job_id:
+        return job_id
+    try:
+        body = await request.json()
+    except Exception:
+        return None
+    if not isinstance(body, dict):
+        return None
+    job = body.get("job") if isinstance(body.get("job"), dict) else body
+    job_id = job.get("id") or job.get("job_id")
+    return str(job_id) if job_id else None
+
+
+@router.api_route("/{provider}", methods=["GET", "POST"])
+async def provider_webhook(
+    provider: str,
+    upload_id: int,
+    token: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """제공자 작업 완료 콜백 (서명 검증 후 업로드 재개)"""
+    if provider not in PROVIDERS or not webhook_enabled(provider):
+        raise NotFound("Webhook not enabled for provider", code="WEBHOOK_NOT_ENABLED")
+    if not verify_callback(provider, upload_id, token):
+        raise Unauthorized("Invalid webhook signature", code="WEBHOOK_INVALID_SIGNATURE")
+
+    job_id = await _extract_job_id(request)
+    resumed = resume_upload_from_webhook(db, upload_id=upload_id, provider=provider, provider_job_id=job_id)
+    logger.info(
+        f"Webhook received: provider={provider}, upload_id={upload_id}, job_id={job_id}, "
+        f"status={request.query_params.get('status')}, resumed={resumed}"
+    )
+    return {"status": "accepted", "resumed": resumed}
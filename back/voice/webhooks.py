@@ -0,0 +1,48 @@
+"""
+제공자 완료 콜백(webhook) 서명/URL 유틸
+
+Speechmatics / VITO 작업을 만들 때 콜백 URL 을 함께 넘기면, 작업이 끝났을 때
+제공자가 /voice/webhooks/{provider} 를 호출한다. URL 에는 upload_id 와
+HMAC-SHA256(STT_WEBHOOK_SECRET, "{provider}:{upload_id}") 서명이 붙는다.
+
+콜백을 쓰는 제공자는 폴러가 STT_WEBHOOK_FALLBACK_POLL_SEC 간격으로만 조회한다 (유실 대비).
+"""
+
+import hashlib
+import hmac
+import os
+from typing import Optional
+from urllib.parse import urlencode
+
+WEBHOOK_BASE_URL = os.getenv("STT_WEBHOOK_BASE_URL", "").rstrip("/")
+WEBHOOK_SECRET = os.getenv("STT_WEBHOOK_SECRET", "")
+# VITO 콜백은 계정에서 콜백 기능이 활성화된 경우에만 추가한다
+WEBHOOK_PROVIDERS = {
+    name.strip()
+    for name in os.getenv("STT_WEBHOOK_PROVIDERS", "speechmatics").split(",")
+    if name.strip()
+}
+WEBHOOK_FALLBACK_POLL_SEC = float(os.getenv("STT_WEBHOOK_FALLBACK_POLL_SEC", "300"))
+
+
+def webhook_enabled(provider: str) -> bool:
+    return bool(WEBHOOK_BASE_URL and WEBHOOK_SECRET and provider in WEBHOOK_PROVIDERS)
+
+
+def sign_callback(provider: str, upload_id: int) -> str:
+    message = f"{provider}:{upload_id}".encode("utf-8")
+    return hmac.new(WEBHOOK_SECRET.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def verify_callback(provider: str, upload_id: int, token: str) -> bool:
+    if not WEBHOOK_SECRET or not token:
+        return False
+    return hmac.compare_digest(sign_callback(provider, upload_id), token)
+
+
+def callback_url(provider: str, upload_id: int) -> Optional[str]:
+    """제공자에 넘길 서명된 콜백 URL (비활성화면 None)"""
+    if not webhook_enabled(provider):
+        return None
+    query = urlencode({"upload_id": upload_id, "token": sign_callback(provider, upload_id)})
+    return f"{WEBHOOK_BASE_URL}/voice/webhooks/{provider}?{query}"
@@ -0,0 +1,157 @@
+"""
+STT 작업 워커
+
+voice_uploads 큐에서 작업을 가져와 전용 실행기(voice.executor)에서 처리한다.
+동시 처리 수는 STT_JOB_EXECUTOR_SIZE (기본값: STT_WORKER_CONCURRENCY) 로 정한다.
+웹 프로세스와 분리된 worker.py 에서 실행하는 것이 기본이며,
+단일 프로세스 배포를 위해 STT_EMBEDDED_WORKER=true 이면 app.py lifespan 에서도 띄울 수 있다.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from database import SessionLocal
+from logs.logging_util import LoggerSingleton
+from voice import result_cache
+from voice.executor import JobExecutor, get_job_executor
+from voice.job_queue import (
+    HEARTBEAT_INTERVAL,
+    ClaimedUpload,
+    claim_next_upload,
+    heartbeat_uploads,
+    requeue_stale_uploads,
+    run_claimed_upload,
+)
+
+logger = LoggerSingleton.get_logger(logger_name="stt_worker", level=logging.INFO)
+
+POLL_INTERVAL = float(os.getenv("STT_WORKER_POLL_SEC", "2"))
+STALE_SWEEP_INTERVAL = int(os.getenv("STT_WORKER_SWEEP_SEC", "60"))
+
+
+class SttWorker:
+    """DB 큐를 소비하는 STT 워커"""
+
+    def __init__(self, executor: JobExecutor | None = None, poll_interval: float = POLL_INTERVAL):
+        self._executor = executor or get_job_executor()
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._active: set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    # --- 상태 ---
+    def active_count(self) -> int:
+        with self._lock:
+            return len(self._active)
+
+    def _active_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._active)
+
+    # --- 작업 실행 ---
+    def _release(self, upload_id: int) -> None:
+        with self._lock:
+            self._active.discard(upload_id)
+
+    def _run_job(self, job: ClaimedUpload) -> None:
+        pending = None
+        try:
+            pending = run_claimed_upload(job)
+        except Exception:
+            logger.exception(f"Unhandled error while processing upload_id={job.id}")
+        finally:
+            if pending is None:
+                self._release(job.id)
+            else:
+                # 제공자 작업 대기 중에도 heartbeat 를 유지하고, 후처리가 끝나면 해제
+                pending.add_done_callback(lambda _: self._release(job.id))
+
+    def _claim_once(self) -> bool:
+        db = SessionLocal()
+        try:
+            job = claim_next_upload(db, self.worker_id)
+        finally:
+            db.close()
+        if not job:
+            return False
+        with self._lock:
+            self._active.add(job.id)
+        try:
+            self._executor.submit(self._run_job, job, block=True)
+        except Exception:
+            # 제출 실패 시 heartbeat 가 끊겨 sweeper 가 다시 큐에 넣는다
+            with self._lock:
+                self._active.discard(job.id)
+            raise
+        return True
+
+    # --- 백그라운드 루프 ---
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            ids = self._active_ids()
+            if not ids:
+                continue
+            db = SessionLocal()
+            try:
+                heartbeat_uploads(db, self.worker_id, ids)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed: {str(e)}")
+            finally:
+                db.close()
+
+    def _sweep_loop(self) -> None:
+        last_cache_evict = 0.0
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                requeue_stale_uploads(db)
+            except Exception as e:
+                logger.warning(f"Stale upload sweep failed: {str(e)}")
+            finally:
+                db.close()
+            if result_cache.CACHE_ENABLED and time.monotonic() - last_cache_evict >= result_cache.CACHE_EVICT_INTERVAL:
+                last_cache_evict = time.monotonic()
+                try:
+                    result_cache.evict()
+                except Exception as e:
+                    logger.warning(f"STT cache eviction failed: {str(e)}")
+            self._stop.wait(STALE_SWEEP_INTERVAL)
+
+    def run_forever(self) -> None:
+        """큐 소비 루프 (stop() 호출 전까지 블록)"""
+        logger.info(
+            f"STT worker started: id={self.worker_id}, executor={self._executor.stats()}"
+        )
+        for target, name in ((self._heartbeat_loop, "stt-heartbeat"), (self._sweep_loop, "stt-sweeper")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        while not self._stop.is_set():
+            claimed = False
+            # 실행기에 빈 스레드가 있을 때만 가져온다 (나머지는 다른 워커 몫)
+            if self._executor.has_idle_worker():
+                try:
+                    claimed = self._claim_once()
+                except Exception as e:
+                    logger.warning(f"Failed to claim upload: {str(e)}")
+            if not claimed:
+                self._stop.wait(self.poll_interval)
+
+        logger.info(f"STT worker stopping: waiting for {self.active_count()} running jobs")
+        self._executor.shutdown(wait=True)
+        logger.info("STT worker stopped")
+
+    def start_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run_forever, name="stt-worker-main", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,78 @@
+#####################################################
+#                                                   #
+#               STT 작업 워커 엔트리포인트              #
+#                                                   #
+#####################################################
+
+# 실행: python worker.py
+# 웹 프로세스(app.py)와 별도로 실행되어 voice_uploads 큐의 STT 작업을 처리한다.
+# 워커를 여러 개 띄우면 SKIP LOCKED 로 작업이 자동 분배된다.
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from logs.logging_util import LoggerSingleton
+from database import Base, engine
+from config.clients import get_client_container
+from voice.job_queue import ensure_job_queue_schema
+from voice.rate_limit import ensure_rate_limit_schema
+from voice.result_cache import ensure_result_cache_schema
+from voice.async_runtime import get_async_runtime
+from voice.worker import SttWorker
+import models.user  # noqa: F401 — 관계 매핑용 모델 로드
+import models.client  # noqa: F401
+import models.appointment  # noqa: F401
+import models.voice_record  # noqa: F401
+import models.voice_record_audio_event  # noqa: F401
+import models.voice_record_goal  # noqa: F401
+import models.voice_upload  # noqa: F401
+from prometheus_client import start_http_server
+import logging
+import os
+import signal
+import threading
+
+logger = LoggerSingleton.get_logger(logger_name="worker", level=logging.INFO)
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    try:
+        ensure_job_queue_schema(engine)
+        ensure_rate_limit_schema(engine)
+        ensure_result_cache_schema(engine)
+    except Exception as e:
+        logger.warning(f"Failed to ensure job queue schema: {str(e)}")
+
+    # 워커 프로세스 메트릭 (실행기 크기/대기열 등) 노출
+    metrics_port = os.getenv("STT_WORKER_METRICS_PORT")
+    if metrics_port:
+        start_http_server(int(metrics_port))
+        logger.info(f"Worker metrics exposed on :{metrics_port}/metrics")
+
+    # 공용 클라이언트 레지스트리 생성 및 제공자 연결 예열
+    container = get_client_container()
+    threading.Thread(target=container.warm_up, name="http-warmup", daemon=True).start()
+
+    # OSD 모델 다운로드/로딩과 더미 추론을 미리 해 두어 첫 작업이 콜드 스타트 비용을 내지 않게 한다
+    if container.enable_osd and os.getenv("OSD_PRELOAD", "true").lower() in ("true", "1", "yes"):
+        from voice.diarization import warm_up_segmentation
+        threading.Thread(target=warm_up_segmentation, name="osd-warmup", daemon=True).start()
+
+    worker = SttWorker()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Signal {signum} received, shutting down worker...")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    worker.run_forever()
+    # 실행 중인 작업이 모두 끝난 뒤 상주 이벤트 루프 종료
+    get_async_runtime().stop()
+
+
+if __name__ == "__main__":
+    main()
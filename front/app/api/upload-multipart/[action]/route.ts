@@ -0,0 +1,63 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+// 백엔드 /voice/multipart/{start,parts,complete,abort} 프록시
+const ACTIONS = new Set(['start', 'parts', 'complete', 'abort']);
+
+export async function POST(
+  req: NextRequest,
+  context: { params: Promise<{ action: string }> }
+) {
+  try {
+    const backendUrl = process.env.BACKEND_URL;
+
+    if (!backendUrl) {
+      return NextResponse.json(
+        { message: 'Server configuration error: Missing backend URL' },
+        { status: 500 }
+      );
+    }
+
+    const { action } = await context.params;
+    if (!ACTIONS.has(action)) {
+      return NextResponse.json({ message: 'Not found' }, { status: 404 });
+    }
+
+    // Authorization 헤더에서 JWT 토큰 추출 (필수)
+    const authorization = req.headers.get('authorization');
+    if (!authorization) {
+      return NextResponse.json(
+        { message: 'Unauthorized: No token provided' },
+        { status: 401 }
+      );
+    }
+
+    const body = await req.json();
+
+    const response = await fetch(`${backendUrl}/voice/multipart/${action}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': authorization,
+      },
+      body: JSON.stringify(body),
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      return NextResponse.json(
+        { message: `Backend error: ${errorText}` },
+        { status: response.status }
+      );
+    }
+
+    const data = await response.json();
+    return NextResponse.json(data);
+
+  } catch (error: any) {
+    console.error('API Route error:', error);
+    return NextResponse.json(
+      { message: 'Internal server error', error: error.message },
+      { status: 500 }
+    );
+  }
+}
@@ -38,11 +38,44 @@ interface UploadStatus {
   id: number;
   session_number: number | null;
   status: 'queued' | 'processing' | 'failed' | string;
+  progress_stage?: string | null;
+  eta_sec?: number | null;
   error_message?: string | null;
   created_at: string;
   updated_at: string | null;
 }
 
+interface UploadProgressEvent {
+  upload_id: number;
+  client_id: number;
+  session_number: number | null;
+  stage: string | null;
+  status: string | null;
+  eta_sec: number | null;
+  error_message: string | null;
+  at: number;
+}
+
+const PROGRESS_STAGE_LABELS: Record<string, string> = {
+  downloading: '오디오 불러오는 중',
+  transcoding: '오디오 변환 중',
+  'provider-queued': '전사 대기 중',
+  'provider-running': '전사 중',
+  diarizing: '화자 분리 중',
+  labeling: '화자 구분 중',
+  persisting: '기록 저장 중',
+  analyzing: '분석 중',
+};
+
+const formatUploadProgress = (upload?: UploadStatus | null) => {
+  if (!upload) return '업로드 중...';
+  if (upload.status === 'queued') return '대기 중...';
+  const label = (upload.progress_stage && PROGRESS_STAGE_LABELS[upload.progress_stage]) || '처리 중';
+  if (upload.eta_sec == null) return `${label}...`;
+  if (upload.eta_sec < 60) return `${label} (곧 완료)`;
+  return `${label} (약 ${Math.ceil(upload.eta_sec / 60)}분 남음)`;
+};
+
 export default function ClientDetailPage() {
   const router = useRouter();
   const params = useParams();
@@ -168,19 +201,123 @@ export default function ClientDetailPage() {
     }
   };
 
+  const hasPendingUpload = pendingUploads.some(
+    (upload) => upload.status === 'queued' || upload.status === 'processing'
+  );
+
+  // 처리 중인 업로드가 있으면 서버 진행 상황 스트림(SSE)을 구독 (실패 시 5초 폴링으로 대체)
   useEffect(() => {
-    if (!clientId) return;
-    const hasPending = pendingUploads.some(
-      (upload) => upload.status === 'queued' || upload.status === 'processing'
-    );
-    if (!hasPending) return;
+    if (!clientId || !hasPendingUpload) return;
+    const token = localStorage.getItem('access_token');
+    if (!token) return;
+
+    const controller = new AbortController();
+    let fallbackId: ReturnType<typeof setInterval> | null = null;
+
+    const applyProgress = (event: UploadProgressEvent) => {
+      if (event.status === 'completed') {
+        setPendingUploads((prev) => prev.filter((upload) => upload.id !== event.upload_id));
+        fetchVoiceRecords(token);
+        return;
+      }
+      setPendingUploads((prev) => {
+        if (!prev.some((upload) => upload.id === event.upload_id)) {
+          return [
+            {
+              id: event.upload_id,
+              session_number: event.session_number,
+              status: event.status || 'processing',
+              progress_stage: event.stage,
+              eta_sec: event.eta_sec,
+              error_message: event.error_message,
+              created_at: new Date(event.at * 1000).toISOString(),
+              updated_at: null,
+            },
+            ...prev,
+          ];
+        }
+        return prev.map((upload) =>
+          upload.id === event.upload_id
+            ? {
+                ...upload,
+                status: event.status || upload.status,
+                progress_stage: event.stage || upload.progress_stage,
+                eta_sec: event.eta_sec,
+                error_message: event.error_message ?? upload.error_message,
+              }
+            : upload
+        );
+      });
+    };
+
+    const handleBlock = (block: string) => {
+      let eventName = 'message';
+      const dataLines: string[] = [];
+      block.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) eventName = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      });
+      if (dataLines.length === 0) return;
+      const data = JSON.parse(dataLines.join('\n'));
+      if (eventName === 'snapshot') {
+        const uploads: UploadStatus[] = Array.isArray(data?.uploads) ? data.uploads : [];
+        setPendingUploads(uploads);
+        if (!uploads.some((upload) => upload.status === 'queued' || upload.status === 'processing')) {
+          fetchVoiceRecords(token);
+        }
+      } else if (eventName === 'progress') {
+        applyProgress(data as UploadProgressEvent);
+      }
+    };
+
+    const connect = async () => {
+      try {
+        const res = await fetch(`/api/clients/${clientId}/upload-events`, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+          },
+          signal: controller.signal,
+        });
+        if (res.status === 401) {
+          localStorage.removeItem('access_token');
+          router.push('/login');
+          return;
+        }
+        if (!res.ok || !res.body) {
+          throw new Error(`Upload events request failed: ${res.status}`);
+        }
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary = buffer.indexOf('\n\n');
+          while (boundary !== -1) {
+            handleBlock(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+          }
+        }
+        throw new Error('Upload events stream closed');
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error('Upload events stream failed, falling back to polling:', err);
+        fallbackId = setInterval(() => {
+          fetchUploadStatus();
+        }, 5000);
+      }
+    };
 
-    const intervalId = setInterval(() => {
-      fetchUploadStatus();
-    }, 5000);
+    connect();
 
-    return () => clearInterval(intervalId);
-  }, [clientId, pendingUploads, fetchUploadStatus]);
+    return () => {
+      controller.abort();
+      if (fallbackId) clearInterval(fallbackId);
+    };
+  }, [clientId, hasPendingUpload, fetchUploadStatus, fetchVoiceRecords, router]);
 
   const updateSessionCount = async () => {
     const count = parseInt(newSessionCount);
@@ -484,7 +621,7 @@ export default function ClientDetailPage() {
                         {isUploading ? (
                           <div className="session-uploading">
                             <div className="uploading-spinner" />
-                            <div className="uploading-text">업로드 중...</div>
+                            <div className="uploading-text">{formatUploadProgress(box.upload)}</div>
                           </div>
                         ) : record ? (
                           <div className="session-info">
@@ -4,6 +4,7 @@ import { useEffect, useRef, useState } from "react";
 import { useRouter } from "next/navigation";
 import { Mic, Upload as UploadIcon, Music, AlertCircle, CheckCircle, Clock } from "lucide-react";
 import Sidebar from "../../components/Sidebar";
+import { uploadToS3, UploadAuthError } from "../../lib/s3Upload";
 import "./upload.css";
 
 export default function Upload() {
@@ -105,41 +106,16 @@ export default function Upload() {
         throw new Error("로그인이 필요합니다.");
       }
 
-      // 1단계: Pre-signed URL 요청
-      const uploadUrlRes = await fetch("/api/upload-url", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "Authorization": `Bearer ${token}`,
-        },
-        body: JSON.stringify({
-          filename: selectedFile.name,
-          content_type: selectedFile.type || "audio/mpeg",
-        }),
-      });
-
-      if (!uploadUrlRes.ok) {
-        const errJson = await uploadUrlRes.json();
-        if (uploadUrlRes.status === 401) {
-          localStorage.removeItem('access_token');
-          router.push('/login');
+      // 1~2단계: S3에 직접 업로드 (큰 파일은 멀티파트로 구간 병렬 업로드, 끊기면 이어 올리기)
+      let s3_key: string;
+      try {
+        s3_key = await uploadToS3(selectedFile, token);
+      } catch (err) {
+        if (err instanceof UploadAuthError) {
+          localStorage.removeItem("access_token");
+          router.push("/login");
         }
-        throw new Error(errJson.message || "업로드 URL 생성 실패");
-      }
-
-      const { upload_url, s3_key } = await uploadUrlRes.json();
-
-      // 2단계: S3에 직접 업로드
-      const uploadRes = await fetch(upload_url, {
-        method: "PUT",
-        headers: {
-          "Content-Type": selectedFile.type || "audio/mpeg",
-        },
-        body: selectedFile,
-      });
-
-      if (!uploadRes.ok) {
-        throw new Error(`S3 업로드 실패 (HTTP ${uploadRes.status})`);
+        throw err;
       }
 
       // 3단계: 백엔드에 처리 요청
@@ -0,0 +1,140 @@
+// 브라우저 → S3 직접 업로드
+// 작은 파일은 presigned PUT 한 번, 큰 파일은 멀티파트 업로드로 구간을 동시에 올린다.
+// 멀티파트 업로드가 중간에 실패하면 상태를 localStorage 에 남겨 두고,
+// 같은 파일로 다시 시도하면 S3 에 아직 없는 구간만 다시 올린다.
+
+const MULTIPART_THRESHOLD = 32 * 1024 * 1024;
+const PART_CONCURRENCY = 4;
+const PART_ATTEMPTS = 3;
+
+export class UploadAuthError extends Error {}
+
+type PartUrl = { part_number: number; url: string };
+
+type MultipartState = {
+  s3_key: string;
+  upload_id: string;
+  part_size: number;
+  part_count: number;
+};
+
+const stateKey = (file: File) =>
+  `s3-multipart:${file.name}:${file.size}:${file.lastModified}`;
+
+async function postJson(path: string, token: string, body: unknown) {
+  const res = await fetch(path, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${token}`,
+    },
+    body: JSON.stringify(body),
+  });
+  if (res.status === 401) {
+    throw new UploadAuthError('로그인이 필요합니다.');
+  }
+  const data = await res.json().catch(() => ({}));
+  if (!res.ok) {
+    throw new Error(data.message || `요청 실패 (HTTP ${res.status})`);
+  }
+  return data;
+}
+
+async function uploadSingle(file: File, token: string): Promise<string> {
+  const contentType = file.type || 'audio/mpeg';
+  const { upload_url, s3_key } = await postJson('/api/upload-url', token, {
+    filename: file.name,
+    content_type: contentType,
+  });
+  const uploadRes = await fetch(upload_url, {
+    method: 'PUT',
+    headers: { 'Content-Type': contentType },
+    body: file,
+  });
+  if (!uploadRes.ok) {
+    throw new Error(`S3 업로드 실패 (HTTP ${uploadRes.status})`);
+  }
+  return s3_key;
+}
+
+async function uploadPart(file: File, state: MultipartState, part: PartUrl) {
+  const start = (part.part_number - 1) * state.part_size;
+  const blob = file.slice(start, Math.min(start + state.part_size, file.size));
+  for (let attempt = 1; ; attempt++) {
+    try {
+      const res = await fetch(part.url, { method: 'PUT', body: blob });
+      if (res.ok) return;
+      throw new Error(`S3 구간 업로드 실패 (part ${part.part_number}, HTTP ${res.status})`);
+    } catch (err) {
+      if (attempt >= PART_ATTEMPTS) throw err;
+      await new Promise((resolve) => setTimeout(resolve, 1000 * attempt));
+    }
+  }
+}
+
+async function uploadMultipart(file: File, token: string): Promise<string> {
+  const key = stateKey(file);
+  let state: MultipartState | null = null;
+  let parts: PartUrl[] = [];
+
+  // 이전에 끊긴 업로드가 있으면 남은 구간만 이어서 올린다
+  const saved = localStorage.getItem(key);
+  if (saved) {
+    try {
+      const previous: MultipartState = JSON.parse(saved);
+      const data = await postJson('/api/upload-multipart/parts', token, {
+        s3_key: previous.s3_key,
+        upload_id: previous.upload_id,
+        part_count: previous.part_count,
+      });
+      state = previous;
+      parts = data.parts;
+    } catch (err) {
+      if (err instanceof UploadAuthError) throw err;
+      localStorage.removeItem(key);
+    }
+  }
+
+  if (!state) {
+    const data = await postJson('/api/upload-multipart/start', token, {
+      filename: file.name,
+      file_size: file.size,
+      content_type: file.type || 'audio/mpeg',
+    });
+    state = {
+      s3_key: data.s3_key,
+      upload_id: data.upload_id,
+      part_size: data.part_size,
+      part_count: data.part_count,
+    };
+    parts = data.parts;
+    localStorage.setItem(key, JSON.stringify(state));
+  }
+
+  const current = state;
+  const queue = [...parts];
+  const worker = async () => {
+    for (let part = queue.shift(); part; part = queue.shift()) {
+      await uploadPart(file, current, part);
+    }
+  };
+  await Promise.all(
+    Array.from({ length: Math.min(PART_CONCURRENCY, queue.length) }, worker)
+  );
+
+  await postJson('/api/upload-multipart/complete', token, {
+    s3_key: current.s3_key,
+    upload_id: current.upload_id,
+    part_count: current.part_count,
+  });
+  localStorage.removeItem(key);
+  return current.s3_key;
+}
+
+// 업로드 후 S3 키 반환 (인증 만료 시 UploadAuthError)
+export async function uploadToS3(file: File, token: string): Promise<string> {
+  if (file.size < MULTIPART_THRESHOLD) {
+    return uploadSingle(file, token);
+  }
+  return uploadMultipart(file, token);
+}